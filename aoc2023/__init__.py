@@ -1,49 +1,49 @@
-from aoc2023 import (
-    day1,
-    day2,
-    day3,
-    day4,
-    day5,
-    day6,
-    day7,
-    day8,
-    day9,
-    day10,
-    day11,
-    day12,
-    day13,
-    day14,
-    day15,
-    day16,
-    day17,
-    day18,
-    day19,
-    day21,
-    day22,
-    day24,
-)
+"""
+Advent of Code 2023 solutions, one module per day.
+
+Day modules are imported on first attribute access (PEP 562), so
+`aoc2023.day1` doesn't pay for the scientific stack that `aoc2023.day24` drags
+in.
+
+"""
+
+import importlib
 
 __all__ = [
-    day1,
-    day2,
-    day3,
-    day4,
-    day5,
-    day6,
-    day7,
-    day8,
-    day9,
-    day10,
-    day11,
-    day12,
-    day13,
-    day14,
-    day15,
-    day16,
-    day17,
-    day18,
-    day19,
-    day21,
-    day22,
-    day24,
+    'day1',
+    'day2',
+    'day3',
+    'day4',
+    'day5',
+    'day6',
+    'day7',
+    'day8',
+    'day9',
+    'day10',
+    'day11',
+    'day12',
+    'day13',
+    'day14',
+    'day15',
+    'day16',
+    'day17',
+    'day18',
+    'day19',
+    'day21',
+    'day22',
+    'day23',
+    'day24',
+    'day25',
 ]
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        # import_module binds the submodule onto the package, so this only runs
+        # once per day.
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -0,0 +1,7 @@
+"""Entry point for `python -m aoc2023`. See aoc2023.runner."""
+
+import sys
+
+from aoc2023.runner import main
+
+sys.exit(main())
@@ -0,0 +1,225 @@
+"""
+Solve a whole directory of inputs for a day across a pool of processes.
+
+    python -m aoc2023.batch 7 inputs/day7/              # Every file, both parts.
+    python -m aoc2023.batch 7 a.txt b.txt -p 2 -j 4     # Part 2, four workers.
+    python -m aoc2023.batch 7 inputs/day7/ -o out.jsonl # Results to a file.
+    python -m aoc2023.batch 7 --synthetic 64            # Generated inputs.
+    python -m aoc2023.batch 7 inputs/day7/ --threads    # Threads, not processes.
+    python -m aoc2023.batch 9 inputs/day9/ --engine reference
+
+Every (day, part, input) is a job. Jobs go out to a ProcessPoolExecutor in
+chunks, and each result is written as one JSON line as soon as its chunk
+finishes, so output order follows completion rather than input order. A
+summary (jobs, wall time, jobs/s) goes to stderr. Each input gets the engine
+that suits it, as with the runner (see aoc2023.engines), unless --engine names
+one; the record says which ran.
+
+With --threads the jobs run on a ThreadPoolExecutor in this process instead.
+The GIL means that's no faster for pure-Python days, but it skips starting
+workers, and the solvers keep their state per call, so inputs for the same day
+can be solved side by side.
+
+Workers are started once and reused for the whole batch: the day modules (and
+whatever they import) are loaded when a worker starts, and both parts of an
+input always land in the same chunk, so the second part gets the first's parse
+from the cache for free.
+
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from aoc2023 import engines
+from aoc2023.runner import PARTS, load_day, timed
+
+# Jobs per chunk. Big enough that the pool's per-task overhead disappears,
+# small enough that the slowest chunk doesn't leave the other workers idle.
+CHUNKSIZE = 8
+
+
+class Job(NamedTuple):
+    """One part of one day on one input file."""
+
+    day: int
+    part: int
+    input: str
+    # None for whichever suits the input.
+    engine: Optional[str] = None
+
+
+def jobs_for(
+    day: int,
+    paths: Iterable[Path],
+    parts: tuple[int] = PARTS,
+    engine: Optional[str] = None,
+) -> list[Job]:
+    """Return a job per part per input, expanding directories to their files."""
+    files = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(sorted(p for p in path.iterdir() if p.is_file()))
+        else:
+            files.append(path)
+    # Parts of the same input stay next to each other so they share a chunk.
+    return [Job(day, part, str(file), engine) for file in files for part in parts]
+
+
+def chunked(jobs: list[Job], size: int) -> Iterator[list[Job]]:
+    """Split jobs into chunks of about size, never splitting an input's parts."""
+    chunk = []
+    for job in jobs:
+        if len(chunk) >= size and job.input != chunk[-1].input:
+            yield chunk
+            chunk = []
+        chunk.append(job)
+    if chunk:
+        yield chunk
+
+
+def warm_up(days: tuple[int]) -> None:
+    """Worker initializer: import the day modules before the first job."""
+    for day in days:
+        load_day(day)
+
+
+def run_job(job: Job) -> dict:
+    """Run one job and return its record. Errors are recorded, not raised."""
+    record = {
+        **job._asdict(),
+        'answer': None,
+        'wall_s': None,
+        'cpu_s': None,
+        'error': None,
+        'pid': os.getpid(),
+    }
+    try:
+        with open(job.input) as f:
+            data = f.read()
+        chosen = engines.choose(job.day, job.part, data, job.engine)
+        record['engine'] = chosen.name
+        record['answer'], record['wall_s'], record['cpu_s'] = timed(chosen.fn, data)
+    except Exception as e:
+        record['error'] = repr(e)
+    return record
+
+
+def run_chunk(chunk: list[Job]) -> list[dict]:
+    return [run_job(job) for job in chunk]
+
+
+def run_batch(
+    jobs: list[Job],
+    workers: Optional[int] = None,
+    chunksize: int = CHUNKSIZE,
+    threads: bool = False,
+) -> Iterator[dict]:
+    """Run jobs across a pool, yielding records as each chunk finishes."""
+    days = tuple(sorted({job.day for job in jobs}))
+    if threads:
+        # Threads share our imports, so warm up once, here.
+        warm_up(days)
+        pool = ThreadPoolExecutor(max_workers=workers)
+    else:
+        pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=warm_up, initargs=(days,),
+        )
+    with pool:
+        futures = [pool.submit(run_chunk, chunk) for chunk in chunked(jobs, chunksize)]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def record_to_json(record: dict) -> str:
+    """One JSON line. Answers that JSON can't handle are repr'd."""
+    return json.dumps(record, default=repr)
+
+
+def write_synthetic(day: int, count: int, directory: Path) -> list[Path]:
+    """Write count generated inputs (seeds 0..count-1) for a day into directory."""
+    from aoc2023.generators import generate
+
+    paths = []
+    for seed in range(count):
+        path = Path(directory, f'day{day}-{seed:04}')
+        path.write_text(generate(day, seed=seed))
+        paths.append(path)
+    return paths
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('day', type=int)
+    parser.add_argument(
+        'paths', nargs='*', type=Path,
+        help="Input files, or directories of them.",
+    )
+    parser.add_argument(
+        '-p', '--part', dest='parts', type=int, choices=PARTS, action='append',
+        help="Part to run. Can be given twice. Defaults to both.",
+    )
+    parser.add_argument(
+        '-j', '--workers', type=int,
+        help="Worker processes (or threads). Defaults to one per CPU.",
+    )
+    parser.add_argument(
+        '--threads', action='store_true',
+        help="Use a pool of threads in this process rather than of processes.",
+    )
+    parser.add_argument(
+        '-c', '--chunksize', type=int, default=CHUNKSIZE,
+        help=f"Jobs per chunk. Defaults to {CHUNKSIZE}.",
+    )
+    parser.add_argument(
+        '-o', '--output', metavar='PATH',
+        help="Write the JSONL results to PATH instead of stdout.",
+    )
+    parser.add_argument(
+        '--synthetic', type=int, metavar='N',
+        help="Also solve N generated inputs (handy for measuring scaling).",
+    )
+    parser.add_argument(
+        '--engine', metavar='NAME',
+        help="Run this engine (e.g. 'reference') rather than the one that suits.",
+    )
+    args = parser.parse_args(argv)
+    parts = tuple(sorted(set(args.parts))) if args.parts else PARTS
+    if not args.paths and not args.synthetic:
+        parser.error("Give some input paths or --synthetic.")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        paths = list(args.paths)
+        if args.synthetic:
+            paths.extend(write_synthetic(args.day, args.synthetic, Path(scratch)))
+        jobs = jobs_for(args.day, paths, parts, args.engine)
+
+        out = open(args.output, 'w') if args.output else sys.stdout
+        n_errors = 0
+        start = time.perf_counter()
+        try:
+            for record in run_batch(jobs, args.workers, args.chunksize, args.threads):
+                n_errors += record['error'] is not None
+                print(record_to_json(record), file=out, flush=True)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        wall = time.perf_counter() - start
+
+    workers = args.workers or os.cpu_count()
+    print(
+        f"{len(jobs)} jobs ({n_errors} failed) on {workers} workers in "
+        f"{wall:.2f}s: {len(jobs) / wall:.1f} jobs/s",
+        file=sys.stderr,
+    )
+    return 1 if n_errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
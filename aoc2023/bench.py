@@ -0,0 +1,277 @@
+"""
+Benchmark each part against synthetic inputs of growing size.
+
+    python -m aoc2023.bench                    # Every day, at 1x and 10x.
+    python -m aoc2023.bench 7 22 -s 1 10 100   # Up to 100x real size.
+    python -m aoc2023.bench 17 -p 2 --json -   # Dump the records as JSON.
+
+For every (day, part, scale) this records the time taken, throughput (input
+bytes per second), peak traced memory and the solver's work counters (see
+aoc2023.metrics), then fits a scaling exponent k from time ~ size**k across the
+scales that finished: ~1 is linear, ~2 quadratic. The counters are in the JSON.
+
+Every measurement runs in its own process so a run that blows its time budget
+can be killed, and so nothing (parse cache, class state) leaks between runs.
+Memory and work are measured in a second run under tracemalloc, which is too
+slow to leave on while timing. Once a part runs out of time, larger scales are
+skipped.
+
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import math
+import multiprocessing
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from aoc2023 import metrics
+from aoc2023.generators import DEFAULT_SEED, GENERATORS, generate
+from aoc2023.runner import PARTS, discover_days
+
+SCALES = (1, 10)
+# Seconds each measurement gets before it's abandoned.
+BUDGET = 60.0
+
+
+@dataclass
+class BenchResult:
+    """One part of one day at one scale."""
+
+    day: int
+    part: int
+    scale: float
+    input_bytes: int
+    wall_s: Optional[float] = None
+    peak_bytes: Optional[int] = None
+    answer: Optional[str] = None
+    error: Optional[str] = None
+    # The solver's work counters, by name.
+    metrics: Optional[dict] = None
+
+    @property
+    def throughput(self) -> Optional[float]:
+        """Input bytes per second."""
+        if not self.wall_s:
+            return None
+        return self.input_bytes / self.wall_s
+
+
+def _measure(day: int, part: int, data: str, memory: bool, conn) -> None:
+    """
+    Child process: run one part and send back (seconds, peak bytes, answer,
+    work counters). The memory run collects the last two; the timed run
+    doesn't.
+
+    """
+    try:
+        fn = getattr(importlib.import_module(discover_days()[day]), f'part{part}')
+        # Solvers chat on stdout. Keep it out of the report (and mostly out of
+        # the timing, though printing still costs something).
+        with contextlib.redirect_stdout(io.StringIO()):
+            if memory:
+                tracemalloc.start()
+                with metrics.collecting() as work:
+                    answer = fn(data)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                conn.send((None, peak, repr(answer), work.as_dict()))
+            else:
+                start = time.perf_counter()
+                answer = fn(data)
+                conn.send((time.perf_counter() - start, None, repr(answer), None))
+    except Exception as e:
+        conn.send(e)
+
+
+def measure(
+    day: int,
+    part: int,
+    data: str,
+    memory: bool = False,
+    budget: float = BUDGET,
+) -> tuple:
+    """
+    Run a part in a fresh process. Return (seconds, peak bytes, answer, work
+    counters), with the peak and counters only if memory, else the seconds.
+
+    """
+    # Fork so the child doesn't pay for the imports again.
+    ctx = multiprocessing.get_context('fork')
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_measure, args=(day, part, data, memory, child_conn))
+    proc.start()
+    child_conn.close()
+    try:
+        if not parent_conn.poll(budget):
+            raise TimeoutError(f"Took longer than {budget:g}s.")
+        outcome = parent_conn.recv()
+    except EOFError:
+        raise RuntimeError(f"Died with exit code {proc.exitcode}.") from None
+    finally:
+        if proc.is_alive():
+            proc.kill()
+        proc.join()
+    if isinstance(outcome, Exception):
+        raise outcome
+    return outcome
+
+
+def bench_part(
+    day: int,
+    part: int,
+    scales: tuple[float] = SCALES,
+    seed: int = DEFAULT_SEED,
+    memory: bool = True,
+    budget: float = BUDGET,
+) -> list[BenchResult]:
+    """Benchmark one part of a day at each scale, smallest first."""
+    results = []
+    for scale in sorted(scales):
+        data = generate(day, scale, seed)
+        result = BenchResult(day, part, scale, len(data.encode()))
+        results.append(result)
+        if any(earlier.error for earlier in results[:-1]):
+            result.error = "Skipped: a smaller scale already failed."
+            continue
+        try:
+            result.wall_s, _, result.answer, _ = measure(
+                day, part, data, budget=budget,
+            )
+            if memory:
+                _, result.peak_bytes, _, result.metrics = measure(
+                    day, part, data, memory=True, budget=budget,
+                )
+        except Exception as e:
+            result.error = repr(e)
+    return results
+
+
+def scaling_exponent(results: list[BenchResult]) -> Optional[float]:
+    """Fit time ~ size**k by least squares on a log-log scale. Return k."""
+    points = [
+        (math.log(result.input_bytes), math.log(result.wall_s))
+        for result in results if result.wall_s
+    ]
+    if len({x for x, _ in points}) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    return (
+        sum((x - mean_x) * (y - mean_y) for x, y in points)
+        / sum((x - mean_x)**2 for x, _ in points)
+    )
+
+
+def format_results(results: list[BenchResult]) -> str:
+    """Format results as a table, with a fitted exponent after each part."""
+    lines = [
+        f"{'day':>3} {'part':>4} {'scale':>6} {'bytes':>10} {'wall (s)':>10} "
+        f"{'MB/s':>8} {'peak (MB)':>10}  answer"
+    ]
+    by_part = dict()
+    for result in results:
+        by_part.setdefault((result.day, result.part), []).append(result)
+
+    for (day, part), part_results in by_part.items():
+        for result in part_results:
+            if result.error:
+                numbers = f"{'':>10} {'':>8} {'':>10}  {result.error}"
+            else:
+                peak = (
+                    f"{result.peak_bytes / 1e6:>10.2f}"
+                    if result.peak_bytes is not None else f"{'':>10}"
+                )
+                numbers = (
+                    f"{result.wall_s:>10.4f} {result.throughput / 1e6:>8.3f} "
+                    f"{peak}  {result.answer}"
+                )
+            lines.append(
+                f"{day:>3} {part:>4} {result.scale:>6g} {result.input_bytes:>10} "
+                f"{numbers}"
+            )
+        exponent = scaling_exponent(part_results)
+        if exponent is not None:
+            lines.append(f"{'':>3} {'':>4} {'fit':>6} time ~ size^{exponent:.2f}")
+    return '\n'.join(lines)
+
+
+def results_to_json(results: list[BenchResult]) -> str:
+    """Dump results, plus each part's fitted exponent, to a JSON string."""
+    by_part = dict()
+    for result in results:
+        by_part.setdefault((result.day, result.part), []).append(result)
+    return json.dumps(
+        [
+            {
+                'day': day,
+                'part': part,
+                'exponent': scaling_exponent(part_results),
+                'runs': [
+                    {**asdict(result), 'throughput': result.throughput}
+                    for result in part_results
+                ],
+            }
+            for (day, part), part_results in by_part.items()
+        ],
+        indent=2,
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        'days', nargs='*', type=int,
+        help="Days to benchmark. Defaults to every day with a generator.",
+    )
+    parser.add_argument(
+        '-p', '--part', dest='parts', type=int, choices=PARTS, action='append',
+        help="Part to benchmark. Can be given twice. Defaults to both.",
+    )
+    parser.add_argument(
+        '-s', '--scales', type=float, nargs='+', default=SCALES,
+        help=f"Multiples of the real input size. Defaults to {SCALES}.",
+    )
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument(
+        '-b', '--budget', type=float, default=BUDGET,
+        help=f"Seconds allowed per run. Defaults to {BUDGET:g}.",
+    )
+    parser.add_argument(
+        '--no-memory', dest='memory', action='store_false',
+        help="Skip the (slow) tracemalloc run.",
+    )
+    parser.add_argument(
+        '--json', metavar='PATH',
+        help="Also write the results as JSON to PATH ('-' for stdout).",
+    )
+    args = parser.parse_args(argv)
+    days = args.days or sorted(GENERATORS)
+    parts = tuple(sorted(set(args.parts))) if args.parts else PARTS
+
+    results = []
+    for day in days:
+        for part in parts:
+            part_results = bench_part(
+                day, part, args.scales, args.seed, args.memory, args.budget,
+            )
+            results.extend(part_results)
+            # These can take a while, so show progress as it happens.
+            print(format_results(part_results).split('\n', 1)[1], flush=True)
+
+    print()
+    print(format_results(results))
+    if args.json == '-':
+        print(results_to_json(results))
+    elif args.json:
+        Path(args.json).write_text(results_to_json(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Measure cold-start import time for each day.
+
+    python -m aoc2023.bench_import          # Every day.
+    python -m aoc2023.bench_import 1 24     # Just a couple.
+
+Every sample is a fresh interpreter, so nothing is warm. Both the time spent
+inside `import aoc2023.dayN` and the whole process wall time (interpreter
+start-up included) are reported, along with the interpreter's own start-up for
+reference.
+
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import Optional
+
+from aoc2023.runner import discover_days
+
+# Prints how long the import itself took, plus whether the heavy stuff came along
+# for the ride.
+IMPORT_SNIPPET = """\
+import sys, time
+t = time.perf_counter()
+import {module}
+print(time.perf_counter() - t, 'numpy' in sys.modules)
+"""
+
+
+def time_process(code: str) -> tuple[float, str]:
+    """Run code in a fresh interpreter. Return wall time and its stdout."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-c', code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - start, proc.stdout
+
+
+def measure_import(module: str, repeat: int = 5) -> dict:
+    """Return median import and process times (seconds) for a module."""
+    import_times = []
+    process_times = []
+    for _ in range(repeat):
+        wall, out = time_process(IMPORT_SNIPPET.format(module=module))
+        import_s, numpy_loaded = out.split()
+        import_times.append(float(import_s))
+        process_times.append(wall)
+    return {
+        'module': module,
+        'import_s': statistics.median(import_times),
+        'process_s': statistics.median(process_times),
+        'numpy_loaded': numpy_loaded == 'True',
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('days', nargs='*', type=int)
+    parser.add_argument('-r', '--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    modules = discover_days()
+    days = args.days or list(modules)
+
+    baseline = statistics.median(
+        time_process('pass')[0] for _ in range(args.repeat)
+    )
+    print(f"Interpreter start-up: {baseline*1000:.1f} ms\n")
+    print(f"{'module':<14} {'import (ms)':>12} {'process (ms)':>13}  numpy?")
+    for day in days:
+        result = measure_import(modules[day], args.repeat)
+        print(
+            f"{result['module']:<14} {result['import_s']*1000:>12.1f} "
+            f"{result['process_s']*1000:>13.1f}  "
+            f"{'yes' if result['numpy_loaded'] else 'no'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Measure what the solvers' diagnostics cost, on and off.
+
+    python -m aoc2023.bench_trace               # The chattiest parts, 1x inputs.
+    python -m aoc2023.bench_trace 17 -s 0.1     # One day, smaller input.
+    python -m aoc2023.bench_trace --to-stderr   # Pay for a real terminal.
+
+Each part runs on a synthetic input with tracing off, then again at debug level
+(which says everything the solvers used to print unconditionally). Trace output
+goes to /dev/null by default, which is the cheapest place it could go; a
+terminal is slower still.
+
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Optional, TextIO
+
+from aoc2023 import parse_cache, trace
+from aoc2023.generators import generate
+from aoc2023.runner import load_day
+
+# The parts that used to print inside their hot loops.
+CHATTY_PARTS = (
+    (1, 2), (5, 1), (7, 2), (10, 2), (17, 1), (18, 1), (19, 2),
+)
+
+
+def best_time(fn, data: str, repeat: int) -> float:
+    """Return the fastest of `repeat` runs (seconds)."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def measure_overhead(
+    day: int,
+    part: int,
+    scale: float = 1,
+    repeat: int = 3,
+    to: Optional[TextIO] = None,
+) -> dict:
+    """Time a part with tracing off and at debug level."""
+    data = generate(day, scale)
+    fn = getattr(load_day(day), f'part{part}')
+    parse_cache.clear()
+    # Parse once up front so neither side pays for it.
+    fn(data)
+
+    with trace.tracing(trace.OFF):
+        off_s = best_time(fn, data, repeat)
+    with trace.tracing(trace.DEBUG, to) as counters:
+        trace.reset()
+        on_s = best_time(fn, data, repeat)
+        counted = dict(counters)
+    return {
+        'day': day,
+        'part': part,
+        'off_s': off_s,
+        'on_s': on_s,
+        'speedup': on_s / off_s if off_s else None,
+        'counters': counted,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('days', nargs='*', type=int)
+    parser.add_argument('-s', '--scale', type=float, default=1)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    parser.add_argument('--to-stderr', action='store_true')
+    args = parser.parse_args(argv)
+    parts = [
+        (day, part) for day, part in CHATTY_PARTS
+        if not args.days or day in args.days
+    ]
+
+    print(f"{'day':>3} {'part':>4} {'off (s)':>10} {'debug (s)':>10} {'speedup':>8}")
+    with open(os.devnull, 'w') as devnull:
+        to = sys.stderr if args.to_stderr else devnull
+        for day, part in parts:
+            result = measure_overhead(day, part, args.scale, args.repeat, to)
+            print(
+                f"{day:>3} {part:>4} {result['off_s']:>10.4f} "
+                f"{result['on_s']:>10.4f} {result['speedup']:>7.1f}x",
+                flush=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Save the long loops' progress as they go, so a run that's killed can resume.
+
+    from aoc2023 import checkpoint
+
+    with checkpoint.to('day23.ckpt'):
+        answer = day23.part2(data)
+
+Run the same thing again after it's been killed and the loop carries on from
+its last save instead of starting over. The loops that save are day 23's
+longest path search (the DFS stack, with each path's nodes as bits), day 14's
+spin cycles (the cycle, the rocks, the loads seen so far) and day 21's series
+(each point as it's counted, then the window being extrapolated). They save
+every `every` seconds, and when a deadline stops them (see aoc2023.deadline),
+so a --timeout run can be continued with a longer one.
+
+A loop's state is saved under its name with a key made from its input, and
+only loaded back for the same key: a checkpoint file can be shared by several
+days and inputs without one picking up another's state. A loop that finishes
+drops its state, and the file goes once none are left. Without a checkpoint
+file nothing is saved, and the check costs the same as the deadline's:
+
+    if checkpoint.ACTIVE and checkpoint.due():
+        checkpoint.save('day14.spin_cycles', key, (i, bytes(grid.cells), loads))
+
+Checkpoints are pickles, written whole to a temporary file and then renamed over
+the old one, so a kill mid-save leaves the previous checkpoint. As with any
+pickle, only load ones you wrote.
+
+Like a deadline, a checkpoint file belongs to whoever opened it: the session
+lives in a context variable, so loops on other threads neither save to it nor
+resume from it. ACTIVE only says somebody somewhere is checkpointing. Loops
+read it once, at the start, as their own session can't change under them. Two
+sessions at once should use different files.
+
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+
+# Seconds between saves.
+EVERY = 30.0
+
+# Flag read at the call sites: True while anything, anywhere, is checkpointing.
+ACTIVE = False
+
+
+class _Session:
+    """One to() block's file, and what's saved in it."""
+
+    __slots__ = ('path', 'every', 'next_save', 'states')
+
+    def __init__(self, path: Path, every: float) -> None:
+        self.path = path
+        self.every = every
+        # time.monotonic() value after which it's time to save again.
+        self.next_save = time.monotonic() + every
+        # name: (key, state)
+        self.states: dict[str, tuple[str, Any]] = dict()
+        if path.exists():
+            with open(path, 'rb') as f:
+                self.states = pickle.load(f)
+
+    def write(self) -> None:
+        if not self.states:
+            # Everything finished.
+            self.path.unlink(missing_ok=True)
+            return
+        partial = self.path.with_name(self.path.name + '.partial')
+        with open(partial, 'wb') as f:
+            pickle.dump(self.states, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(partial, self.path)
+
+
+_session: ContextVar[Optional[_Session]] = ContextVar('checkpoint', default=None)
+_n_active = 0
+_lock = threading.Lock()
+
+
+@contextmanager
+def to(path: Union[str, os.PathLike, None], every: float = EVERY) -> Iterator[None]:
+    """
+    Have the loops in this block save to path, resuming from what it holds.
+    None means don't.
+
+    """
+    global ACTIVE, _n_active
+
+    if path is None:
+        yield
+        return
+
+    token = _session.set(_Session(Path(path), every))
+    with _lock:
+        _n_active += 1
+        ACTIVE = True
+    try:
+        yield
+    finally:
+        _session.reset(token)
+        with _lock:
+            _n_active -= 1
+            ACTIVE = _n_active > 0
+
+
+def key(*parts: Any) -> str:
+    """Return a digest of what a loop's state depends on (cells, sizes, etc.)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        # Buffers (bytes, arrays, mapped cells) as they are, anything else as text.
+        try:
+            digest.update(memoryview(part))
+        except TypeError:
+            digest.update(repr(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def due() -> bool:
+    """True once it's been `every` seconds since this context's last save."""
+    session = _session.get()
+    return session is not None and time.monotonic() >= session.next_save
+
+
+def load(name: str, key: str) -> Any:
+    """Return the state saved under name for this key, or None."""
+    session = _session.get()
+    saved = session.states.get(name) if session is not None else None
+    if saved is None or saved[0] != key:
+        return None
+    return saved[1]
+
+
+def save(name: str, key: str, state: Any) -> None:
+    """Save a loop's state, replacing whatever it saved before."""
+    session = _session.get()
+    if session is None:
+        return
+    session.states[name] = (key, state)
+    session.write()
+    session.next_save = time.monotonic() + session.every
+
+
+def done(name: str) -> None:
+    """Drop a loop's state now that it's finished."""
+    session = _session.get()
+    if session is not None and session.states.pop(name, None) is not None:
+        session.write()
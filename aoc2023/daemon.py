@@ -0,0 +1,290 @@
+"""
+Keep the solvers warm in a background process, for quick repeated runs.
+
+    python -m aoc2023.daemon start              # Import everything, then wait.
+    python -m aoc2023.daemon run 24             # Like `python -m aoc2023 24`.
+    python -m aoc2023.daemon run 17 -p 2 -i big_day17 --metrics
+    python -m aoc2023.daemon status
+    python -m aoc2023.daemon stop
+
+Every `python -m aoc2023` pays for starting Python, importing the days (numpy,
+scipy and z3 for some) and parsing the input, before solving anything. The
+daemon pays once: it imports every day up front and keeps parsed inputs in its
+parse cache (see aoc2023.parse_cache), so running the same input again only
+costs the solving. `run` takes the runner's arguments, hands them over and
+prints the same table.
+
+It listens on a Unix socket ($AOC_DAEMON_SOCKET, else aoc2023.sock in
+$XDG_RUNTIME_DIR or, prefixed with your uid, the temp directory) that only its
+owner can connect to. Each request and response is one line of JSON. Requests
+are handled one at a time, in the order they arrive.
+
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional
+
+from aoc2023 import parse_cache
+from aoc2023.runner import (
+    PARTS,
+    StageResult,
+    discover_days,
+    format_metrics,
+    format_results,
+    results_to_json,
+    run_day,
+)
+
+SOCKET_NAME = 'aoc2023.sock'
+# Seconds `start` waits for the daemon to finish importing and answer.
+START_WAIT = 60.0
+
+
+class DaemonError(Exception):
+    """The daemon isn't there, or couldn't do what was asked."""
+
+
+def socket_path() -> Path:
+    """Return where the daemon listens."""
+    if 'AOC_DAEMON_SOCKET' in os.environ:
+        return Path(os.environ['AOC_DAEMON_SOCKET'])
+    if 'XDG_RUNTIME_DIR' in os.environ:
+        return Path(os.environ['XDG_RUNTIME_DIR'], SOCKET_NAME)
+    # The temp directory is shared, so keep users apart.
+    return Path(tempfile.gettempdir(), f'{os.getuid()}-{SOCKET_NAME}')
+
+
+def request(message: dict, path: Optional[Path] = None) -> dict:
+    """Send the daemon a request and return its response."""
+    path = path or socket_path()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(path))
+            with sock.makefile('rwb') as stream:
+                stream.write(json.dumps(message).encode() + b'\n')
+                stream.flush()
+                response = stream.readline()
+    except (FileNotFoundError, ConnectionRefusedError):
+        raise DaemonError(
+            f"No daemon at {path}. Start one with `python -m aoc2023.daemon start`."
+        ) from None
+    if not response:
+        raise DaemonError("The daemon hung up without answering.")
+    response = json.loads(response)
+    if 'error' in response:
+        raise DaemonError(response['error'])
+    return response
+
+
+def is_running(path: Optional[Path] = None) -> bool:
+    try:
+        request({'op': 'status'}, path)
+    except DaemonError:
+        return False
+    return True
+
+
+class Daemon:
+    """What the daemon does with each request."""
+
+    def __init__(self, days: tuple[int]) -> None:
+        self.days = days
+        self.started = time.time()
+        self.n_requests = 0
+        self.server: Optional[socketserver.UnixStreamServer] = None
+
+    def warm_up(self) -> None:
+        """Import every day up front."""
+        from aoc2023.batch import warm_up
+
+        warm_up(self.days)
+
+    def dispatch(self, message: dict) -> dict:
+        self.n_requests += 1
+        op = message.get('op')
+        if op == 'run':
+            return self.run(message)
+        if op == 'status':
+            return {
+                'pid': os.getpid(),
+                'uptime_s': time.time() - self.started,
+                'requests': self.n_requests,
+                'days': list(self.days),
+                'parsed_inputs': parse_cache.size(),
+            }
+        if op == 'stop':
+            # shutdown() waits for the serve loop, which is waiting on us.
+            threading.Thread(target=self.server.shutdown).start()
+            return {'stopping': os.getpid()}
+        raise DaemonError(f"Unknown op {op!r}.")
+
+    def run(self, message: dict) -> dict:
+        days = message.get('days') or list(self.days)
+        unknown = set(days) - set(self.days)
+        if unknown:
+            raise DaemonError(f"No module for day(s) {sorted(unknown)}.")
+        parts = tuple(message.get('parts') or PARTS)
+        input_file = Path(message['input']) if message.get('input') else None
+        results = []
+        for day in days:
+            results.extend(run_day(
+                day, parts, input_file,
+                timeout=message.get('timeout'),
+                collect_metrics=message.get('metrics', False),
+                engine=message.get('engine'),
+            ))
+        return {'results': [asdict(result) for result in results]}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                response = self.server.daemon.dispatch(json.loads(line))
+            except Exception as e:
+                error = str(e) if isinstance(e, DaemonError) else repr(e)
+                response = {'error': error}
+            # Answers JSON can't hold (a Partial, say) go over as their text.
+            self.wfile.write(json.dumps(response, default=str).encode() + b'\n')
+            self.wfile.flush()
+
+
+def make_server(
+    path: Optional[Path] = None,
+    days: Optional[tuple[int]] = None,
+) -> socketserver.UnixStreamServer:
+    """Bind the daemon's socket, replacing a stale one. Doesn't warm up or serve."""
+    path = path or socket_path()
+    if is_running(path):
+        raise DaemonError(f"A daemon is already listening at {path}.")
+    path.unlink(missing_ok=True)
+
+    daemon = Daemon(days or tuple(discover_days()))
+    # Only the owner gets to connect.
+    old_umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(str(path), _Handler)
+    finally:
+        os.umask(old_umask)
+    server.daemon = daemon
+    daemon.server = server
+    return server
+
+
+def serve(path: Optional[Path] = None) -> None:
+    """Warm up, then handle requests until told to stop."""
+    path = path or socket_path()
+    server = make_server(path)
+    try:
+        server.daemon.warm_up()
+        server.serve_forever()
+    finally:
+        server.server_close()
+        path.unlink(missing_ok=True)
+
+
+def start(path: Optional[Path] = None, wait: float = START_WAIT) -> int:
+    """Start a daemon in the background and return its pid once it answers."""
+    path = path or socket_path()
+    if is_running(path):
+        raise DaemonError(f"A daemon is already listening at {path}.")
+    log = open(path.with_suffix('.log'), 'ab')
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'aoc2023.daemon', '--socket', str(path), 'serve'],
+        stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True,
+    )
+    log.close()
+    give_up = time.monotonic() + wait
+    while time.monotonic() < give_up:
+        if proc.poll() is not None:
+            raise DaemonError(f"The daemon exited; see {log.name}.")
+        try:
+            return request({'op': 'status'}, path)['pid']
+        except DaemonError:
+            time.sleep(0.1)
+    raise DaemonError(f"The daemon didn't answer within {wait:g}s; see {log.name}.")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--socket', type=Path,
+        help="Socket to use instead of the default (see above).",
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('start', help="Start a daemon in the background.")
+    commands.add_parser('serve', help="Be the daemon, in the foreground.")
+    commands.add_parser('status', help="Say how the daemon is doing.")
+    commands.add_parser('stop', help="Stop the daemon.")
+    run = commands.add_parser('run', help="Run days on the daemon.")
+    run.add_argument('days', nargs='*', type=int, help="Defaults to every day.")
+    run.add_argument(
+        '-p', '--part', dest='parts', type=int, choices=PARTS, action='append',
+    )
+    run.add_argument('-i', '--input', type=Path)
+    run.add_argument('-t', '--timeout', type=float, metavar='SECONDS')
+    run.add_argument('--metrics', action='store_true')
+    run.add_argument('--engine', metavar='NAME')
+    run.add_argument('--json', metavar='PATH')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'serve':
+            serve(args.socket)
+        elif args.command == 'start':
+            print(f"Daemon {start(args.socket)} is ready.")
+        elif args.command == 'status':
+            status = request({'op': 'status'}, args.socket)
+            print(json.dumps(status, indent=2))
+        elif args.command == 'stop':
+            print(f"Stopped daemon {request({'op': 'stop'}, args.socket)['stopping']}.")
+        else:
+            return run_remote(args)
+    except DaemonError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+def run_remote(args: argparse.Namespace) -> int:
+    """Have the daemon run days, and report like the runner does."""
+    if args.input and len(args.days) != 1:
+        raise DaemonError("--input only makes sense for a single day.")
+    response = request(
+        {
+            'op': 'run',
+            'days': args.days,
+            'parts': sorted(set(args.parts)) if args.parts else None,
+            # The daemon doesn't share our working directory.
+            'input': str(args.input.resolve()) if args.input else None,
+            'timeout': args.timeout,
+            'metrics': args.metrics,
+            'engine': args.engine,
+        },
+        args.socket,
+    )
+    results = [StageResult(**record) for record in response['results']]
+    print(format_results(results))
+    if any(result.metrics for result in results):
+        print()
+        print(format_metrics(results))
+    if args.json == '-':
+        print(results_to_json(results))
+    elif args.json:
+        Path(args.json).write_text(results_to_json(results))
+    return 1 if any(result.error for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,10 @@
 import re
 from pathlib import Path
 
+from aoc2023 import trace
+from aoc2023.parse_cache import cached_parse
+from aoc2023.streaming import Input, records
+
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'day1')
@@ -14,9 +18,14 @@ fixed_first = re.compile(r'(\d|one|two|three|four|five|six|seven|eight|nine)')
 fixed_last = re.compile(r'.*(\d|one|two|three|four|five|six|seven|eight|nine)')
 
 
-def part1(data: str) -> float:
+@cached_parse
+def parse(data: str) -> tuple[str]:
+    return tuple(data.splitlines())
+
+
+def part1(data: Input) -> float:
     total = 0
-    for line in data.splitlines():
+    for line in records(data, parse):
         digit1 = first.search(line)
         digit2 = last.search(line)
         if not digit1 or not digit2:
@@ -26,21 +35,27 @@ def part1(data: str) -> float:
     return total
 
 
-def part2(data: str) -> float:
+def part2(data: Input) -> float:
     total = 0
-    for line in data.splitlines():
+    for line in records(data, parse):
         digit1 = word_to_digit(fixed_first.findall(line.lower())[0])
         digit2 = word_to_digit(fixed_last.findall(line.lower())[-1])
 
         val = int(digit1 + digit2)
 
-        print(line, val)
+        if trace.DEBUG_ON:
+            trace.emit(f"{line} {val}")
 
         total += val
 
     return total
 
 
+def solve(data: str) -> tuple[float, float]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
+
+
 def word_to_digit(word: str) -> str:
     if len(word) == 1:
         return word
@@ -65,7 +80,7 @@ def word_to_digit(word: str) -> str:
 
 
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['1']))
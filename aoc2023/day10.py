@@ -3,11 +3,19 @@
 from collections import namedtuple
 from functools import partial
 from pathlib import Path
+from typing import Union
+
+from aoc2023 import trace
+from aoc2023.grid import Grid, as_grid
+from aoc2023.parse_cache import cached_parse
 
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'day10')
 
+# The runner maps the input file rather than reading it (see aoc2023.grid).
+load = Grid.from_file
+
 # Defined with CW first.
 PIPE_TYPES = {
     '|': 'ns',
@@ -17,49 +25,66 @@ PIPE_TYPES = {
     '7': 'sw',
     'F': 'es',
 }
+# Same, keyed by the grid's bytes.
+PIPE_TYPES_BY_BYTE = {ord(pipe): type_ for pipe, type_ in PIPE_TYPES.items()}
 
 CW_CHECK_ORDER = 'nesw'
 
 Movement = namedtuple('Movement', ['end_pos', 'coming_from'])
 
-def part1(data: str) -> int:
+@cached_parse
+def parse(data: Union[str, Grid]) -> tuple[Grid, int, str, tuple[int]]:
+    """Return the grid, the start's index and pipe type, and the loop's indices."""
+    grid = as_grid(data)
     # Find S.
-    starting_point = data.find("S")
-    starting_point_type = determine_starting_point_type(data, starting_point)
-    print(f"Found start at {starting_point} of type {starting_point_type}")
-    pipe_mask = get_pipe_mask(data, starting_point, starting_point_type)
+    starting_point = grid.find(b"S")
+    starting_point_type = determine_starting_point_type(grid, starting_point)
+    pipe_mask = get_pipe_mask(grid, starting_point, starting_point_type)
+    return grid, starting_point, starting_point_type, tuple(pipe_mask)
+
+
+def part1(data: Union[str, Grid]) -> int:
+    _, starting_point, starting_point_type, pipe_mask = parse(data)
+    if trace.INFO_ON:
+        trace.emit(f"Found start at {starting_point} of type {starting_point_type}")
     return len(pipe_mask) / 2
 
 
-def part2(data: str) -> int:
-    # Find S.
-    starting_point = data.find("S")
-    starting_point_type = determine_starting_point_type(data, starting_point)
-    pipe_mask = get_pipe_mask(data, starting_point, starting_point_type)
-    print_mask(data, pipe_mask)
+def part2(data: Union[str, Grid]) -> int:
+    grid, _, _, pipe_mask = parse(data)
+    # Extended and possibly reversed below.
+    pipe_mask = list(pipe_mask)
+    if trace.DEBUG_ON:
+        trace.emit(format_mask(grid, pipe_mask))
 
     # Allow us to reach back to the starting point.
     pipe_mask.append(pipe_mask[0])
 
     try:
-        interior_mask = get_interior_mask(data, pipe_mask)
+        interior_mask = get_interior_mask(grid, pipe_mask)
     except ValueError:
         # Probably just need to reverse it. (Not sure if it matters that S
         # doesn't get evaluated. I can swap in the proper type if need be).
         pipe_mask.reverse()
-        interior_mask = get_interior_mask(data, pipe_mask)
+        interior_mask = get_interior_mask(grid, pipe_mask)
     except IndexError:
         # Seems like we went out of bounds. Probably just need to reverse it.
         # (Not sure if it matters that S doesn't get evaluated. I can swap in
         # the proper type if need be).
         pipe_mask.reverse()
-        interior_mask = get_interior_mask(data, pipe_mask)
+        interior_mask = get_interior_mask(grid, pipe_mask)
 
-    print_mask(data, interior_mask)
+    if trace.DEBUG_ON:
+        trace.emit(format_mask(grid, interior_mask))
     return len(interior_mask)
 
 
-def get_interior_mask(data: str, pipe_mask: list[int]) -> int:
+def solve(data: Union[str, Grid]) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
+
+
+def get_interior_mask(grid: Grid, pipe_mask: list[int]) -> set[int]:
     """
     Compute the area within the boundary defined.
 
@@ -68,12 +93,13 @@ def get_interior_mask(data: str, pipe_mask: list[int]) -> int:
 
     """
     interior_mask = set()
-    vertical_step_offset = data.find('\n') + 1
+    vertical_step_offset = grid.stride
+    # Checked for every step of every walk, so don't search the list.
+    on_pipe = set(pipe_mask)
     for idx in range(len(pipe_mask)-1):
         this_pipe = pipe_mask[idx]
         next_pipe = pipe_mask[idx + 1]
 
-        print(f"Evaluating {data[this_pipe]} at {this_pipe}.", end=" ")
         if next_pipe == this_pipe + 1:
             # East! Look south.
             walk_offset = vertical_step_offset
@@ -87,9 +113,12 @@ def get_interior_mask(data: str, pipe_mask: list[int]) -> int:
             # South! Look west.
             walk_offset = -1
         else:
-            print(this_pipe, next_pipe)
-            raise ValueError("Not sure where we are!")
-        print(f", walking {walk_offset}")
+            raise ValueError(f"Not sure where we are! ({this_pipe} -> {next_pipe})")
+        if trace.DEBUG_ON:
+            trace.emit(
+                f"Evaluating {chr(grid.cells[this_pipe])} at {this_pipe}, "
+                f"walking {walk_offset}"
+            )
 
         for eval_point in (this_pipe, next_pipe):
             # Check this pipe and the next one for this direction. Inefficient,
@@ -97,10 +126,19 @@ def get_interior_mask(data: str, pipe_mask: list[int]) -> int:
             for _ in range(vertical_step_offset):
                 # Prevent an infinite loop (the grid is square).
                 eval_point += walk_offset
-                if eval_point in pipe_mask:
+                if eval_point in on_pipe:
                     # Hit another bound! Bail.
                     break
-                print(f"Found an interior point ({data[eval_point]}) at {eval_point}")
+                if eval_point >= len(grid):
+                    # Walked off the bottom, so we're on the outside.
+                    raise IndexError(f"Walked off the grid at {eval_point}")
+                if trace.ON:
+                    trace.count('day10.interior_steps')
+                if trace.DEBUG_ON:
+                    trace.emit(
+                        f"Found an interior point ({chr(grid.cells[eval_point])}) "
+                        f"at {eval_point}"
+                    )
                 interior_mask.add(eval_point)
             else:
                 raise ValueError("Didn't hit another pipe in the loop?!")
@@ -108,12 +146,12 @@ def get_interior_mask(data: str, pipe_mask: list[int]) -> int:
 
 
 def get_pipe_mask(
-    data: str,
+    grid: Grid,
     starting_point: int,
     starting_point_type: str,
 ) -> list[int]:
     """
-    Return a list of indices in the data string where the pipe lies.
+    Return a list of indices in the grid where the pipe lies.
 
     Cannot guarantee CW vs CCW.
 
@@ -123,7 +161,7 @@ def get_pipe_mask(
     coming_from = ''
 
     # number of characters to shift to step up or down.
-    move_compass_ = partial(move_compass, vertical_step_offset=data.find('\n') + 1)
+    move_compass_ = partial(move_compass, vertical_step_offset=grid.stride)
     while True:
         valid_directions = PIPE_TYPES[last_pipe_type]
         valid_directions = valid_directions.replace(coming_from, '')
@@ -132,7 +170,7 @@ def get_pipe_mask(
             test_move = move_compass_(pipe_mask[-1], valid_direction)
             # print(f"Moved {valid_direction} to {test_move}")
             # Assuming here that we never fall out of bounds of the sketch.
-            test_pipe_type = data[test_move.end_pos]
+            test_pipe_type = chr(grid.cells[test_move.end_pos])
             test_pipe_directions = PIPE_TYPES.get(test_pipe_type, '')
 
             if test_move.coming_from in test_pipe_directions:
@@ -149,7 +187,8 @@ def get_pipe_mask(
                 # Check for the end of the loop.
                 return pipe_mask
 
-            print(pipe_mask)
+            if trace.DEBUG_ON:
+                trace.emit(str(pipe_mask))
             raise RuntimeError("Not a continuous pipe!")
 
 
@@ -165,14 +204,14 @@ def move_compass(start_pos: int, direction: str, vertical_step_offset: int) -> M
         return Movement(start_pos - 1, 'e')
 
 
-def determine_starting_point_type(data: str, starting_point: int) -> str:
+def determine_starting_point_type(grid: Grid, starting_point: int) -> str:
     """Check to the nsew for pipes which validly connect."""
-    move_compass_ = partial(move_compass, vertical_step_offset=data.find('\n') + 1)
+    move_compass_ = partial(move_compass, vertical_step_offset=grid.stride)
 
     valid_directions = ''
     for move in 'nsew':
         test_move = move_compass_(starting_point, move)
-        test_pipe_type = PIPE_TYPES.get(data[test_move.end_pos], '')
+        test_pipe_type = PIPE_TYPES_BY_BYTE.get(grid.cells[test_move.end_pos], '')
 
         if test_move.coming_from in test_pipe_type:
             valid_directions = ''.join([valid_directions, move])
@@ -191,16 +230,17 @@ def determine_starting_point_type(data: str, starting_point: int) -> str:
         continue
 
 
-def print_mask(data: str, mask: list[int]) -> None:
-    for i in range(len(data)):
-        if i in mask or data[i] == '\n':
-            print(data[i], end='')
-            continue
-        print(" ", end="")
+def format_mask(grid: Grid, mask: list[int]) -> str:
+    """Blank out everything that isn't in the mask."""
+    mask = set(mask)
+    return ''.join(
+        char if i in mask or char == '\n' else ' '
+        for i, char in enumerate(str(grid))
+    )
 
 
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['10']))
@@ -2,106 +2,79 @@
 
 from functools import partial
 from pathlib import Path
+from typing import Union
+
+from aoc2023 import trace
+from aoc2023.grid import Grid, as_grid
+from aoc2023.parse_cache import cached_parse
 
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'day11')
 
-def part1(data: str) -> int:
-    space = []
-    vertical_offset = data.find("\n") + 1
-    rows_without_galaxies = []
-    for row_idx, spatial_row in enumerate(data.splitlines()):
-        this_row = []
-        galaxy_idx = -1
-        for _ in spatial_row:
-            galaxy_idx = spatial_row.find("#", galaxy_idx+1)
-            if galaxy_idx == -1:
-                # No more found.
-                break
-            this_row.append(galaxy_idx)
-        else:
-            print(this_row)
-            raise RuntimeError("Something didn't work in galaxy finding.")
-        if not this_row:
-            # No galaxies here, apply 'vertical' spatial expansion.
-            rows_without_galaxies.append(row_idx)
-        space.append(this_row)
+# The runner maps the input file rather than reading it (see aoc2023.grid).
+load = Grid.from_file
+
+@cached_parse
+def parse(data: Union[str, Grid]) -> tuple[tuple[tuple[int]], tuple[int], tuple[int]]:
+    """
+    Return the galaxies' columns by row, then the empty rows and columns.
+
+    Empty columns are sorted descending.
+
+    """
+    grid = as_grid(data)
+    space = [[] for _ in range(grid.height)]
+    for galaxy in grid.find_all(b"#"):
+        x, y = grid.xy(galaxy)
+        space[y].append(x)
+    # No galaxies in a row, apply 'vertical' spatial expansion.
+    rows_without_galaxies = [y for y, row in enumerate(space) if not row]
 
     # We've found all of the galaxies, now evaluate horizontal spatial expansion.
     cols_with_galaxies = set()
     for row in space:
         cols_with_galaxies.update(row)
 
-    cols_without_galaxies = list(cols_with_galaxies.symmetric_difference(range(vertical_offset)))
+    cols_without_galaxies = [
+        x for x in range(grid.width) if x not in cols_with_galaxies
+    ]
     # Since we're shifting leftward, start from the right.
     cols_without_galaxies.sort(reverse=True)
-    print(rows_without_galaxies)
-    print(cols_without_galaxies)
-    print(space)
-    # Now, with space expanded fully, go row by row and find the relationship
-    # with those galaxies in the row and above (more efficient to pop from the
-    # end of a list).
-    distances = []
-    get_dist = partial(
-        calc_distance,
-        spatial_expansion_factor=1,
-        rows_without_galaxies=rows_without_galaxies,
-        cols_without_galaxies=cols_without_galaxies,
+    return (
+        tuple(tuple(row) for row in space),
+        tuple(rows_without_galaxies),
+        tuple(cols_without_galaxies),
     )
-    while space:
-        row = space.pop()
-        while row:
-            this_galaxy = row.pop()
-            # Those in the row with it.
-            distances.extend([get_dist((0, this_galaxy), (0, other_galaxy)) for other_galaxy in row])
-            # Those above it.
-            for other_idx, other_row in enumerate(space):
-                distances.extend([get_dist((len(space), this_galaxy), (other_idx, other_galaxy)) for other_galaxy in other_row])
-    print(distances)
-    return sum(distances)
 
 
+def part1(data: Union[str, Grid]) -> int:
+    return sum_distances(data, spatial_expansion_factor=1)
 
-def part2(data: str) -> int:
-    space = []
-    vertical_offset = data.find("\n") + 1
-    rows_without_galaxies = []
-    for row_idx, spatial_row in enumerate(data.splitlines()):
-        this_row = []
-        galaxy_idx = -1
-        for _ in spatial_row:
-            galaxy_idx = spatial_row.find("#", galaxy_idx+1)
-            if galaxy_idx == -1:
-                # No more found.
-                break
-            this_row.append(galaxy_idx)
-        else:
-            print(this_row)
-            raise RuntimeError("Something didn't work in galaxy finding.")
-        if not this_row:
-            # No galaxies here, apply 'vertical' spatial expansion.
-            rows_without_galaxies.append(row_idx)
-        space.append(this_row)
 
-    # We've found all of the galaxies, now evaluate horizontal spatial expansion.
-    cols_with_galaxies = set()
-    for row in space:
-        cols_with_galaxies.update(row)
+def part2(data: Union[str, Grid]) -> int:
+    return sum_distances(data, spatial_expansion_factor=1000000)
 
-    cols_without_galaxies = list(cols_with_galaxies.symmetric_difference(range(vertical_offset)))
-    # Since we're shifting leftward, start from the right.
-    cols_without_galaxies.sort(reverse=True)
-    print(rows_without_galaxies)
-    print(cols_without_galaxies)
-    print(space)
+
+def solve(data: Union[str, Grid]) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
+
+
+def sum_distances(data: str, spatial_expansion_factor: int) -> int:
+    """Sum the distances between every pair of galaxies in expanded space."""
+    space, rows_without_galaxies, cols_without_galaxies = parse(data)
+    # Popped from below.
+    space = [list(row) for row in space]
+    if trace.DEBUG_ON:
+        trace.emit(f"{rows_without_galaxies=}\n{cols_without_galaxies=}\n{space=}")
     # Now, with space expanded fully, go row by row and find the relationship
     # with those galaxies in the row and above (more efficient to pop from the
     # end of a list).
     distances = []
     get_dist = partial(
         calc_distance,
-        spatial_expansion_factor=1000000,
+        spatial_expansion_factor=spatial_expansion_factor,
         rows_without_galaxies=rows_without_galaxies,
         cols_without_galaxies=cols_without_galaxies,
     )
@@ -114,7 +87,8 @@ def part2(data: str) -> int:
             # Those above it.
             for other_idx, other_row in enumerate(space):
                 distances.extend([get_dist((len(space), this_galaxy), (other_idx, other_galaxy)) for other_galaxy in other_row])
-    print(distances)
+    if trace.DEBUG_ON:
+        trace.emit(str(distances))
     return sum(distances)
 
 def calc_distance(
@@ -140,7 +114,7 @@ def calc_distance(
     return distance
 
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['11']))
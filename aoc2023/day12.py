@@ -3,6 +3,10 @@
 import re
 from pathlib import Path
 
+from aoc2023.memo import memoize
+from aoc2023.parse_cache import cached_parse
+from aoc2023.streaming import Input, records
+
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'day12')
@@ -12,11 +16,20 @@ BROKEN = "#"
 OPERATIONAL = "."
 UNSURE = "?"
 
-def part1(data: str) -> int:
+@cached_parse
+def parse(data: str) -> tuple[tuple[str, tuple[int]]]:
+    """Return (springs, sizes of damaged groups) for each row."""
+    return tuple(parse_row(row) for row in data.splitlines())
+
+
+def parse_row(row: str) -> tuple[str, tuple[int]]:
+    springs, damaged = row.split()
+    return springs, tuple(int(x) for x in damaged.split(','))
+
+
+def part1(data: Input) -> int:
     total = 0
-    for row in data.splitlines():
-        springs, damaged = row.split()
-        n_damageds = [int(x) for x in damaged.split(',')]
+    for springs, n_damageds in records(data, parse, parse_row):
         is_damaged_list = []
         for n_damaged in n_damageds:
             for _ in range(n_damaged):
@@ -30,11 +43,9 @@ def part1(data: str) -> int:
     return total
 
 
-def part2(data: str) -> int:
+def part2(data: Input) -> int:
     total = 0
-    for row in data.splitlines():
-        springs, damaged = row.split()
-        n_damageds = [int(x) for x in damaged.split(',')]
+    for springs, n_damageds in records(data, parse, parse_row):
         is_damaged_list = []
         for n_damaged in n_damageds:
             for _ in range(n_damaged):
@@ -56,6 +67,17 @@ def part2(data: str) -> int:
     return total
 
 
+def solve(data: str) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
+
+
+# Rows come back every time the same input is solved again, and (unfolded) in
+# part 2 as well.
+@memoize(
+    max_entries=4096,
+    key=lambda springs, is_damaged_list: (springs, tuple(is_damaged_list)),
+)
 def count_arrangements(springs: str, is_damaged_list: list[bool]) -> int:
     """
     Full credit to Reddit.
@@ -118,7 +140,7 @@ def count_arrangements(springs: str, is_damaged_list: list[bool]) -> int:
 
 
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['12']))
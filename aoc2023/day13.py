@@ -2,63 +2,68 @@
 
 from pathlib import Path
 
+from aoc2023 import trace
+from aoc2023.grid import Grid
+from aoc2023.parse_cache import cached_parse
+
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'day13')
 
 
+# '#' = 1, '.' = 0
+BINARY = bytes.maketrans(b'.#', b'01')
+
+
+@cached_parse
+def parse(data: str) -> tuple[tuple[str, list[int], list[int]]]:
+    """
+    Return each pattern's text, rows, and columns.
+
+    Rows and columns are read as binary numbers (# = 1) so comparing two of
+    them is a single integer comparison.
+
+    """
+    patterns = []
+    for pattern in data.split("\n\n"):
+        grid = Grid.from_text(pattern)
+        rows = [int(row.tobytes().translate(BINARY), base=2) for row in grid.rows()]
+        cols = [int(col.tobytes().translate(BINARY), base=2) for col in grid.cols()]
+        patterns.append((str(grid), rows, cols))
+    return tuple(patterns)
+
+
 def part1(data: str) -> int:
     total = 0
-    for pattern in data.split("\n\n"):
-        # Prepare to convert to binary numbers.
-        pattern = pattern.replace('.', '0').replace('#', '1')
-        rows = []
-        cols = []
-        for row in pattern.splitlines():
-            rows.append(''.join(row))
-            for idx, c in enumerate(row):
-                try:
-                    cols[idx] += c
-                except IndexError:
-                    cols.append(c)
-
-        rows = [int(row, base=2) for row in rows]
-        cols = [int(col, base=2) for col in cols]
+    for pattern, rows, cols in parse(data):
         horz_refl = find_pattern_line(rows)
         vert_refl = find_pattern_line(cols)
-        if horz_refl and vert_refl:
-            print(f"Found a reflection in both directions for\n{pattern}")
-        if not horz_refl and not vert_refl:
-            print(f"Found neither for {pattern}!")
+        if trace.INFO_ON and horz_refl and vert_refl:
+            trace.emit(f"Found a reflection in both directions for\n{pattern}")
+        if trace.INFO_ON and not horz_refl and not vert_refl:
+            trace.emit(f"Found neither for {pattern}!")
         total += vert_refl + 100*horz_refl
     return total
 
 
 def part2(data: str) -> int:
     total = 0
-    for pattern in data.split("\n\n"):
-        # Prepare to convert to binary numbers.
-        pattern = pattern.replace('.', '0').replace('#', '1')
-        rows = []
-        cols = []
-        for row in pattern.splitlines():
-            rows.append(''.join(row))
-            for idx, c in enumerate(row):
-                try:
-                    cols[idx] += c
-                except IndexError:
-                    cols.append(c)
-
-        rows = [int(row, base=2) for row in rows]
-        cols = [int(col, base=2) for col in cols]
+    for pattern, rows, cols in parse(data):
         horz_refl = find_smudge(rows)
         vert_refl = find_smudge(cols)
-        if horz_refl and vert_refl:
-            print(f"Found vert @ {vert_refl} and horz @ {horz_refl} for\n{pattern}")
+        if trace.INFO_ON and horz_refl and vert_refl:
+            trace.emit(
+                f"Found vert @ {vert_refl} and horz @ {horz_refl} for\n{pattern}"
+            )
         total += vert_refl + 100*horz_refl
     return total
 
 
+def solve(data: str) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
+
+
 def find_smudge(lines: list[int]) -> int:
     """Check for integers that are different by a single bit."""
     # First check for a smudge on the mirror line.
@@ -135,7 +140,7 @@ def check_for_reflection_after_idx_with_one_smudge(list_: list[int], idx: int) -
 
 
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['13']))
@@ -1,241 +1,149 @@
 """Day N."""
 
-from copy import deepcopy
-from collections import namedtuple
-from functools import partial
+import hashlib
 from pathlib import Path
+from typing import Union
+
+from aoc2023 import checkpoint, deadline, metrics
+from aoc2023.grid import Grid, as_grid
+from aoc2023.parse_cache import cached_parse
 
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'day14')
 
+# The runner maps the input file rather than reading it (see aoc2023.grid).
+load = Grid.from_file
+
 
-# X -> column, Y -> row, measured from bottom left.
-Position = namedtuple("Position", ['x', 'y'])
+ROCK = ord('O')
+CUBE = ord('#')
+EMPTY = ord('.')
 
+# What part 2 saves its progress as (see aoc2023.checkpoint).
+SPIN_CYCLES = 'day14.spin_cycles'
 
-def part1(data: str) -> int:
-    # LUT by column since moving north.
-    width = data.find('\n')
-    height = data.count('\n')
-    sort_lut_lists_ = partial(sort_lut_lists, asc=True)
 
-    cubes_cols = dict()
-    mobile_rocks_cols = dict()
-    for y, row in enumerate(reversed(data.splitlines())):
-        for x, symbol in enumerate(row):
-            if symbol == 'O':
-                add_to_lut(x, y, mobile_rocks_cols)
-            elif symbol == '#':
-                add_to_lut(x, y, cubes_cols)
-    sort_lut_lists_(cubes_cols)
-    sort_lut_lists_(mobile_rocks_cols)
+@cached_parse
+def parse(data: Union[str, Grid]) -> Grid:
+    """Return the platform."""
+    return as_grid(data)
 
-    # Add a barrier to the top.
-    for col in range(width):
-        add_to_lut(col, height, cubes_cols)
 
-    # We've now found where they all are. To move them north, for each movable
-    # rock, I need to move it up until it hits a stationary rock. Doesn't matter
-    # if I do this in order (my rocks can 'jump' over others) since they don't
-    # have varying masses.
+def part1(data: Union[str, Grid]) -> int:
+    # Rocks get moved around, so work on a copy.
+    grid = parse(data).copy()
+
+    # To move them north, each movable rock needs to move up until it hits a
+    # stationary rock (or one that has already stopped). Going down each column
+    # from the top, that's just the next free spot.
     #
     # Still need to keep track of cubes to exclude them from the mass
     # calculation.
-    moved_rocks_cols = evaluate_tilt(cubes_cols, mobile_rocks_cols, 1)
+    tilt(grid, tilt_lines(grid)[0])
+    return compute_load(grid)
+
+
+def part2(data: Union[str, Grid]) -> int:
+    # Rocks get moved around, so work on a copy.
+    grid = parse(data).copy()
+    lines = tilt_lines(grid)
+
+    N_SPINS = 500
+    # The load after each spin, and the spin after which each arrangement of
+    # rocks (by digest, to keep it small) was first seen.
+    loads = []
+    seen = dict()
+    first_cycle = 0
+    # Another thread can start checkpointing part way through, but this one
+    # has its own session (or none) throughout, so look once.
+    checkpointing = checkpoint.ACTIVE
+    if checkpointing:
+        key = checkpoint.key(grid.cells, grid.width)
+        saved = checkpoint.load(SPIN_CYCLES, key)
+        if saved is not None:
+            first_cycle, cells, loads, seen = saved
+            grid.cells[:] = cells
+    for i in range(first_cycle, N_SPINS):
+        out_of_time = deadline.ACTIVE and deadline.expired()
+        if checkpointing and (out_of_time or checkpoint.due()):
+            checkpoint.save(SPIN_CYCLES, key, (i, bytes(grid.cells), loads, seen))
+        if out_of_time:
+            best = loads[-1] if loads else None
+            return deadline.Partial(best, {'cycles': i, 'of': N_SPINS})
+        run_one_spin_cycle(grid, lines)
+        if metrics.ON:
+            metrics.count('day14.spin_cycles')
+        total_load = compute_load(grid)
+        loads.append(total_load)
+        # Once the rocks settle into a loop, the rest of the spins just go round
+        # it, so skip to where the last one lands.
+        arrangement = hashlib.blake2b(grid.cells, digest_size=16).digest()
+        if arrangement in seen:
+            start = seen[arrangement]
+            total_load = loads[start + (N_SPINS - 1 - start) % (i - start)]
+            break
+        seen[arrangement] = i
+    if checkpointing:
+        checkpoint.done(SPIN_CYCLES)
+
+    return total_load
 
-    moved_rocks_rows = transpose_lut(moved_rocks_cols)
-    # print_rows_lut(moved_rocks_rows, transpose_lut(cubes_cols), width)
+# 93730 is too low.
 
-    total = 0
-    for row_idx, row in moved_rocks_rows.items():
-        total += len(row)*(row_idx+1)
 
-    return total
+def solve(data: Union[str, Grid]) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
 
 
-def part2(data: str) -> int:
-    # LUT by column since moving north.
-    width = data.find('\n')
-    height = data.count('\n')
-    sort_lut_lists_ = partial(sort_lut_lists, asc=True)
-
-    cubes_cols = dict()
-    mobile_rocks_cols = dict()
-    for y, row in enumerate(reversed(data.splitlines())):
-        for x, symbol in enumerate(row):
-            if symbol == 'O':
-                add_to_lut(x, y, mobile_rocks_cols)
-            elif symbol == '#':
-                add_to_lut(x, y, cubes_cols)
-    sort_lut_lists_(cubes_cols)
-    sort_lut_lists_(mobile_rocks_cols)
-
-    # Add a barrier to the borders.
-    for col in range(width):
-        # To the top and bottom.
-        add_to_lut(col, height, cubes_cols)
-        add_to_lut(col, -1, cubes_cols)
-    sort_lut_lists_(cubes_cols)
-    # To the sides.
-    cubes_cols[-1] = list(range(height))
-    cubes_cols[width] = list(range(height))
-
-    # We've now found where they all are. To move them north, for each movable
-    # rock, I need to move it up until it hits a stationary rock. Doesn't matter
-    # if I do this in order (my rocks can 'jump' over others) since they don't
-    # have varying masses.
-    #
-    # Still need to keep track of cubes to exclude them from the mass
-    # calculation.
-    previous_loads = []
-    N_CYCLES = 1000000000
-    for i in range(500):
-        next_mobile_cols = run_one_spin_cycle(cubes_cols, mobile_rocks_cols)
-        load = compute_load(next_mobile_cols)
-        if load in previous_loads:
-            offset = previous_loads.index(load)
-            # Zero out the previously measured one so I can allow the cycles to
-            # settle out.
-            previous_loads[offset] = -1
-            # Check if (assuming it cycles) this will land on N_CYCLES.
-            freq = i - offset
-            print(f"Found a repeat ({load}) with offset {offset} with frequency {freq}.")
-            if i > 7 and (N_CYCLES - offset - 1) % freq == 0:
-                print(f"Expecting {load} to be the load at {N_CYCLES}")
-                # return load
-        previous_loads.append(load)
-        mobile_rocks_cols = next_mobile_cols
-
-    print(f"Measured loads: {previous_loads}")
-    # print("Final:")
-    # print_rows_lut(transpose_lut(next_mobile_cols), transpose_lut(cubes_cols), width)
-
-    return load
+def tilt_lines(grid: Grid) -> tuple[tuple[range]]:
+    """
+    Return the lines rocks roll along for north, west, south and east tilts.
 
-# 93730 is too low.
+    Each line starts at the edge the rocks roll toward.
 
+    """
+    north = tuple(grid.col_indices(x) for x in range(grid.width))
+    west = tuple(grid.row_indices(y) for y in range(grid.height))
+    south = tuple(line[::-1] for line in north)
+    east = tuple(line[::-1] for line in west)
+    return north, west, south, east
 
-def move_rock_along_file_until_stopped(
-    rock_pos: int,
-    stationary_rocks: list[int],
-    mobile_rocks: list[int],
-    direction: int,
-) -> Position:
-    rocks = stationary_rocks.copy()
-    if rock_pos in rocks:
-        raise NotImplementedError()
-    rocks.append(rock_pos)
-    rocks.sort()
-    idx = rocks.index(rock_pos)
-    lands_against = rocks[idx+direction]
 
-    potential_pos = lands_against - direction
+def tilt(grid: Grid, lines: tuple[range]) -> None:
+    """(Side effect) Roll every rock as far along its line as it'll go."""
+    cells = grid.cells
+    for line in lines:
+        # Where the next rock to roll along this line stops.
+        free = 0
+        for k, i in enumerate(line):
+            cell = cells[i]
+            if cell == CUBE:
+                free = k + 1
+            elif cell == ROCK:
+                if k != free:
+                    cells[line[free]] = ROCK
+                    cells[i] = EMPTY
+                free += 1
 
-    while potential_pos in mobile_rocks:
-        potential_pos -= direction
 
-    return potential_pos
+def run_one_spin_cycle(grid: Grid, lines: tuple[tuple[range]]) -> None:
+    """(Side effect) Tilt north, west, south, then east."""
+    for direction in lines:
+        tilt(grid, direction)
 
 
-def compute_load(mobile_rocks_rows: dict[int, list]) -> int:
-    """Slick way to hash these big dictionaries."""
-    mobile_rocks_rows = transpose_lut(mobile_rocks_rows)
+def compute_load(grid: Grid) -> int:
+    """Each rock weighs as much as its distance from the south edge."""
     total = 0
-    for row_idx, row in mobile_rocks_rows.items():
-        total += len(row)*(row_idx+1)
+    for y in range(grid.height):
+        total += grid.count(b'O', y) * (grid.height - y)
     return total
 
 
-def run_one_spin_cycle(
-    cubes_cols: dict[int, list],
-    mobile_rocks_cols: dict[int, list],
-) -> dict[int, list]:
-    cubes_rows = transpose_lut(cubes_cols)
-    width = max(cubes_cols.keys())
-    # print("Start cycle:")
-    # print_rows_lut(transpose_lut(mobile_rocks_cols), cubes_rows, width)
-
-    tilted_north = evaluate_tilt(cubes_cols, mobile_rocks_cols, 1)
-    # print("Tilted North:")
-    # print_rows_lut(transpose_lut(tilted_north), cubes_rows, width)
-
-    tilted_west = evaluate_tilt(cubes_rows, transpose_lut(tilted_north), -1)
-    # print("Tilted West:")
-    # print_rows_lut(tilted_west, cubes_rows, width)
-
-    tilted_south = evaluate_tilt(cubes_cols, transpose_lut(tilted_west), -1)
-    # print("Tilted South:")
-    # print_rows_lut(transpose_lut(tilted_south), cubes_rows, width)
-
-    tilted_east = evaluate_tilt(cubes_rows, transpose_lut(tilted_south), 1)
-    # print("Tilted East:")
-    # print_rows_lut(tilted_east, cubes_rows, width)
-
-    spun = transpose_lut(tilted_east)
-    return spun
-
-
-def evaluate_tilt(
-    cubes_cols: dict[int, list],
-    mobile_rocks_cols: dict[int, list],
-    direction: int,
-) -> dict[int, list]:
-    stationary_rocks_cols = deepcopy(cubes_cols)
-    new_mobile_rocks = dict()
-    for idx, col in mobile_rocks_cols.items():
-        while col:
-            # Get the rock closest to the top of the map.
-            next_rock = col.pop()
-            new_pos = move_rock_along_file_until_stopped(
-                next_rock,
-                stationary_rocks_cols.get(idx, []),
-                col,
-                direction,
-            )
-            stationary_rocks_cols[idx].append(new_pos)
-            stationary_rocks_cols[idx].sort()
-            add_to_lut(idx, new_pos, new_mobile_rocks)
-    return new_mobile_rocks
-
-
-def transpose_lut(rocks: dict[int, list]) -> dict[int, list]:
-    """Switch from lut[x] = [y1, y2, ...] to lux[y] = [x1, x2, ...]"""
-    new_lut = dict()
-    for x, list_y in rocks.items():
-        for y in list_y:
-            add_to_lut(y, x, new_lut)
-    return new_lut
-
-
-def sort_lut_lists(lut: dict[int, list], asc: bool) -> None:
-    """(Side effect) Sort ascending."""
-    for list_ in lut.values():
-        list_.sort(reverse=not asc)
-
-
-def add_to_lut(key: int, value: int, lut: dict[int, list]) -> None:
-    """(Side effect) Specifically for adding to lists in the luts."""
-    try:
-        lut[key].append(value)
-    except KeyError:
-        lut[key] = [value]
-
-
-def print_rows_lut(mobile: dict[int, list], stuck: dict[int, list], width: int) -> None:
-    for i in reversed(range(max(stuck.keys()))):
-        for j in range(width):
-            if j in mobile.get(i, []):
-                print("O", end="")
-            elif j in stuck.get(i, []):
-                print("#", end="")
-            else:
-                print(".", end="")
-        print()
-
-
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['14']))
@@ -1,16 +1,33 @@
 """Day N."""
 
 from pathlib import Path
+from typing import Iterable
+
+from aoc2023.parse_cache import cached_parse
+from aoc2023.streaming import Input, fields
 
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'day15')
 
 
-def part1(data: str) -> int:
-    data = data.strip()
+@cached_parse
+def parse(data: str) -> tuple[str]:
+    """Return the initialization sequence's steps."""
+    return tuple(data.strip().split(","))
+
+
+def steps(data: Input) -> Iterable[str]:
+    """Return the steps, streamed if the input isn't a str."""
+    # The sequence is one (potentially enormous) line, so split on commas.
+    if isinstance(data, str):
+        return parse(data)
+    return fields(data, ",")
+
+
+def part1(data: Input) -> int:
     total = 0
-    for step in data.split(","):
+    for step in steps(data):
         hash_ = 0
         for c in step:
             hash_ += ord(c)
@@ -21,11 +38,9 @@ def part1(data: str) -> int:
 
 
 
-def part2(data: str) -> int:
-    data = data.strip()
-
+def part2(data: Input) -> int:
     hashmap = dict()
-    for step in data.split(","):
+    for step in steps(data):
         try:
             label, focal_length = step.split("=")
             focal_length = int(focal_length)
@@ -82,8 +97,13 @@ def part2(data: str) -> int:
     return total
 
 
+def solve(data: str) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
+
+
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['15']))
@@ -2,11 +2,19 @@
 
 from enum import IntEnum
 from pathlib import Path
+from typing import Optional, Union
+
+from aoc2023 import metrics
+from aoc2023.grid import Grid, as_grid
+from aoc2023.parse_cache import cached_parse
 
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'day16')
 
+# The runner maps the input file rather than reading it (see aoc2023.grid).
+load = Grid.from_file
+
 
 class Direction(IntEnum):
     # Ordered clockwise
@@ -16,26 +24,25 @@ class Direction(IntEnum):
     DOWN = 3
 
 
-def part1(data: str) -> int:
-    wall_width = data.find('\n')
-    wall_height = data.count('\n')
-    Beam.wall_width = wall_width
-    Beam.wall_height = wall_height
+@cached_parse
+def parse(data: Union[str, Grid]) -> Grid:
+    """Return the wall."""
+    return as_grid(data)
 
-    for y, row in enumerate(reversed(data.splitlines())):
-        for x, char in enumerate(row):
-            if char == ".":
-                continue
-            # print(f"{char} at {x}, {y}")
-            Beam.actors[(x, y)] = char
+
+def part1(data: Union[str, Grid]) -> int:
+    wall = Wall(parse(data))
 
     beams = set()
-    beams.add(Beam(-1, wall_height - 1, Direction.RIGHT))
+    beams.add(Beam(-1, wall.height - 1, Direction.RIGHT, wall))
 
     for i in range(10000):
         # print(beams)
         new_beams = set()
         dead_beams = set()
+        if metrics.ON:
+            metrics.count('day16.beam_steps', len(beams))
+            metrics.high_water('day16.beams', len(beams))
         for beam in beams:
             # beam.print_me()
             is_on_wall = beam.step()
@@ -50,26 +57,17 @@ def part1(data: str) -> int:
         beams.difference_update(dead_beams)
         if not beams:
             break
-    # print(Beam.visited)
-    # Beam.print_visited()
+    # wall.print_visited()
     # Subtract 1 because I'm starting off screen.
-    return len(Beam.visited) - 1
+    return wall.n_visited() - 1
 
 # 1xxx too low
 # 7544 too high
 
-def part2(data: str) -> int:
-    wall_width = data.find('\n')
-    wall_height = data.count('\n')
-    Beam.wall_width = wall_width
-    Beam.wall_height = wall_height
-
-    for y, row in enumerate(reversed(data.splitlines())):
-        for x, char in enumerate(row):
-            if char == ".":
-                continue
-            # print(f"{char} at {x}, {y}")
-            Beam.actors[(x, y)] = char
+def part2(data: Union[str, Grid]) -> int:
+    grid = parse(data)
+    wall_width = grid.width
+    wall_height = grid.height
 
     beams = set()
     starting_positions = [(x-1, -1, Direction.UP) for x in range(wall_width)]
@@ -80,12 +78,15 @@ def part2(data: str) -> int:
     total = 0
     for starting_position in starting_positions:
         beams = set()
-        Beam.visited_dir = set()
-        beams.add(Beam(*starting_position))
+        wall = Wall(grid)
+        beams.add(Beam(*starting_position, wall))
         for i in range(10000):
             # print(beams)
             new_beams = set()
             dead_beams = set()
+            if metrics.ON:
+                metrics.count('day16.beam_steps', len(beams))
+                metrics.high_water('day16.beams', len(beams))
             for beam in beams:
                 # beam.print_me()
                 is_on_wall = beam.step()
@@ -101,22 +102,74 @@ def part2(data: str) -> int:
             if not beams:
                 break
         # Subtract 1 because I'm starting off-screen.
-        total = max(total, len(Beam.visited) - 1)
+        total = max(total, wall.n_visited() - 1)
     return total
 
 
+def solve(data: Union[str, Grid]) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
+
+
+class Wall:
+    """The contraption, and where one run's beams have been on and around it."""
+
+    __slots__ = ('grid', 'width', 'height', 'energized', 'off_wall')
+
+    def __init__(self, grid: Grid) -> None:
+        self.grid = grid
+        self.width = grid.width
+        self.height = grid.height
+        # By flat grid index, the directions (as 1 << dir) beams have left in.
+        self.energized = bytearray(len(grid))
+        # Set of tuples (x, y, dir) for positions off the wall (where beams
+        # start).
+        self.off_wall = set()
+
+    def n_visited(self) -> int:
+        """Return the number of positions visited, ignoring direction."""
+        n_on_wall = len(self.energized) - self.energized.count(0)
+        return n_on_wall + len({(x, y) for x, y, _ in self.off_wall})
+
+    @property
+    def visited(self) -> set[tuple[int]]:
+        """Return without direction."""
+        visited = {(x, y) for x, y, _ in self.off_wall}
+        for i, directions in enumerate(self.energized):
+            if directions:
+                x, y = self.grid.xy(i)
+                visited.add((x, self.height - 1 - y))
+        return visited
+
+    def print_visited(self) -> None:
+        visited = self.visited
+        for y in reversed(range(self.height)):
+            for x in range(self.width):
+                if (x, y) in visited:
+                    print("#", end="")
+                else:
+                    print(".", end="")
+            print()
+
+
 class Beam:
-    # Class properties.
-    wall_width = 0
-    wall_height = 0
-    actors = dict()
-    # Set of tuples (x, y, dir)
-    visited_dir = set()
-
-    def __init__(self, x: int, y: int, direction: Direction) -> None:
+    # Note that y counts up from the bottom of the grid.
+
+    # Beams come and go by the thousand, so skip the per-instance __dict__.
+    __slots__ = ('x', 'y', 'dir', 'wall')
+
+    def __init__(
+        self,
+        x: int,
+        y: int,
+        direction: Direction,
+        wall: Optional[Wall] = None,
+    ) -> None:
         self.x = x
         self.y = y
         self.dir = direction
+        # Beams that split off share the wall of the beam they came from.
+        self.wall = wall
 
     def __repr__(self):
         return f"Beam ({self.x}, {self.y}) going {self.dir}"
@@ -125,20 +178,32 @@ class Beam:
     def position(self) -> tuple[int]:
         return self.x, self.y
 
-    @classmethod
     @property
-    def visited(cls) -> set[tuple[int]]:
-        """Return without direction."""
-        return set([(x, y) for x, y, _ in cls.visited_dir])
+    def index(self) -> int:
+        """Flat index into the grid (which counts y from the top)."""
+        wall = self.wall
+        return wall.grid.index(self.x, wall.height - 1 - self.y)
+
+    @property
+    def is_on_wall(self) -> bool:
+        return 0 <= self.x < self.wall.width and 0 <= self.y < self.wall.height
 
     def step(self) -> bool:
         """Returns True if still on the map and not repeating a previous
         path."""
-        pos_dir = (*self.position, self.dir)
-        if pos_dir in self.visited_dir:
-            return False
+        wall = self.wall
+        if self.is_on_wall:
+            i = self.index
+            bit = 1 << self.dir
+            if wall.energized[i] & bit:
+                return False
+            wall.energized[i] |= bit
+        else:
+            pos_dir = (*self.position, self.dir)
+            if pos_dir in wall.off_wall:
+                return False
+            wall.off_wall.add(pos_dir)
 
-        self.visited_dir.add(pos_dir)
         if self.dir == Direction.LEFT:
             self.x -= 1
         elif self.dir == Direction.RIGHT:
@@ -147,14 +212,14 @@ class Beam:
             self.y -= 1
         elif self.dir == Direction.UP:
             self.y += 1
-        if self.x < 0 or self.x >= self.wall_width or self.y < 0 or self.y >= self.wall_height:
+        if self.x < 0 or self.x >= wall.width or self.y < 0 or self.y >= wall.height:
             return False
         return True
 
     def act_on_position(self):
         """Returns the split beam if split."""
-        tile_type = self.actors.get(self.position, "")
-        if not tile_type:
+        tile_type = chr(self.wall.grid.cells[self.index])
+        if tile_type == ".":
             return
         # Turn direction depends on if the thing is moving in a right-handed or
         # left-handed direction (odd or even). Use this as a sign on the turn.
@@ -174,13 +239,13 @@ class Beam:
                 return
             # Split.
             self.dir = Direction.UP
-            return Beam(*self.position, Direction.DOWN)
+            return Beam(*self.position, Direction.DOWN, self.wall)
         elif tile_type == "-":
             if self.dir == Direction.LEFT or self.dir == Direction.RIGHT:
                 return
             # Split.
             self.dir = Direction.LEFT
-            return Beam(*self.position, Direction.RIGHT)
+            return Beam(*self.position, Direction.RIGHT, self.wall)
 
     def turn(self, hand):
         if hand == 1:
@@ -192,13 +257,15 @@ class Beam:
 
     def print_me(self) -> None:
         print(self)
-        for y in reversed(range(self.wall_height)):
-            for x in range(self.wall_width):
-                if (x, y) in self.actors:
+        wall = self.wall
+        for y in reversed(range(wall.height)):
+            for x in range(wall.width):
+                tile_type = chr(wall.grid[x, wall.height - 1 - y])
+                if tile_type != ".":
                     if x == self.x and y == self.y:
                         print("*", end="")
                     else:
-                        print(self.actors[(x, y)], end="")
+                        print(tile_type, end="")
                 elif x == self.x and y == self.y:
                     if self.dir == Direction.LEFT:
                         print("<", end="")
@@ -212,18 +279,8 @@ class Beam:
                     print(".", end="")
             print()
 
-    @classmethod
-    def print_visited(cls) -> None:
-        for y in reversed(range(cls.wall_height)):
-            for x in range(cls.wall_width):
-                if (x, y) in cls.visited:
-                    print("#", end="")
-                else:
-                    print(".", end="")
-            print()
-
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['16']))
@@ -4,39 +4,59 @@ from dataclasses import dataclass
 from enum import IntEnum
 from pathlib import Path
 
+from aoc2023 import trace
+from aoc2023.parse_cache import cached_parse
+from aoc2023.streaming import Input, records
+
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'day18')
 
 
-def part1(data: str) -> int:
+@cached_parse
+def parse(data: str) -> tuple[tuple[str, int, str]]:
+    """Return (direction, number of steps, color hex) for each step of the plan."""
+    return tuple(parse_step(step) for step in data.splitlines())
+
+
+def parse_step(step: str) -> tuple[str, int, str]:
+    direction_s, number_s, color_s = step.split()
+    return direction_s, int(number_s), color_s.strip("#()")
+
+
+def part1(data: Input) -> int:
     digger = Digger()
-    for step in data.splitlines():
-        direction_s, number_s, color_s = step.split()
-        n = int(number_s)
-        color = int(color_s.strip("#()"), base=16)
+    for direction_s, n, color_s in records(data, parse, parse_step):
+        color = int(color_s, base=16)
         digger.move(direction_s, n, color)
 
     return digger.hole_volume
 
 
-def part2(data: str) -> int:
+def part2(data: Input) -> int:
     digger = Digger()
     directions = ['r', 'd', 'l', 'u']
-    for step in data.splitlines():
-        _, _, color_s = step.split()
-        color_s = color_s.strip("#()")
+    for _, _, color_s in records(data, parse, parse_step):
         digger.move(directions[int(color_s[-1])], int(color_s[:-1], base=16), "")
 
     return digger.hole_volume
 
 
+def solve(data: str) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
+
 
 class Digger:
+    __slots__ = ('x', 'y', 'n_vertices', 'twice_area', 'perimeter')
+
     def __init__(self) -> None:
         self.x = 0
         self.y = 0
-        self.visited_pos = [self.position]
+        self.n_vertices = 0
+        # Twice the signed area, summed one edge at a time as we dig so the
+        # vertices don't need to be kept.
+        self.twice_area = 0
         self.perimeter = 0
 
     @property
@@ -45,32 +65,32 @@ class Digger:
 
     @property
     def hole_volume(self) -> int:
-        area = 0
-        vertices = self.visited_pos
-        n_vertices = len(vertices) - 1
-        for i in range(n_vertices):
-            p_i = vertices[i]
-            p_i_p1 = vertices[i+1]
-            # Trapezoid formula/Shoelace formula. Compute trapezoidal areas to
-            # the bounding box with a sign depending on the direction of the
-            # segment on the polygon being measured. Alternating signs cancels
-            # out any external area. Math!
-            area += (p_i[1] + p_i_p1[1]) * (p_i[0] - p_i_p1[0])
-        area /= 2
+        n_vertices = self.n_vertices
+        area = self.twice_area / 2
         # Assert counterclockwiseness.
         area = abs(area)
 
         # Pick's theorem
         n_internal_points = area - self.perimeter/2 + 1
-        print(n_vertices, area, n_internal_points)
+        if trace.INFO_ON:
+            trace.emit(f"{n_vertices=}, {area=}, {n_internal_points=}")
         return n_internal_points + self.perimeter
 
     def move(self, dir: str, n: int, color: int) -> None:
         # Mark the current position as two-directional.
+        x, y = self.position
         self._move_dir(dir, n)
-        self.visited_pos.append(self.position)
+        # Trapezoid formula/Shoelace formula. Compute trapezoidal areas to
+        # the bounding box with a sign depending on the direction of the
+        # segment on the polygon being measured. Alternating signs cancels
+        # out any external area. Math!
+        self.twice_area += (y + self.y) * (x - self.x)
+        self.n_vertices += 1
         self.perimeter += n
-        print(self.position, dir, color)
+        if trace.ON:
+            trace.count('day18.moves')
+        if trace.DEBUG_ON:
+            trace.emit(f"{self.position} {dir} {color}")
 
     def _move_dir(self, dir: str, n_steps: int) -> None:
         dir = dir.casefold()
@@ -91,7 +111,7 @@ class Digger:
 
 
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['18']))
@@ -4,6 +4,11 @@ import re
 from collections import namedtuple
 from functools import partial
 from pathlib import Path
+from typing import Iterator
+
+from aoc2023 import trace
+from aoc2023.intervals import Box
+from aoc2023.parse_cache import cached_parse
 
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
@@ -12,10 +17,14 @@ INPUT_FILE = Path(INPUTS_DIR, 'day19')
 PART_ATTRS = re.compile(r"\d+")
 MIN_VALUE = 1
 MAX_VALUE = 4000
+# The ratings, in the order of a Box's dimensions.
+ATTRS = 'xmas'
 
 Step = namedtuple("Step", ["attr", "min", "max", "goto", "description"])
 
-def part1(data: str) -> int:
+@cached_parse
+def parse(data: str) -> tuple[dict[str, list[Step]], tuple[dict[str, int]]]:
+    """Return the {name: steps} workflows and the parts' ratings."""
     workflows_s, parts_s = data.split("\n\n")
 
     # For each step, store the attribute to check and the bounds it should fall
@@ -62,17 +71,25 @@ def part1(data: str) -> int:
         workflows[name] = steps
     # print(workflows)
 
-    accepted = []
-    rejected = []
+    parts = []
     for part_s in parts_s.splitlines():
         # print(part_s)
         x, m, a, s = PART_ATTRS.findall(part_s)
-        part = {
+        parts.append({
             'x': int(x),
             'm': int(m),
             'a': int(a),
             's': int(s),
-        }
+        })
+    return workflows, tuple(parts)
+
+
+def part1(data: str) -> int:
+    workflows, parts = parse(data)
+
+    accepted = []
+    rejected = []
+    for part in parts:
         workflow = workflows['in']
         # print("Running in")
         while True:
@@ -93,111 +110,40 @@ def part1(data: str) -> int:
 
 
 def part2(data: str) -> int:
-    # For each workflow, store a list of steps.
-    #
-    # Each step defines the bounds which x,m,a,s must fall into. A default step
-    # has the bounds (0, 4000), (0, 4000), (0, 4000), (0, 4000).
-    #
-    # For each step, create two new Bounds: one which falls into the set
-    # defined, and one which falls outside of the set defined.
-    #
-    # e.g.
-    #
-    #    qqz{ s>2770:qa,m<1801:hdj,R}
-    #
-    # Becomes
-    # 'qqz' = [
-    #     ('s', 2771, 4000, 'qa')
-    #     ('m', 0, 1800, 'hdj')
-    #     (None, None, None, 'R')
-    # ]
-    #
-    # Then, to process, if Bounds entering qqz is
-    #
-    #     (0, 4000), (0, 4000), (0, 4000), (1351, 4000)
-    #
-    # Bounds will split into
-    #
-    #     (0, 4000), (0, 4000), (0, 4000), (2771, 4000) -> 'qa'  (First passes)
-    #     (0, 4000), (0, 1800), (0, 4000), (1351, 2770) -> 'hdj'  (Second passes)
-    #     (0, 4000), (1801, 4000), (0, 4000), (1351, 4000) -> 'R'  (Default)
-    #
-    # For first pass: checking 's'. To pass, take max of s[0], and min of s[1]
-    #   To fail: if bound_s[0] == 0, take max(bound_s[1] + 1, s[0]), and s[1]
-    #            if bound_s[1] == 4000, take s[0] and min(bound_s[0]-1, s[1])
-
-    workflows_s, _ = data.split("\n\n")
-    workflows = dict()
-    for workflow in workflows_s.splitlines():
-        name, steps_s = workflow.split("{")
-        # print(f"Parsing workflow {name}")
-        steps = []
-        for step in steps_s.split(","):
-            if step.endswith("}"):
-                # Final step, this is a default.
-                steps.append(Step(None, None, None, step[:-1], f"else --> {step[:-1]}"))
-                break
-            attr = step[0]
-            comparator = step[1]
-            compare_to, goto = step[2:].split(":")
-            create_step = partial(
-                Step,
-                description=f"{attr} {comparator} {compare_to} --> {goto}",
-            )
-            if comparator == "<":
-                step = create_step(attr, MIN_VALUE, int(compare_to)-1, goto)
-            elif comparator == ">":
-                step = create_step(attr, int(compare_to)+1, MAX_VALUE, goto)
-            else:
-                raise RuntimeError("AHHHH")
-
-            steps.append(step)
-        workflows[name] = steps
-    # print(workflows)
-
-    boundses = [{
-        'goto': 'in',
-        'x': (MIN_VALUE, MAX_VALUE),
-        'm': (MIN_VALUE, MAX_VALUE),
-        'a': (MIN_VALUE, MAX_VALUE),
-        's': (MIN_VALUE, MAX_VALUE),
-    }]
-
-    accepted_bounds = []
-    # while boundses:
-    while boundses:
-        bounds = boundses.pop()
-        workflow = workflows[bounds['goto']]
-        print(f"\nPopped {bounds}")
-        for new_bounds in split_bounds_for_workflow(workflow, bounds):
-            print(f"Got {new_bounds}.")
-            if new_bounds['goto'] == "A":
-                accepted_bounds.append(new_bounds)
+    # Every combination of ratings is a point in a 4-d box, x by m by a by s.
+    # Follow the whole box through the workflows: each step cuts what reaches
+    # it in two across one rating, the part that passes going to the step's
+    # workflow and the rest on to the next step. The accepted boxes never
+    # overlap, so the answer is the sum of their volumes.
+    workflows, _ = parse(data)
+
+    boxes = [(Box([(MIN_VALUE, MAX_VALUE + 1)] * len(ATTRS)), 'in')]
+    total = 0
+    while boxes:
+        box, goto = boxes.pop()
+        if trace.DEBUG_ON:
+            trace.emit(f"\nPopped {box} for {goto}")
+        for new_box, new_goto in split_box_for_workflow(workflows[goto], box):
+            if trace.DEBUG_ON:
+                trace.emit(f"Got {new_box} for {new_goto}.")
+            if new_goto == "A":
+                total += new_box.volume
                 continue
-            if new_bounds['goto'] == "R":
+            if new_goto == "R":
                 # This one is done, but we don't need to count it.
                 continue
             # This one has more workflows to traverse. Toss it onto the stack.
-            boundses.append(new_bounds)
-
-    # print(f"\n{accepted_bounds=}")
-
-    total = 0
-    # Calculate the total number of combinations of inputs for each bounds.
-    for bounds in accepted_bounds:
-        # Drop the goto.
-        bounds.pop('goto')
-        # Compute how many values are valid for each range.
-        attr_ranges = [max_ - min_ + 1 if min_ <= max_ else 0 for min_, max_ in bounds.values()]
-        this_total = 1
-        for attr_range in attr_ranges:
-            this_total *= attr_range
-        print(f"{this_total} possible combinations for {bounds}")
-        total += this_total
+            boxes.append((new_box, new_goto))
     return total
 # 241818912886202 too high
 # 143760172569135 correct..
 
+
+def solve(data: str) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
+
+
 def run_workflow_on_part(workflow: list[Step], part: dict[str, int]) -> str:
     """Return the workflow to goto."""
     for attr, min_, max_, goto, description in workflow:
@@ -212,64 +158,53 @@ def run_workflow_on_part(workflow: list[Step], part: dict[str, int]) -> str:
         # print("Nope.")
 
 
-def split_bounds_for_workflow(workflow: list[Step], bounds: dict) -> tuple:
-    """For each step in the workflow, yield a reduced set of bounds for pass and
-    for fail."""
+def split_box_for_workflow(
+    workflow: list[Step],
+    box: Box,
+) -> Iterator[tuple[Box, str]]:
+    """For each step in the workflow, yield the part of the box that passes it,
+    and where that goes."""
     # 'qqz' = [
     #     ('s', 2771, 4000, 'qa')
     #     ('m', 0, 1800, 'hdj')
     #     (None, None, None, 'R')
     # ]
     #
-    # Then, to process, if Bounds entering qqz is
+    # Then, to process, if the box entering qqz is
     #
-    #     (0, 4000), (0, 4000), (0, 4000), (1351, 4000)
+    #     [1, 4001), [1, 4001), [1, 4001), [1351, 4001)
     #
-    # Bounds will split into
+    # it will split into
     #
-    #     (0, 4000), (0, 4000), (0, 4000), (2771, 4000) -> 'qa'  (First passes)
-    #     (0, 4000), (0, 1800), (0, 4000), (1351, 2770) -> 'hdj'  (Second passes)
-    #     (0, 4000), (1801, 4000), (0, 4000), (1351, 4000) -> 'R'  (Default)
-    #
-    # For first: To pass: take max(test.min, s[0]), and min(test.max, s[1])
-    #   To fail: if test.min == 0, take max(test.max + 1, s[0]), and s[1]
-    #            if test.max == 4000, take s[0] and min(test.min-1, s[1])
-
-    # This will be overwritten by failing bounds from the previous step. Copies
-    # prevent mutability causing side effects.
-    passing_bounds = bounds.copy()
-    failing_bounds = bounds.copy()
+    #     [1, 4001), [1, 4001), [1, 4001), [2771, 4001) -> 'qa'  (First passes)
+    #     [1, 4001), [1, 1801), [1, 4001), [1351, 2771) -> 'hdj'  (Second passes)
+    #     [1, 4001), [1801, 4001), [1, 4001), [1351, 2771) -> 'R'  (Default)
     for attr, min_, max_, goto, description in workflow:
-        print(f"Splitting bounds for {description}")
-        # Create the passing case.
-        passing_bounds['goto'] = goto
+        if trace.ON:
+            trace.count('day19.splits')
+        if trace.DEBUG_ON:
+            trace.emit(f"Splitting bounds for {description}")
         if attr is None:
             # This is the default (final) case.
-            yield passing_bounds
-            break
+            yield box, goto
+            return
 
-        # These are the limits coming into this split.
-        old_min = passing_bounds[attr][0]
-        old_max = passing_bounds[attr][1]
-        passing_bounds[attr] = (max(min_, old_min), min(max_, old_max))
-        yield passing_bounds
-
-        # Create the failing case.
+        dim = ATTRS.index(attr)
         if min_ == MIN_VALUE:
-            # This is a < case. To fail, we must be >= the upper bound. +1
-            # because we subtracted 1 earlier to make an inclusive bound.
-            failing_bounds[attr] = (max(max_+1, old_min), old_max)
-        elif max_ == MAX_VALUE:
-            # This is a > case. To fail, we must be <= the lower bound. -1
-            # because we added 1 earlier to make an inclusive bound for passing.
-            failing_bounds[attr] = (old_min, min(min_-1, old_max))
-        # Create a copy of this so we can apply passing and failing criteria
-        # from the next step to this new set of bounds.
-        passing_bounds = failing_bounds.copy()
+            # This is a < case. +1 because the bounds are inclusive.
+            passing, box = box.split(dim, max_ + 1)
+        else:
+            # This is a > case.
+            box, passing = box.split(dim, min_)
+        if passing is not None:
+            yield passing, goto
+        if box is None:
+            # Nothing fails this step, so nothing reaches the next one.
+            return
 
 
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['19']))
@@ -3,6 +3,9 @@
 import re
 from pathlib import Path
 
+from aoc2023.parse_cache import cached_parse
+from aoc2023.streaming import Input, records
+
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'day2')
@@ -11,22 +14,33 @@ R = re.compile(r'(\d+) red')
 G = re.compile(r'(\d+) green')
 B = re.compile(r'(\d+) blue')
 
-def part1(data: str) -> int:
+@cached_parse
+def parse(data: str) -> tuple[tuple[int]]:
+    """Return (game id, max red, max green, max blue) for each game."""
+    return tuple(parse_game(game) for game in data.splitlines())
+
+
+def parse_game(game: str) -> tuple[int]:
+    """Return (game id, max red, max green, max blue) for one game."""
+    name, pulls = game.split(':', 1)
+    game_id = int(name.removeprefix('Game '))
+    max_r = max_g = max_b = 0
+    for pull in pulls.split(';'):
+        # Measure by pull in case that matters somehow (it ended up not.)
+        max_r = max(max_r, qty(R.findall(pull)))
+        max_g = max(max_g, qty(G.findall(pull)))
+        max_b = max(max_b, qty(B.findall(pull)))
+    return game_id, max_r, max_g, max_b
+
+
+def part1(data: Input) -> int:
     ALLOWED_R = 12
     ALLOWED_G = 13
     ALLOWED_B = 14
 
     result = 0
 
-    for game in data.splitlines():
-        name, pulls = game.split(':', 1)
-        game_id = int(name.removeprefix('Game '))
-        max_r = max_g = max_b = 0
-        for pull in pulls.split(';'):
-            # Measure by pull in case that matters somehow (it ended up not.)
-            max_r = max(max_r, qty(R.findall(pull)))
-            max_g = max(max_g, qty(G.findall(pull)))
-            max_b = max(max_b, qty(B.findall(pull)))
+    for game_id, max_r, max_g, max_b in records(data, parse, parse_game):
         if (
             max_r <= ALLOWED_R
             and max_g <= ALLOWED_G
@@ -45,23 +59,22 @@ def qty(search_result: list) -> int:
 
 
 
-def part2(data: str) -> int:
+def part2(data: Input) -> int:
     result = 0
 
-    for game in data.splitlines():
-        _, pulls = game.split(':', 1)
-        max_r = max_g = max_b = 0
-        for pull in pulls.split(';'):
-            max_r = max(max_r, qty(R.findall(pull)))
-            max_g = max(max_g, qty(G.findall(pull)))
-            max_b = max(max_b, qty(B.findall(pull)))
+    for _, max_r, max_g, max_b in records(data, parse, parse_game):
         power = max_r * max_g * max_b
         result += power
     return result
 
 
+def solve(data: str) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
+
+
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['2']))
@@ -3,21 +3,46 @@
 from functools import partial
 from math import ceil, floor
 from pathlib import Path
+from typing import Union
 
+from aoc2023 import checkpoint, deadline
 from aoc2023.day9 import find_next_point
+from aoc2023.grid import Grid, as_grid
+from aoc2023.parse_cache import cached_parse
 
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'day21')
 
+# The runner maps the input file rather than reading it (see aoc2023.grid).
+load = Grid.from_file
+
 N_STEPS_P1 = 64
 N_STEPS_P2 = 26501365
-# Test value:
-# N_STEPS_P1 = 6
-N_STEPS_P2 = 500
+# The example wants 6 steps for part 1: pass n_steps rather than editing these.
+
+ROCK = ord('#')
+
+# What part 2 saves its progress as (see aoc2023.checkpoint).
+SERIES = 'day21.series'
+
+
+@cached_parse
+def parse(data: Union[str, Grid]) -> tuple[Grid, tuple[int]]:
+    """Return the garden and the starting point."""
+    grid = as_grid(data)
+    unexpected = grid.find_unexpected(b'.#S')
+    if unexpected != -1:
+        raise ValueError(f"Unexpected point type {chr(grid.cells[unexpected])}")
+    if grid.count(b'S') > 1:
+        raise ValueError("Unexpected point type S")
 
+    start = grid.find(b'S')
+    start_point = grid.xy(start) if start != -1 else None
+    return grid, start_point
 
-def part1(data: str) -> int:
+
+def part1(data: Union[str, Grid], n_steps: int = N_STEPS_P1) -> int:
     # Travel in all allowed directions.
     #
     # If a spot has been visited before, it's determined already if it's
@@ -26,67 +51,60 @@ def part1(data: str) -> int:
     #
     # Each spot has up to 4 neighbors. Neighbors which are rocks or have been
     # visited are excluded.
-    width = data.find('\n')
-    height = data.count('\n')
-
-    # Set of locations (x, y)
-    rocks = set()
-    start_point = None
-
-    for y, row in enumerate(data.splitlines()):
-        for x, char in enumerate(row):
-            if char == '.':
-                continue
-            elif char == '#':
-                rocks.add((x, y))
-            elif char == 'S' and start_point is None:
-                start_point = (x, y)
-            else:
-                raise ValueError(f"Unexpected point type {char}")
-    return get_n_for_n_steps(N_STEPS_P1, start_point, rocks, width, height)
-
-
-def part2(data: str) -> int:
-    width = data.find('\n')
-    height = data.count('\n')
-
-    # Set of locations (x, y)
-    rocks = set()
-    start_point = None
-
-    for y, row in enumerate(data.splitlines()):
-        for x, char in enumerate(row):
-            if char == '.':
-                continue
-            elif char == '#':
-                rocks.add((x, y))
-            elif char == 'S' and start_point is None:
-                start_point = (x, y)
-            else:
-                raise ValueError(f"Unexpected point type {char}")
+    grid, start_point = parse(data)
+    return get_n_for_n_steps(n_steps, start_point, grid)
+
+
+def part2(data: Union[str, Grid], n_steps: int = N_STEPS_P2) -> int:
+    grid, start_point = parse(data)
 
     # Some observant people observantly observed that the number of steps is
     # equal to 65 + 202300 * map_width, where map_width = 131. The number of
     # occupiable spots can be determined by a polynomial - therefore, it's
     # differentiable. Using 65+131 and 65+2*131, I can establish a series to
     # then extrapolate (day 9) to the number of occupied spots as demanded by
-    # eric.
+    # eric. (65 being half the map, from the start in the middle to the edge.)
+    half_width = grid.width // 2
+    n_maps = (n_steps - half_width) // grid.width
     #
     # Source:
     # https://www.reddit.com/r/adventofcode/comments/18orn0s/2023_day_21_part_2_links_between_days/
 
-    series = [
-        get_n_for_n_steps(65, start_point, rocks, width, height),
-        get_n_for_n_steps(65 + 131, start_point, rocks, width, height),
-        get_n_for_n_steps(65 + 131*2, start_point, rocks, width, height),
-        get_n_for_n_steps(65 + 131*3, start_point, rocks, width, height),
-    ]
-
-    # print(get_n_for_n_steps(65 + 131*4, start_point, rocks, width, height))
-    # print(get_n_for_n_steps(65 + 131*5, start_point, rocks, width, height))
-    # print(get_n_for_n_steps(65 + 131*6, start_point, rocks, width, height))
-
-    for i in range(202300-3):
+    # The series so far, and how many points past it have been extrapolated.
+    series = []
+    n_extrapolated = 0
+    # Looked at once: it's this context's session that counts (see
+    # aoc2023.checkpoint), and that can't change under us.
+    checkpointing = checkpoint.ACTIVE
+    if checkpointing:
+        key = checkpoint.key(grid.cells, grid.width, start_point, n_steps)
+        series, n_extrapolated = checkpoint.load(SERIES, key) or ([], 0)
+    for n_tiles in range(len(series), 4):
+        n = get_n_for_n_steps(half_width + grid.width*n_tiles, start_point, grid)
+        if isinstance(n, deadline.Partial):
+            n.progress['series'] = series
+            return n
+        series.append(n)
+        # Each point takes a while, so hang onto it.
+        if checkpointing:
+            checkpoint.save(SERIES, key, (series, 0))
+
+    # print(get_n_for_n_steps(65 + 131*4, start_point, grid))
+    # print(get_n_for_n_steps(65 + 131*5, start_point, grid))
+    # print(get_n_for_n_steps(65 + 131*6, start_point, grid))
+
+    if n_maps < len(series):
+        if checkpointing:
+            checkpoint.done(SERIES)
+        return series[n_maps]
+    for i in range(n_extrapolated, n_maps-3):
+        out_of_time = deadline.ACTIVE and deadline.expired()
+        if checkpointing and (out_of_time or checkpoint.due()):
+            checkpoint.save(SERIES, key, (series, i))
+        if out_of_time:
+            return deadline.Partial(
+                series[-1], {'extrapolated': i, 'of': n_maps - 3}
+            )
         # if i < 10 or i % 100 == 0:
         #     # print(f"{i=}")# , {series=}")
         #     series = series[-100:]
@@ -95,17 +113,26 @@ def part2(data: str) -> int:
         # People pointed out that this is quadratic, so 4 points should be
         # plenty to hang onto.
         series.pop(0)
+    if checkpointing:
+        checkpoint.done(SERIES)
     return next_
 # 607340330259531 is too high!
 
 
+def solve(data: Union[str, Grid]) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
+
 
-def get_n_for_n_steps(n_steps, start, rocks, width, height) -> int:
+
+def get_n_for_n_steps(n_steps, start, grid: Grid) -> Union[int, deadline.Partial]:
     even_spots = set()
     odd_spots = set()
     current_spots = set([start])
-    is_a_rock = partial(check_for_tiled_rock, rocks=rocks, width=width, height=height)
+    is_a_rock = partial(check_for_tiled_rock, grid=grid)
     for i_step in range(1, n_steps+1):
+        if deadline.ACTIVE and deadline.expired():
+            return deadline.Partial(None, {'steps': i_step - 1, 'of': n_steps})
         next_current_spots = set()
         for spot in current_spots:
             for neighbor in get_neighbors(*spot):
@@ -125,7 +152,7 @@ def get_n_for_n_steps(n_steps, start, rocks, width, height) -> int:
                 next_current_spots.add(neighbor)
         current_spots = next_current_spots
         # print(f"\nStep {i_step}")
-        # print_stuff(width, height, rocks, odd_spots, even_spots)
+        # print_stuff(grid, odd_spots, even_spots)
 
     if n_steps % 2 == 0:
         return len(even_spots)
@@ -138,28 +165,19 @@ def get_neighbors(x, y) -> tuple[int]:
     yield x, y - 1
 
 
-def check_for_tiled_rock(x, y, rocks, width, height) -> bool:
+def check_for_tiled_rock(x, y, grid: Grid) -> bool:
     # (x, y) maps to the nth tile in the x direction and the mth tile in the y
-    # direction. Find n and m by floor([x|y] / [w|h]). Map to the base tile by
-    # [x|y] - [n|m]*[w|h].
-    n = floor(x / width)
-    m = floor(y / height)
-
-    x0 = x - n*width
-    y0 = y - m*height
-
-    return (x0, y0) in rocks
+    # direction. Map to the base tile by [x|y] mod [w|h].
+    return grid.cells[grid.wrap(x, y)] == ROCK
 
 def print_stuff(
-    width: int,
-    height: int,
-    rocks: set[tuple[int]],
+    grid: Grid,
     odd: set[tuple[int]],
     even: set[tuple[int]],
 ) -> None:
-    for y in range(height):
-        for x in range(width):
-            if (x, y) in rocks:
+    for y in range(grid.height):
+        for x in range(grid.width):
+            if grid[x, y] == ROCK:
                 print("#", end="")
             elif (x, y) in odd:
                 print("O", end="")
@@ -170,11 +188,11 @@ def print_stuff(
         print()
 
 def print_stuff_p2(
-    width: int,
-    height: int,
-    rocks: set[tuple[int]],
+    grid: Grid,
     reachable: set[tuple[int]],
 ) -> None:
+    width = grid.width
+    height = grid.height
     min_x = min_y = max_x = max_y = 0
     for spot in reachable:
         min_x = min(min_x, spot[0])
@@ -192,7 +210,7 @@ def print_stuff_p2(
     return
     for y in range(*y_range):
         for x in range(*x_range):
-            if check_for_tiled_rock(x, y, rocks, width, height):
+            if check_for_tiled_rock(x, y, grid):
                 print("#", end="")
             elif (x, y) in reachable:
                 print("O", end="")
@@ -201,7 +219,7 @@ def print_stuff_p2(
         print()
 
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['21']))
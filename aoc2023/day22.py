@@ -1,18 +1,27 @@
 """Day N."""
 
-import itertools
 from collections import defaultdict
 from copy import deepcopy
 from pathlib import Path
 
+from aoc2023 import metrics
+from aoc2023.numparse import int_rows
+from aoc2023.parse_cache import cached_parse
+
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'day22')
 
 
+@cached_parse
+def parse(data: str) -> tuple[tuple[tuple[int]]]:
+    """Return the two ends of each brick, as a snapshot."""
+    return tuple(Brick.sort_ends(numbers) for numbers in int_rows(data, width=6))
+
+
 def part1(data: str) -> int:
-    Brick.id_counter = itertools.count()
-    bricks = [Brick.from_str(brick) for brick in data.splitlines()]
+    # Bricks move as they settle, so build fresh ones from the snapshot.
+    bricks = [Brick.from_ends(ends, id_) for id_, ends in enumerate(parse(data))]
     bricks.sort(key=lambda x: x.min_z)
 
     dim_x, dim_y, dim_z = get_tower_dimensions(bricks)
@@ -24,8 +33,7 @@ def part1(data: str) -> int:
 
 
 def part2(data: str) -> int:
-    Brick.id_counter = itertools.count()
-    bricks = [Brick.from_str(brick) for brick in data.splitlines()]
+    bricks = [Brick.from_ends(ends, id_) for id_, ends in enumerate(parse(data))]
     bricks.sort(key=lambda x: x.min_z)
 
     dim_x, dim_y, dim_z = get_tower_dimensions(bricks)
@@ -50,6 +58,8 @@ def part2(data: str) -> int:
         the sort above))
         """
         # print(f"Removing {brick_id}")
+        if metrics.ON:
+            metrics.count('day22.removals')
         fallen_bricks = 0
         for idx in range(len(supporting_bricks)):
             brick_set = supporting_bricks[idx]
@@ -71,6 +81,12 @@ def part2(data: str) -> int:
 # 945 is too low
 # 19013 is too low
 
+
+def solve(data: str) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
+
+
 def find_removable_bricks(bricks: list["Brick"], tower: "Tower") -> set[int]:
     """
     Return a list of brick ids which could be safely removed from the tower.
@@ -84,7 +100,7 @@ def find_removable_bricks(bricks: list["Brick"], tower: "Tower") -> set[int]:
     all bricks absent from the 'required' set.
 
     """
-    optional_bricks = set(range(Brick.max_id+1))
+    optional_bricks = {brick.id for brick in bricks}
     required_bricks = set()
 
     for brick in bricks:
@@ -248,40 +264,43 @@ class Tower(defaultdict):
 
 class Brick:
     """Defines the behaviors of a brick."""
-    id_counter = itertools.count()
-    def __init__(self) -> None:
+    __slots__ = ('_ends', 'id')
+
+    def __init__(self, id_: int = 0) -> None:
         self._ends = tuple([[0, 0, 0], [0, 0, 0]])
-        self.id = next(Brick.id_counter)
+        # Ids count from 0 within a snapshot, so they double as list indices.
+        self.id = id_
 
     def __repr__(self) -> str:
         return f"{self.id}: {self.ends}"
 
     @classmethod
-    def from_str(cls, string: str) -> "Brick":
+    def from_str(cls, string: str, id_: int = 0) -> "Brick":
         """Create a brick from its defining string."""
+        return cls.from_ends(cls.parse_ends(string), id_)
+
+    @classmethod
+    def from_ends(cls, ends: tuple[tuple[int]], id_: int = 0) -> "Brick":
+        """Create a brick from its two ends."""
+        b = Brick(id_)
+        b.ends = ends
+        return b
+
+    @staticmethod
+    def parse_ends(string: str) -> tuple[tuple[int]]:
+        """Return the (sorted) ends of a brick from its defining string."""
         ends = string.split("~")
-        ends = [
-            [int(x) for x in end.split(",")]
-            for end in ends
-        ]
         if len(ends) != 2:
             raise ValueError("Expected two ends of the brick!")
+        return Brick.sort_ends([int(x) for end in ends for x in end.split(",")])
+
+    @staticmethod
+    def sort_ends(numbers: tuple[int]) -> tuple[tuple[int]]:
+        """Return the (sorted) ends of a brick from its six coordinates."""
         # Only one dimension changes, so this will align the ends to point in
         # the positive direction of x, y, or z.
-        ends.sort()
-
-        b = Brick()
-        b.ends = ends
-        return b
-
-    @classmethod
-    @property
-    def max_id(cls) -> int:
-        """Return the highest id of a brick out there."""
-        # Peek a la stack overflow. https://stackoverflow.com/a/2425347
-        next_id = next(cls.id_counter)
-        cls.id_counter = itertools.chain([next_id], cls.id_counter)
-        return next_id - 1
+        a, b = tuple(numbers[:3]), tuple(numbers[3:])
+        return (a, b) if a <= b else (b, a)
 
     def fall(self, tower: Tower) -> None:
         """Move the brick as far down in the z dimension as possible."""
@@ -369,7 +388,7 @@ class Brick:
         return self.ends[1][2]
 
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['22']))
@@ -1,6 +1,6 @@
 """Day 24."""
 
-from itertools import combinations
+from itertools import combinations, islice
 from pathlib import Path
 
 
@@ -8,19 +8,35 @@ import numpy as np
 import z3
 from scipy import linalg
 
+from aoc2023.engines import engine
+from aoc2023.numparse import int_rows
+from aoc2023.parse_cache import cached_parse
+from aoc2023.streaming import Input, records
+
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'day24')
 
 
-def part1(data: str) -> int:
-    stones = []
-    p_min = 200000000000000
-    p_max = 400000000000000
+@cached_parse
+def parse(data: str) -> tuple["Hailstone"]:
+    return tuple(
+        Hailstone(numbers[:3], numbers[3:]) for numbers in int_rows(data, width=6)
+    )
+
+
+P_MIN = 200000000000000
+P_MAX = 400000000000000
+
+
+def part1(data: Input) -> int:
+    p_min = P_MIN
+    p_max = P_MAX
     # p_min = 7
     # p_max = 27
-    for hailstone_s in data.splitlines():
-        stones.append(Hailstone.from_str(hailstone_s))
+    # Every pair gets checked, so a stream still has to keep every hailstone
+    # (though not the text they came from).
+    stones = tuple(records(data, parse, Hailstone.from_str))
 
     total = 0
     for a, b in combinations(stones, 2):
@@ -57,17 +73,49 @@ def part1(data: str) -> int:
 
 # 18652 is too high
 
-def part2(data: str) -> int:
-    stones = []
-    for hailstone_s in data.splitlines():
-        stones.append(Hailstone.from_str(hailstone_s))
 
-    x, y, z, dx, dy, dz = find_traj_hits_these_three(*stones[:3])
+@engine(24, 1, 'numpy')
+def part1_numpy(data: str) -> int:
+    # The same sums as intersection_xy, by Cramer's rule rather than
+    # linalg.solve, for one hailstone against all the ones after it at a time.
+    stones = parse(data)
+    p = np.array([stone.p[:2] for stone in stones], dtype=np.float64)
+    dp = np.array([stone.dp[:2] for stone in stones], dtype=np.float64)
+
+    total = 0
+    for i in range(len(stones) - 1):
+        (px, py), (dx, dy) = p[i], dp[i]
+        bx, by = (p[i+1:] - p[i]).T
+        dx2, dy2 = dp[i+1:].T
+        det = dx2*dy - dx*dy2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ta = (dx2*by - bx*dy2) / det
+            tb = (dx*by - dy*bx) / det
+        x = px + dx*ta
+        y = py + dy*ta
+        # Parallel paths (det == 0) come out as inf or nan, and fail these.
+        total += int(np.count_nonzero(
+            (ta > 0) & (tb > 0)
+            & (P_MIN <= x) & (x <= P_MAX)
+            & (P_MIN <= y) & (y <= P_MAX)
+        ))
+    return total
+
+def part2(data: Input) -> int:
+    # Only the first three hailstones matter, so don't read any further.
+    stones = islice(records(data, parse, Hailstone.from_str), 3)
+
+    x, y, z, dx, dy, dz = find_traj_hits_these_three(*stones)
     return x + y + z
 
 # 373286912225103 is too low!
 
 
+def solve(data: str) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
+
+
 def find_traj_hits_these_three(*hailstones: "Hailstone") -> float:
     """
     Return the start point + velocity of a rock which would intersect *on time*
@@ -103,7 +151,12 @@ def find_traj_hits_these_three(*hailstones: "Hailstone") -> float:
     # Solving for pr_0 (3-vector), dpr (3-vector) and t (3-vector). Using more
     # than three hailstones would be over-constrained.
 
-    t1, t2, t3, xr, yr, zr, dxr, dyr, dzr = z3.Reals("t1 t2 t3 xr yr zr dxr dyr dzr")
+    # z3's default context is shared by the whole process, and isn't safe to use
+    # from two threads at once, so each call gets its own.
+    ctx = z3.Context()
+    t1, t2, t3, xr, yr, zr, dxr, dyr, dzr = z3.Reals(
+        "t1 t2 t3 xr yr zr dxr dyr dzr", ctx=ctx,
+    )
     h1, h2, h3 = hailstones[:3]
     constraints = [
         xr + dxr*t1 == h1.px + h1.dpx*t1,
@@ -117,7 +170,7 @@ def find_traj_hits_these_three(*hailstones: "Hailstone") -> float:
         zr + dzr*t3 == h3.pz + h3.dpz*t3,
     ]
     # Set up the solver, assert that my constraints are valid, and then run it.
-    solver = z3.Solver()
+    solver = z3.Solver(ctx=ctx)
     solver.add(*constraints)
     solver.check()
     model = solver.model()
@@ -126,6 +179,8 @@ def find_traj_hits_these_three(*hailstones: "Hailstone") -> float:
 
 
 class Hailstone:
+    __slots__ = ('p', 'dp')
+
     def __init__(
         self,
         p: tuple[int],
@@ -140,8 +195,8 @@ class Hailstone:
     @classmethod
     def from_str(cls, string) -> "Hailstone":
         p, dp = string.split(" @ ")
-        p = [int(x) for x in p.split(', ')]
-        dp = [int(dx) for dx in dp.split(', ')]
+        p = tuple(int(x) for x in p.split(', '))
+        dp = tuple(int(dx) for dx in dp.split(', '))
         return cls(p, dp)
 
     def intersection_xy(self, other: "Hailstone") -> float:
@@ -227,7 +282,7 @@ class NeverCross(Exception):
     pass
 
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['24']))
@@ -1,55 +1,62 @@
 """
 Day 25
 
-https://www.reddit.com/r/adventofcode/comments/18qbsxs/comment/ketzp94/
+We're looking to split the graph into two components, with exactly three edges
+crossing between them: a minimum cut. Pick any node as the source and try the
+others as the sink. If the sink is on the same side, more than three paths join
+them and max flow gives up as soon as it finds a fourth. If it isn't, the flow
+tops out at three, and whatever the source can still reach is its component.
 
-Devised a simple ad-hoc algorithm. We're looking to split the graph into two
-components, with exactly three edges crossing the component boundaries. We
-define one component as the set of nodes S. The other component is G \ S.
-
-We start with S = G, i.e. all nodes are in one component and the other one is
-empty. For each node in S, we count how many of its neighbours are in the other
-component. Nodes with many "external" neighbours clearly do not belong in our
-component, so we iteratively remove them from S. (They are implicitly added to
-the other component G \ S.) We repeat this until the nodes in our component have
-exactly 3 external neighbours, and we're done!
+(This used to be an ad-hoc peeling heuristic, from
+https://www.reddit.com/r/adventofcode/comments/18qbsxs/comment/ketzp94/)
 
 """
 
-from collections import defaultdict
 from pathlib import Path
 
+from aoc2023.graph import Graph, NodeIds, min_cut
+from aoc2023.parse_cache import cached_parse
+
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'day25')
 
+N_WIRES_TO_CUT = 3
 
-def part1(data: str) -> int:
-    graph = defaultdict(set)
 
+@cached_parse
+def parse(data: str) -> Graph:
+    """Return the graph of connected components, one node per component."""
+    ids = NodeIds()
+    edges = []
     for line in data.splitlines():
         component, *peripherals = line.replace(':', '').split()
         for peripheral in peripherals:
-            graph[component].add(peripheral)
-            graph[peripheral].add(component)
-
-    nodes = set(graph)
-
-    count_fn = lambda component: len(graph[component]-nodes)
+            edges.append((ids[component], ids[peripheral], 1))
+    return Graph.from_edges(len(ids), edges, undirected=True)
 
-    while sum(map(count_fn, nodes)) != 3:
-        nodes.remove(max(nodes, key=count_fn))
 
-    return len(nodes) * len(set(graph)-nodes)
+def part1(data: str) -> int:
+    graph = parse(data)
 
+    for sink in range(1, graph.n_nodes):
+        n_cut, side = min_cut(graph, 0, sink, limit=N_WIRES_TO_CUT)
+        if n_cut == N_WIRES_TO_CUT:
+            return len(side) * (graph.n_nodes - len(side))
+    raise ValueError(f"No {N_WIRES_TO_CUT} wires split the machine in two.")
 
 
 def part2(data: str) -> int:
     return 0
 
 
+def solve(data: str) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
+
+
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['25']))
@@ -1,42 +1,58 @@
 """Day N."""
 
-import re
+from collections import deque
 from pathlib import Path
 
+from aoc2023.parse_cache import cached_parse
+from aoc2023.streaming import Input, records
+
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'day4')
 
-def part1(data: str) -> int:
+@cached_parse
+def parse(data: str) -> tuple[int]:
+    """Return the number of winning numbers on each card."""
+    return tuple(count_wins(card) for card in data.splitlines())
+
+
+def count_wins(card: str) -> int:
+    """Return the number of winning numbers on one card."""
+    numbers = card.split(':', 1)[1]
+    winning, yours = numbers.split('|')
+    return len(set(winning.split()).intersection(yours.split()))
+
+
+def part1(data: Input) -> int:
     total = 0
-    for card in data.splitlines():
-        numbers = card.split(':', 1)[1]
-        winning, yours = numbers.split('|')
-        you_win = set(winning.split()).intersection(yours.split())
-        if you_win:
-            total += 2**(len(you_win)-1)
+    for n_wins in records(data, parse, count_wins):
+        if n_wins:
+            total += 2**(n_wins-1)
     return total
 
-def part2(data: str) -> int:
-    cards = data.splitlines()
-    n_winning = [0]*len(cards)
-    for card_idx, card in enumerate(cards):
-        numbers = card.split(':', 1)[1]
-        winning, yours = numbers.split('|')
-        you_win = set(winning.split()).intersection(yours.split())
-        n_winning[card_idx] = len(you_win)
+def part2(data: Input) -> int:
+    # A card's wins only ever reach the next n_wins cards, so rather than a
+    # count for every card, keep the extra copies won for the next few.
+    extra_copies = deque()
+    total = 0
+    for n_wins in records(data, parse, count_wins):
+        n_copies = 1 + (extra_copies.popleft() if extra_copies else 0)
+        total += n_copies
+        if len(extra_copies) < n_wins:
+            extra_copies.extend([0] * (n_wins - len(extra_copies)))
+        for idx in range(n_wins):
+            extra_copies[idx] += n_copies
+
+    return total
 
-    n_cards = [1]*len(cards)
-    for card_idx, n_wins in enumerate(n_winning):
-        for _ in range(n_cards[card_idx]):
-            for idx in range(card_idx+1, card_idx+n_wins+1):
-                n_cards[idx] += 1
 
-    return sum(n_cards)
+def solve(data: str) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
 
 
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['4']))
@@ -1,23 +1,26 @@
 """Day N."""
 
+from math import isqrt
 from pathlib import Path
 
+from aoc2023.engines import engine
+from aoc2023.numparse import int_rows
+from aoc2023.parse_cache import cached_parse
+
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'day6')
 
 
-def part1(data: str) -> int:
-    time_string, distance_string = data.splitlines()
-    time_strings = time_string.split()
-    distance_strings = distance_string.split()
+@cached_parse
+def parse(data: str) -> tuple[tuple[int], tuple[int]]:
+    """Return the (unlabelled) time and distance columns."""
+    times_ms, distances_mm = int_rows(data)
+    return times_ms, distances_mm
 
-    # Drop the label.
-    time_strings.pop(0)
-    distance_strings.pop(0)
 
-    times_ms = [int(x) for x in time_strings]
-    distances_mm = [int(x) for x in distance_strings]
+def part1(data: str) -> int:
+    times_ms, distances_mm = parse(data)
 
     total = 1
     for time, record_distance in zip(times_ms, distances_mm):
@@ -36,16 +39,11 @@ def part1(data: str) -> int:
 
 
 def part2(data: str) -> int:
-    time_string, distance_string = data.splitlines()
-    time_strings = time_string.split()
-    distance_strings = distance_string.split()
+    times_ms, distances_mm = parse(data)
 
-    # Drop the label.
-    time_strings.pop(0)
-    distance_strings.pop(0)
-
-    time_ms = int(''.join(time_strings))
-    distance_mm = int(''.join(distance_strings))
+    # The kerning was bad: it's one race.
+    time_ms = int(''.join(str(x) for x in times_ms))
+    distance_mm = int(''.join(str(x) for x in distances_mm))
 
     possible_hold_times = range(time_ms)
     n_winning_options = 0
@@ -73,8 +71,53 @@ def part2(data: str) -> int:
     return n_winning_options
 
 
+@engine(6, 1, 'quadratic')
+def part1_quadratic(data: str) -> int:
+    times_ms, distances_mm = parse(data)
+    total = 1
+    for time_ms, distance_mm in zip(times_ms, distances_mm):
+        total *= n_ways_to_win(time_ms, distance_mm)
+    return total
+
+
+@engine(6, 2, 'quadratic')
+def part2_quadratic(data: str) -> int:
+    times_ms, distances_mm = parse(data)
+    time_ms = int(''.join(str(x) for x in times_ms))
+    distance_mm = int(''.join(str(x) for x in distances_mm))
+    return n_ways_to_win(time_ms, distance_mm)
+
+
+def n_ways_to_win(time_ms: int, record_mm: int) -> int:
+    """
+    Return how many whole-millisecond hold times beat the record.
+
+    Holding for h goes h * (time - h), so the winners are the h between the
+    roots of h**2 - time*h + record = 0. The distance is symmetric about
+    time / 2, so it's enough to find the first winner.
+
+    """
+    discriminant = time_ms*time_ms - 4*record_mm
+    if discriminant < 0:
+        return 0
+    # isqrt rather than sqrt: the numbers get too big for floats to be exact.
+    first = (time_ms - isqrt(discriminant)) // 2
+    while first > 0 and (first - 1) * (time_ms - first + 1) > record_mm:
+        first -= 1
+    while first <= time_ms // 2 and first * (time_ms - first) <= record_mm:
+        first += 1
+    if first > time_ms // 2:
+        return 0
+    return time_ms - 2*first + 1
+
+
+def solve(data: str) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
+
+
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['6']))
@@ -1,9 +1,12 @@
 """Day N."""
 
-from functools import partial
-from pprint import pprint
+from pprint import pformat
 from pathlib import Path
 
+from aoc2023 import trace
+from aoc2023.parse_cache import cached_parse
+from aoc2023.streaming import Input, records
+
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'day7')
@@ -55,57 +58,76 @@ CARD_RANK_JOKERS = {
 }
 
 
-def part1(data: str) -> int:
-    hands = data.splitlines()
+@cached_parse
+def parse(data: str) -> tuple[tuple[str, int]]:
+    """Return (cards, bid) for each hand."""
+    return tuple(parse_hand(hand) for hand in data.splitlines())
+
+
+def parse_hand(hand: str) -> tuple[str, int]:
+    cards, bid = hand.split()
+    return cards, int(bid)
+
+
+def part1(data: Input) -> int:
+    # Every hand has to be ranked against every other, so a stream still ends up
+    # with all the (cards, bid)s in memory, just not the text they came from.
+    hands = records(data, parse, parse_hand)
     # List of lists, one list for each type, in order.
     hand_types = [[], [], [], [], [], [], []]
     for hand in hands:
-        cards_in_hand = hand.split()[0]
+        cards_in_hand = hand[0]
         hand_type = check_type(cards_in_hand)
         hand_types[hand_type].append(hand)
-    # pprint(hand_types)
+    # trace.emit(pformat(hand_types))
     # [weakest...strongest]
     ranked_hands = []
     for hand_type in hand_types:
         ranked_hands.extend(rank_of_same_type(hand_type))
-    # pprint(ranked_hands)
+    # trace.emit(pformat(ranked_hands))
     total = 0
-    for rank, hand in enumerate(ranked_hands):
-        bid = int(hand.split()[1])
+    for rank, (_, bid) in enumerate(ranked_hands):
         total += bid * (rank+1)
 
     return total
 
 
-def part2(data: str) -> int:
+def part2(data: Input) -> int:
     # 253483637 is too low
-    hands = data.splitlines()
+    hands = records(data, parse, parse_hand)
     # List of lists, one list for each type, in order.
     hand_types = [[], [], [], [], [], [], []]
     for hand in hands:
-        cards_in_hand = hand.split()[0]
+        cards_in_hand = hand[0]
         hand_type = check_type(cards_in_hand, is_jokers=True)
         hand_types[hand_type].append(hand)
-    # pprint(hand_types)
+    # trace.emit(pformat(hand_types))
     # [weakest...strongest]
     ranked_hands = []
     for hand_type in hand_types:
         ranked_hands.extend(rank_of_same_type(hand_type, is_jokers=True))
-    pprint(ranked_hands)
+    if trace.DEBUG_ON:
+        trace.emit(pformat(ranked_hands))
     total = 0
-    for rank, hand in enumerate(ranked_hands):
-        bid = int(hand.split()[1])
+    for rank, (_, bid) in enumerate(ranked_hands):
         total += bid * (rank+1)
 
     return total
 
 
-def rank_of_same_type(hands: list[str], is_jokers: bool = False) -> list[str]:
-    """Return list sorted [weakest...strongest]"""
-    if is_jokers:
-        key = partial(convert_hand_to_number_for_comparison, is_jokers=True)
-        return sorted(hands, key=key)
-    return sorted(hands, key=convert_hand_to_number_for_comparison)
+def solve(data: str) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
+
+
+def rank_of_same_type(
+    hands: list[tuple[str, int]],
+    is_jokers: bool = False,
+) -> list[tuple[str, int]]:
+    """Return (cards, bid) list sorted [weakest...strongest]"""
+    def key(hand: tuple[str, int]) -> int:
+        return convert_hand_to_number_for_comparison(hand[0], is_jokers=is_jokers)
+    return sorted(hands, key=key)
 
 
 def convert_hand_to_number_for_comparison(hand: str, is_jokers: bool = False) -> int:
@@ -212,7 +234,7 @@ def adjust_qties_with_jokers(qties: list[int], n_jokers: int) -> list[int]:
 
 
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['7']))
@@ -4,53 +4,71 @@ import math
 import re
 from pathlib import Path
 
+from aoc2023 import trace
+from aoc2023.graph import Graph, NodeIds
+from aoc2023.parse_cache import cached_parse
+
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'day8')
 
 NODE = re.compile(r"\w\w\w")
 
-def part1(data: str) -> int:
+@cached_parse
+def parse(data: str) -> tuple[tuple[int], Graph, NodeIds]:
+    """
+    Return the directions (as 0s and 1s), the network, and the node names.
+
+    Each node's two edges are left then right, so a direction is also the
+    offset of the edge to take.
+
+    """
     directions, network = data.split('\n', maxsplit=1)
     directions = directions.replace("L", "0")
     directions = directions.replace("R", "1")
     network = network.strip()
 
-    mapping = dict()
+    ids = NodeIds()
+    edges = []
     for node in network.splitlines():
         here, left, right = NODE.findall(node)
-        mapping[here] = [left, right]
+        edges.append((ids[here], ids[left], 1))
+        edges.append((ids[here], ids[right], 1))
+    return tuple(map(int, directions)), Graph.from_edges(len(ids), edges), ids
+
 
-    here = "AAA"
-    end = "ZZZ"
+def part1(data: str) -> int:
+    directions, network, ids = parse(data)
+    offsets, targets = network.offsets, network.targets
+
+    # Not ids[...] for a missing node: that would add it to the shared parse.
+    missing = [name for name in ("AAA", "ZZZ") if name not in ids]
+    if missing:
+        raise ValueError(f"The network has no {' or '.join(missing)} node.")
+    here = ids["AAA"]
+    end = ids["ZZZ"]
     n_steps = 0
     while True:
         for step in directions:
             # 0 = left, 1 = right.
-            here = mapping[here][int(step)]
+            here = targets[offsets[here] + step]
             n_steps += 1
             if here == end:
                 return n_steps
 
 
 def part2(data: str) -> int:
-    directions, network = data.split('\n', maxsplit=1)
-    directions = directions.replace("L", "0")
-    directions = directions.replace("R", "1")
-    network = network.strip()
-
-    mapping = dict()
-    for node in network.splitlines():
-        here, left, right = NODE.findall(node)
-        mapping[here] = [left, right]
-    heres = [key for key in mapping.keys() if key.endswith("A")]
+    directions, network, ids = parse(data)
+    offsets, targets = network.offsets, network.targets
+    heres = [ids[name] for name in ids.labels if name.endswith("A")]
+    is_end = [name.endswith("Z") for name in ids.labels]
     # These prints let you verify that each 'end' will return to the same point
     # as a 'start' will point to. The inputs must be well-crafted to
     # encode/enable that periodicity.
     #
-    # ends = [key for key in mapping.keys() if key.endswith("Z")]
-    # print(*[f"{here}: {mapping[here]}\n" for here in heres])
-    # print(*[f"{end}: {mapping[end]}\n" for end in ends])
+    # ends = [ids[name] for name in ids.labels if name.endswith("Z")]
+    # print(*[f"{here}: {network.neighbors(here)}\n" for here in heres])
+    # print(*[f"{end}: {network.neighbors(end)}\n" for end in ends])
     # return 0
     steps_to_ends = [0]*len(heres)
     # These are probably designed to not overlap for a long time, so just figure
@@ -61,12 +79,14 @@ def part2(data: str) -> int:
         n_steps = 0
         while True:
             for step in directions:
-                # print(here)
+                # print(ids.labels[here])
                 # 0 = left, 1 = right.
-                here = mapping[here][int(step)]
+                here = targets[offsets[here] + step]
                 n_steps += 1
-                if here.endswith("Z"):
-                    print(n_steps)
+                if is_end[here]:
+                    if trace.INFO_ON:
+                        start, end = ids.labels[heres[here_idx]], ids.labels[here]
+                        trace.emit(f"{start} reached {end} in {n_steps}")
                     steps_to_ends[here_idx] = n_steps
                     break
             else:
@@ -77,9 +97,14 @@ def part2(data: str) -> int:
     return math.lcm(*steps_to_ends)
 
 
+def solve(data: str) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
+
+
 
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['8']))
@@ -2,30 +2,111 @@
 
 from pathlib import Path
 
+from aoc2023.engines import engine
+from aoc2023.memo import memoize
+from aoc2023.numparse import NUMPY_MIN_SIZE, int_rows
+from aoc2023.parse_cache import cached_parse
+from aoc2023.streaming import Input, records
+
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'day9')
 
 
-def part1(data: str) -> int:
+@cached_parse
+def parse(data: str) -> tuple[tuple[int]]:
+    """Return each variable's history."""
+    return tuple(int_rows(data))
+
+
+def parse_history(variable: str) -> tuple[int]:
+    return tuple(int(x) for x in variable.split())
+
+
+def part1(data: Input) -> int:
     total = 0
-    for variable in data.splitlines():
-        history = [int(x) for x in variable.split()]
-        total += find_next_point(history)
+    for history in records(data, parse, parse_history):
+        total += next_point(history)
 
     return total
 
 
-def part2(data: str) -> int:
+def part2(data: Input) -> int:
+    total = 0
+    for history in records(data, parse, parse_history):
+        total += next_point(history[::-1])
+
+    return total
+
+
+@engine(9, 1, 'numpy', min_size=NUMPY_MIN_SIZE)
+def part1_numpy(data: str) -> int:
+    return sum_of_next_points(parse(data))
+
+
+@engine(9, 2, 'numpy', min_size=NUMPY_MIN_SIZE)
+def part2_numpy(data: str) -> int:
+    return sum_of_next_points(parse(data), backwards=True)
+
+
+def sum_of_next_points(histories: tuple[tuple[int]], backwards: bool = False) -> int:
+    """
+    Return the sum of every history's next point, all at once with numpy.
+
+    The next point is the sum of the last value of the history and of each of
+    its diffs, so take the diffs of every history of the same length together.
+    Histories whose numbers could overflow 64 bits are left to next_point.
+
+    """
+    by_length = dict()
+    for history in histories:
+        by_length.setdefault(len(history), []).append(history)
+
     total = 0
-    for variable in data.splitlines():
-        history = [int(x) for x in variable.split()]
-        history.reverse()
-        total += find_next_point(history)
+    for same_length in by_length.values():
+        try:
+            total += _numpy_sum_of_next_points(same_length, backwards)
+        except OverflowError:
+            total += sum(
+                next_point(history[::-1] if backwards else history)
+                for history in same_length
+            )
+    return total
+
+
+def _numpy_sum_of_next_points(histories: list[tuple[int]], backwards: bool) -> int:
+    """As sum_of_next_points, for histories of one length. OverflowError if not."""
+    import numpy as np
 
+    # Numbers that don't fit at all raise OverflowError here.
+    series = np.array(histories, dtype=np.int64)
+    if backwards:
+        series = series[:, ::-1]
+    total = 0
+    while series.shape[1] and series.any():
+        # numpy wraps around past 64 bits without a word. Diffs of numbers under
+        # 2**62 fit, and so does the last column's sum if n times the biggest does.
+        biggest = max(int(series.max()), -int(series.min()))
+        if biggest >= 1 << 62 or biggest * len(series) >= 1 << 63:
+            raise OverflowError("The diffs could pass 64 bits.")
+        total += int(series[:, -1].sum())
+        series = np.diff(series, axis=1)
     return total
 
 
+def solve(data: str) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
+
+
+# Plenty of sensors report the same history.
+@memoize(max_entries=1 << 15)
+def next_point(history: tuple[int]) -> int:
+    """Return the point after the history."""
+    # find_next_point extends the series it's given.
+    return find_next_point(list(history))
+
+
 def find_next_point(history: list[int]) -> int:
     diff = history
     serieses = [history]
@@ -61,7 +142,7 @@ def extrapolate(series: list[int], diff: list[int]) -> int:
 
 
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    sys.exit(main(['9']))
@@ -2,11 +2,18 @@
 
 from pathlib import Path
 
+from aoc2023.parse_cache import cached_parse
+
 HERE = Path(__file__).parent
 INPUTS_DIR = Path(HERE.parent, 'inputs')
 INPUT_FILE = Path(INPUTS_DIR, 'dayn')
 
 
+@cached_parse
+def parse(data: str) -> tuple[str]:
+    return tuple(data.splitlines())
+
+
 def part1(data: str) -> int:
     return 0
 
@@ -15,8 +22,14 @@ def part2(data: str) -> int:
     return 0
 
 
+def solve(data: str) -> tuple[int, int]:
+    """Return both parts' answers from a single parse."""
+    return part1(data), part2(data)
+
+
 if __name__ == "__main__":
-    with open(INPUT_FILE) as f:
-        data = f.read()
-    print('Part 1: ', part1(data))
-    print('Part 2: ', part2(data))
+    import sys
+
+    from aoc2023.runner import main
+    # The day's number, once it has one.
+    sys.exit(main(['0']))
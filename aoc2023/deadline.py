@@ -0,0 +1,101 @@
+"""
+Cooperative deadlines for the long searches.
+
+    from aoc2023 import deadline
+
+    with deadline.within(5):
+        answer = day23.part2(data)
+    if isinstance(answer, deadline.Partial):
+        print(f"Gave up after 5s. Best so far: {answer.best}")
+
+The slow loops (day 14's spin cycles, day 21's step counting, and the graph
+searches behind days 17 and 23) check the deadline as they go. Once it has
+passed they stop and return a Partial (whatever they had, and how far they
+got) instead of an answer. Without a deadline nothing changes: parts return
+their answers, and the check is one module attribute lookup:
+
+    if deadline.ACTIVE and deadline.expired():
+        return deadline.Partial(best, {'cycles': i})
+
+The tightest loops only check every CHECK_EVERY iterations.
+
+Parts that don't check just run to completion, however long that takes. This is
+cooperative, not a kill switch.
+
+A deadline belongs to whoever set it, not the process: it lives in a context
+variable, as the current Metrics does (see aoc2023.metrics), so parts solved at
+the same time on different threads each have their own, or none. ACTIVE only
+says somebody somewhere has one, so expired() is worth asking.
+
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional
+
+# Iterations between checks in loops too tight to look at the clock every time.
+CHECK_EVERY = 1024
+
+# Flag read at the call sites: True while anything, anywhere, has a deadline.
+ACTIVE = False
+
+# time.monotonic() value after which this context's searches should give up.
+_expires_at: ContextVar[float] = ContextVar('deadline', default=math.inf)
+_n_active = 0
+_lock = threading.Lock()
+
+
+@dataclass
+class Partial:
+    """What a search had when its deadline passed, in place of an answer."""
+
+    # The best answer found so far, if there's such a thing, else None.
+    best: Any = None
+    # How far it got, e.g. {'cycles': 212, 'of': 500}.
+    progress: dict = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        progress = ', '.join(f"{key}={value}" for key, value in self.progress.items())
+        return f"PARTIAL best so far {self.best} ({progress})"
+
+
+def expired() -> bool:
+    """True once the current deadline has passed."""
+    return time.monotonic() >= _expires_at.get()
+
+
+def remaining() -> float:
+    """Seconds left before the current deadline (inf if there isn't one)."""
+    return max(0.0, _expires_at.get() - time.monotonic())
+
+
+@contextmanager
+def within(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Give the searches in this block `seconds` to finish. None means no limit.
+
+    Nested deadlines can only shorten the one they're in, and the previous one
+    is restored on the way out.
+
+    """
+    global ACTIVE, _n_active
+
+    if seconds is None:
+        yield
+        return
+
+    token = _expires_at.set(min(_expires_at.get(), time.monotonic() + seconds))
+    with _lock:
+        _n_active += 1
+        ACTIVE = True
+    try:
+        yield
+    finally:
+        _expires_at.reset(token)
+        with _lock:
+            _n_active -= 1
+            ACTIVE = _n_active > 0
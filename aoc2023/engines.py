@@ -0,0 +1,143 @@
+"""
+More than one way to solve a part, and picking between them.
+
+A day's part1 and part2 are its reference engines: the readable versions,
+which stay put as the oracle the others are checked against. A day registers
+any faster ones next to them:
+
+    @engine(24, 1, 'numpy')
+    def part1_numpy(data: str) -> int:
+        ...
+
+    @engine(9, 1, 'numpy', min_size=numparse.NUMPY_MIN_SIZE)
+    def part1_numpy(data: str) -> int:
+        ...
+
+choose() picks an engine for an input. A registered engine applies to inputs
+of at least min_size (characters of text, or cells of a grid), which is how an
+engine that only pays off on big inputs (say, by importing numpy) stays out of
+the way of small ones. Of those that apply, the highest priority wins, and the
+reference only runs when nothing else applies. Streams (see aoc2023.streaming)
+always get the reference, as that's what takes them.
+
+    python -m aoc2023 24 --engine reference     # Force one.
+    python -m aoc2023.engines                   # What's registered.
+
+"""
+
+import argparse
+import sys
+from collections import defaultdict
+from typing import Any, Callable, NamedTuple, Optional
+
+REFERENCE = 'reference'
+
+
+class UnknownEngine(ValueError):
+    """There's no engine by that name for the part."""
+
+
+class Engine(NamedTuple):
+    """One way of solving one part of one day."""
+
+    name: str
+    fn: Callable[[Any], Any]
+    # The smallest input it's worth choosing for.
+    min_size: int = 0
+    priority: int = 0
+
+
+# (day, part): {name: engine}, filled in as day modules are imported.
+_registry: defaultdict[tuple[int, int], dict[str, Engine]] = defaultdict(dict)
+
+
+def engine(
+    day: int,
+    part: int,
+    name: str,
+    min_size: int = 0,
+    priority: int = 0,
+) -> Callable[[Callable], Callable]:
+    """Decorator: register fn as another engine for a day's part."""
+    if name == REFERENCE:
+        raise ValueError(f"The {REFERENCE} engine is the day's own part{part}.")
+
+    def decorator(fn: Callable) -> Callable:
+        _registry[day, part][name] = Engine(name, fn, min_size, priority)
+        return fn
+
+    return decorator
+
+
+def engines_for(day: int, part: int) -> dict[str, Engine]:
+    """Return every engine for a day's part by name, the reference first."""
+    from aoc2023.runner import load_day
+
+    # Importing the day registers its engines.
+    module = load_day(day)
+    engines = {REFERENCE: Engine(REFERENCE, getattr(module, f'part{part}'))}
+    engines.update(_registry[day, part])
+    return engines
+
+
+def input_size(data: Any) -> Optional[int]:
+    """Return the size of an input, or None for a stream."""
+    if isinstance(data, str):
+        return len(data)
+    cells = getattr(data, 'cells', None)
+    if cells is not None:
+        return len(cells)
+    return None
+
+
+def choose(day: int, part: int, data: Any, name: Optional[str] = None) -> Engine:
+    """Return the named engine, or else the best one for this input."""
+    engines = engines_for(day, part)
+    if name is not None:
+        try:
+            return engines[name]
+        except KeyError:
+            raise UnknownEngine(
+                f"Day {day} part {part} has no {name!r} engine, only "
+                f"{', '.join(engines)}."
+            ) from None
+
+    size = input_size(data)
+    if size is None:
+        return engines[REFERENCE]
+    applicable = [
+        candidate for candidate in engines.values()
+        if candidate.name != REFERENCE and size >= candidate.min_size
+    ]
+    if not applicable:
+        return engines[REFERENCE]
+    return max(applicable, key=lambda candidate: candidate.priority)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('days', nargs='*', type=int, help="Defaults to every day.")
+    args = parser.parse_args(argv)
+
+    from aoc2023.runner import PARTS, discover_days
+
+    # Run as a script, this is __main__, but the days register with the
+    # aoc2023.engines they import.
+    from aoc2023 import engines as registry
+
+    # Only the parts with a choice.
+    for day in args.days or discover_days():
+        for part in PARTS:
+            engines = registry.engines_for(day, part)
+            if len(engines) == 1:
+                continue
+            for engine_ in engines.values():
+                print(
+                    f"{day:>3}  part{part}  {engine_.name:<12} "
+                    f"min_size={engine_.min_size:<8} priority={engine_.priority}"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
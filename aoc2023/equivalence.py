@@ -0,0 +1,296 @@
+"""
+Check that every engine for a part agrees, on generated inputs.
+
+    python -m aoc2023.equivalence                   # Every day with a choice.
+    python -m aoc2023.equivalence 24 --seeds 100    # Harder.
+    python -m aoc2023.equivalence 9 --scale 5       # Bigger inputs.
+    python -m aoc2023.equivalence 12 17 22 23 --save before.json
+    python -m aoc2023.equivalence 12 17 22 23 --against before.json
+
+Each seed gives a day an input from aoc2023.generators, and every engine of
+each part (see aoc2023.engines) solves it, whatever size they'd normally be
+chosen for. They should all give the same answer, or all raise the same kind of
+exception. When they don't, the input is shrunk: lines are taken out for as
+long as the engines still disagree (and the reference still gets an answer, so
+the input hasn't just stopped being valid), leaving a small input to debug
+with. It's written next to the report.
+
+The safe way to land a big rewrite of a part is as an engine next to the code
+it replaces, checked here before it's allowed to be the default. For a change
+to a part's own code, --save records what the reference answers now for the
+same seeds, and --against checks it still does after. Those have nothing to
+shrink against, so a difference is reported as it is.
+
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple, Optional
+
+from aoc2023 import deadline, engines
+from aoc2023.generators import GENERATORS, generate
+from aoc2023.runner import PARTS
+
+SEEDS = 10
+# Small, so the slow days still get through plenty of seeds.
+SCALE = 0.2
+# Seconds to let the engines have at each shrunk input, which can send a search
+# somewhere much slower than the original did.
+SHRINK_TIMEOUT = 10.0
+
+
+class Outcome(NamedTuple):
+    """An engine's answer, or the kind of exception it raised instead."""
+
+    answer: Any = None
+    error: Optional[str] = None
+
+    def __str__(self) -> str:
+        return f"raised {self.error}" if self.error else str(self.answer)
+
+
+class Mismatch(NamedTuple):
+    """Engines (or a saved answer) that disagree about an input."""
+
+    day: int
+    part: int
+    seed: int
+    scale: float
+    outcomes: dict[str, Outcome]
+    # The input they disagree about, shrunk if that was possible.
+    data: str
+
+    def __str__(self) -> str:
+        lines = [
+            f"Day {self.day} part {self.part}, seed {self.seed} at scale {self.scale}:"
+        ]
+        lines.extend(
+            f"    {name:<12} {outcome}" for name, outcome in self.outcomes.items()
+        )
+        return '\n'.join(lines)
+
+
+def run_engines(day: int, part: int, data: str) -> dict[str, Outcome]:
+    """Solve the input with every engine for the part."""
+    outcomes = dict()
+    for name, engine in engines.engines_for(day, part).items():
+        try:
+            outcomes[name] = Outcome(engine.fn(data))
+        except Exception as e:
+            # Messages can differ for the same problem, so only the type counts.
+            outcomes[name] = Outcome(error=type(e).__name__)
+    return outcomes
+
+
+def disagree(outcomes: dict[str, Outcome]) -> bool:
+    # Not by set(): answers needn't be hashable.
+    first, *others = outcomes.values()
+    return any(outcome != first for outcome in others)
+
+
+def check(
+    day: int,
+    seed: int,
+    scale: float = SCALE,
+    parts: tuple[int] = PARTS,
+    shrink_failures: bool = True,
+) -> list[Mismatch]:
+    """Return how the engines disagree on a generated input, if they do."""
+    data = generate(day, scale, seed)
+    mismatches = []
+    for part in parts:
+        if len(engines.engines_for(day, part)) < 2:
+            continue
+        outcomes = run_engines(day, part, data)
+        if disagree(outcomes):
+            failing = shrink(day, part, data) if shrink_failures else data
+            if failing != data:
+                outcomes = run_engines(day, part, failing)
+            mismatches.append(Mismatch(day, part, seed, scale, outcomes, failing))
+    return mismatches
+
+
+def shrink(day: int, part: int, data: str, timeout: float = SHRINK_TIMEOUT) -> str:
+    """
+    Return as few of the input's lines as still have the engines disagreeing,
+    with the reference getting an answer.
+
+    """
+
+    def still_fails(lines: list[str]) -> bool:
+        with deadline.within(timeout):
+            outcomes = run_engines(day, part, ''.join(lines))
+        reference = outcomes[engines.REFERENCE]
+        if reference.error or any(
+            isinstance(outcome.answer, deadline.Partial)
+            for outcome in outcomes.values()
+        ):
+            return False
+        return disagree(outcomes)
+
+    # Delta debugging: try the input without each of n chunks, and split into
+    # finer chunks once none of them can go, until it's down to single lines.
+    lines = data.splitlines(keepends=True)
+    n_chunks = 2
+    while len(lines) >= 2:
+        size = -(-len(lines) // n_chunks)
+        for start in range(0, len(lines), size):
+            candidate = lines[:start] + lines[start + size:]
+            if candidate and still_fails(candidate):
+                lines = candidate
+                n_chunks = max(n_chunks - 1, 2)
+                break
+        else:
+            if n_chunks >= len(lines):
+                break
+            n_chunks = min(2 * n_chunks, len(lines))
+    return ''.join(lines)
+
+
+def days_with_a_choice() -> list[int]:
+    """Return the days with a generator and more than one engine for a part."""
+    return [
+        day for day in sorted(GENERATORS)
+        if any(len(engines.engines_for(day, part)) > 1 for part in PARTS)
+    ]
+
+
+def _saved_key(day: int, part: int, seed: int, scale: float) -> str:
+    return f'{day}/{part}/{seed}/{scale}'
+
+
+def reference_answers(
+    days: Iterable[int],
+    seeds: Iterable[int],
+    scale: float = SCALE,
+) -> dict[str, Any]:
+    """Return the reference engines' answers on generated inputs, for saving."""
+    answers = dict()
+    for day in days:
+        for seed in seeds:
+            data = generate(day, scale, seed)
+            for part in PARTS:
+                reference = engines.engines_for(day, part)[engines.REFERENCE]
+                try:
+                    outcome = Outcome(reference.fn(data))
+                except Exception as e:
+                    outcome = Outcome(error=type(e).__name__)
+                # As it'll come back from JSON.
+                answers[_saved_key(day, part, seed, scale)] = json.loads(
+                    json.dumps(outcome._asdict(), default=str)
+                )
+    return answers
+
+
+def check_against(
+    saved: dict[str, Any],
+    days: Iterable[int],
+    seeds: Iterable[int],
+    scale: float = SCALE,
+) -> list[Mismatch]:
+    """Return where the reference engines no longer give the saved answers."""
+    days, seeds = list(days), list(seeds)
+    mismatches = []
+    now = reference_answers(days, seeds, scale)
+    for day in days:
+        for seed in seeds:
+            for part in PARTS:
+                key = _saved_key(day, part, seed, scale)
+                if key not in saved:
+                    raise KeyError(f"Nothing saved for {key} (day/part/seed/scale).")
+                if now[key] != saved[key]:
+                    outcomes = {
+                        'saved': Outcome(**saved[key]),
+                        engines.REFERENCE: Outcome(**now[key]),
+                    }
+                    data = generate(day, scale, seed)
+                    mismatches.append(Mismatch(day, part, seed, scale, outcomes, data))
+    return mismatches
+
+
+def report(mismatches: list[Mismatch], out_dir: Path) -> None:
+    """Print each mismatch, and write the input it happened on to out_dir."""
+    for mismatch in mismatches:
+        path = Path(
+            out_dir,
+            f'mismatch-day{mismatch.day}-part{mismatch.part}-seed{mismatch.seed}',
+        )
+        path.write_text(mismatch.data)
+        print(mismatch)
+        print(f"    input ({len(mismatch.data.splitlines())} lines): {path}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        'days', nargs='*', type=int,
+        help="Defaults to every day with more than one engine (or that was saved).",
+    )
+    parser.add_argument(
+        '-n', '--seeds', type=int, default=SEEDS,
+        help=f"Inputs per day (seeds 0..N-1). Defaults to {SEEDS}.",
+    )
+    parser.add_argument(
+        '--scale', type=float, default=SCALE,
+        help=f"Size of each input, relative to a real one. Defaults to {SCALE}.",
+    )
+    parser.add_argument(
+        '--no-shrink', action='store_true',
+        help="Report failing inputs whole.",
+    )
+    parser.add_argument(
+        '-o', '--out-dir', type=Path, default=Path('.'),
+        help="Where to write the inputs that fail. Defaults to here.",
+    )
+    saved = parser.add_mutually_exclusive_group()
+    saved.add_argument(
+        '--save', metavar='PATH',
+        help="Save the reference engines' answers to PATH instead of checking.",
+    )
+    saved.add_argument(
+        '--against', metavar='PATH',
+        help="Check the reference engines still give the answers saved in PATH.",
+    )
+    args = parser.parse_args(argv)
+
+    saved_answers = None
+    if args.against:
+        saved_answers = json.loads(Path(args.against).read_text())
+    if args.days:
+        days = args.days
+    elif saved_answers is not None:
+        days = sorted({int(key.split('/')[0]) for key in saved_answers})
+    else:
+        days = days_with_a_choice()
+    missing = [day for day in days if day not in GENERATORS]
+    if missing:
+        parser.error(f"No generator for day(s) {missing}.")
+    seeds = range(args.seeds)
+
+    if args.save:
+        answers = reference_answers(days, seeds, args.scale)
+        Path(args.save).write_text(json.dumps(answers, indent=1))
+        print(f"Saved {len(answers)} answers to {args.save}.")
+        return 0
+
+    mismatches = []
+    if saved_answers is not None:
+        try:
+            mismatches.extend(check_against(saved_answers, days, seeds, args.scale))
+        except KeyError as e:
+            parser.error(e.args[0])
+    for day in days:
+        for seed in seeds:
+            mismatches.extend(check(
+                day, seed, args.scale, shrink_failures=not args.no_shrink,
+            ))
+        print(f"Day {day}: checked {args.seeds} inputs.", file=sys.stderr)
+
+    report(mismatches, args.out_dir)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,820 @@
+"""
+Synthetic puzzle inputs, scaled relative to the size of a real input.
+
+    python -m aoc2023.generators 17 --scale 10 > big_day17
+
+`generate(day, scale, seed)` returns an input for that day which is roughly
+`scale` times the size of a real puzzle input (records for line-based days,
+cells for grid days) and is valid for the solvers: loops close, mazes connect,
+hailstones actually share a trajectory, and so on. The same seed always gives
+the same input.
+
+A few puzzles bake sizes into the solution (day 21 part 2 assumes a 131 wide
+garden, day 16 caps the number of beam steps), so answers at other scales only
+mean anything for benchmarking.
+
+"""
+
+import argparse
+import math
+import random
+import string
+import sys
+from typing import Callable, Optional
+
+DEFAULT_SEED = 2023
+
+# Day --> generator(scale, rng) -> str
+GENERATORS: dict[int, Callable[[float, random.Random], str]] = dict()
+
+# Up, right, down, left as (dx, dy), y increasing downward.
+STEPS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+
+def generator(day: int) -> Callable:
+    """Register a generator for a day."""
+    def register(fn: Callable) -> Callable:
+        GENERATORS[day] = fn
+        return fn
+    return register
+
+
+def generate(day: int, scale: float = 1, seed: int = DEFAULT_SEED) -> str:
+    """Return an input for a day, about scale times the size of a real one."""
+    try:
+        fn = GENERATORS[day]
+    except KeyError:
+        raise ValueError(f"No generator for day {day}.") from None
+    # Mix the day in so every day doesn't share the same random stream.
+    return fn(scale, random.Random(f"{seed}-{day}"))
+
+
+def scaled_count(n: int, scale: float) -> int:
+    """Scale a number of records."""
+    return max(1, round(n * scale))
+
+
+def scaled_side(side: int, scale: float) -> int:
+    """Scale the side of a square grid so the number of cells scales."""
+    return max(3, round(side * math.sqrt(scale)))
+
+
+def unique_names(
+    rng: random.Random,
+    n: int,
+    alphabet: str = string.ascii_lowercase,
+    length: int = 3,
+    exclude: tuple[str] = (),
+) -> list[str]:
+    """Return n unique random names, growing the name length if needed."""
+    while len(alphabet)**length < 2*(n + len(exclude)):
+        length += 1
+    names = set()
+    excluded = set(exclude)
+    while len(names) < n:
+        name = ''.join(rng.choices(alphabet, k=length))
+        if name not in excluded:
+            names.add(name)
+    names = sorted(names)
+    rng.shuffle(names)
+    return names
+
+
+def tree_outline(
+    rng: random.Random,
+    a: int,
+    b: int,
+    thickness: int = 1,
+) -> list[tuple[int]]:
+    """
+    Return the vertices of a random simple closed rectilinear loop.
+
+    A random spanning tree on an a x b grid is drawn 'thick' (nodes on even
+    cells, edges on the cells between them) so that it is a simply connected
+    polyomino with no cells touching only at a corner. The outline of such a
+    polyomino never touches itself. Vertices are unit steps apart, clockwise
+    (with y down), and the loop spans (2a) x (2b) lattice points, times the
+    thickness. A thickness of 1 leaves no lattice points inside the loop.
+
+    """
+    cells = set()
+    start = (rng.randrange(a), rng.randrange(b))
+    seen = {start}
+    stack = [start]
+    cells.add((2*start[0], 2*start[1]))
+    while stack:
+        i, j = stack[-1]
+        options = [
+            (i+di, j+dj) for di, dj in STEPS
+            if 0 <= i+di < a and 0 <= j+dj < b and (i+di, j+dj) not in seen
+        ]
+        if not options:
+            stack.pop()
+            continue
+        ni, nj = rng.choice(options)
+        seen.add((ni, nj))
+        cells.add((2*ni, 2*nj))
+        cells.add((i+ni, j+nj))
+        stack.append((ni, nj))
+
+    cells = {
+        (x*thickness + i, y*thickness + j)
+        for x, y in cells
+        for i in range(thickness)
+        for j in range(thickness)
+    }
+
+    # Walk each cell's edges clockwise. Edges shared by two cells cancel out,
+    # leaving the outline.
+    successor = dict()
+    for x, y in cells:
+        corners = [(x, y), (x+1, y), (x+1, y+1), (x, y+1)]
+        for k, (dx, dy) in enumerate(STEPS):
+            neighbor = (x+dx, y+dy)
+            if neighbor in cells:
+                continue
+            successor[corners[k]] = corners[(k+1) % 4]
+
+    loop = [min(successor)]
+    while True:
+        next_ = successor[loop[-1]]
+        if next_ == loop[0]:
+            return loop
+        loop.append(next_)
+
+
+@generator(1)
+def day1(scale: float, rng: random.Random) -> str:
+    words = ['one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine']
+    lines = []
+    for _ in range(scaled_count(1000, scale)):
+        chunks = [rng.choice(string.digits[1:])]
+        for _ in range(rng.randint(2, 8)):
+            kind = rng.random()
+            if kind < 0.3:
+                chunks.append(rng.choice(words))
+            elif kind < 0.5:
+                chunks.append(rng.choice(string.digits[1:]))
+            else:
+                n_letters = rng.randint(1, 5)
+                chunks.append(''.join(rng.choices(string.ascii_lowercase, k=n_letters)))
+        rng.shuffle(chunks)
+        lines.append(''.join(chunks))
+    return '\n'.join(lines) + '\n'
+
+
+@generator(2)
+def day2(scale: float, rng: random.Random) -> str:
+    lines = []
+    for game_id in range(1, scaled_count(100, scale) + 1):
+        pulls = []
+        for _ in range(rng.randint(1, 6)):
+            colors = rng.sample(['red', 'green', 'blue'], k=rng.randint(1, 3))
+            pulls.append(', '.join(f"{rng.randint(1, 20)} {color}" for color in colors))
+        lines.append(f"Game {game_id}: {'; '.join(pulls)}")
+    return '\n'.join(lines) + '\n'
+
+
+@generator(3)
+def day3(scale: float, rng: random.Random) -> str:
+    side = scaled_side(140, scale)
+    grid = [['.']*side for _ in range(side)]
+    symbols = '*#+$@/=%&-'
+    symbol_at = set()
+    for y in range(side):
+        for x in range(side):
+            if rng.random() < 0.05:
+                grid[y][x] = rng.choice(symbols)
+                symbol_at.add((x, y))
+
+    # Numbers may touch at most one symbol (part 1 checks), and need a gap on
+    # either side so they don't run together.
+    for y in range(side):
+        x = 0
+        while x < side:
+            length = rng.randint(1, 3)
+            span = range(x, x+length)
+            if x + length > side or rng.random() > 0.35:
+                x += 1
+                continue
+            box = {
+                (bx, by)
+                for bx in range(x-1, x+length+1)
+                for by in (y-1, y, y+1)
+            }
+            if (
+                any(grid[y][sx] != '.' for sx in span)
+                or (x > 0 and grid[y][x-1].isdigit())
+                or len(box & symbol_at) > 1
+            ):
+                x += 1
+                continue
+            digits = str(rng.randint(10**(length-1), 10**length - 1))
+            for sx, digit in zip(span, digits):
+                grid[y][sx] = digit
+            x += length + 1
+    return '\n'.join(''.join(row) for row in grid) + '\n'
+
+
+@generator(4)
+def day4(scale: float, rng: random.Random) -> str:
+    n_cards = scaled_count(200, scale)
+    width = len(str(n_cards))
+    lines = []
+    for card in range(1, n_cards + 1):
+        # Real cards mostly lose, and winners only copy cards that exist. Keep
+        # runs of winners short so copies can't snowball.
+        n_wins = 0 if rng.random() < 0.6 else rng.randint(1, 4)
+        n_wins = min(n_wins, n_cards - card)
+        winning = rng.sample(range(1, 100), k=10)
+        losing = [n for n in range(1, 100) if n not in winning]
+        yours = rng.sample(winning, k=n_wins) + rng.sample(losing, k=25-n_wins)
+        rng.shuffle(yours)
+        lines.append(
+            f"Card {card:>{width}}: {' '.join(f'{n:>2}' for n in winning)}"
+            f" | {' '.join(f'{n:>2}' for n in yours)}"
+        )
+    return '\n'.join(lines) + '\n'
+
+
+@generator(5)
+def day5(scale: float, rng: random.Random) -> str:
+    upper = 2**32
+    names = ['seed', 'soil', 'fertilizer', 'water', 'light', 'temperature',
+             'humidity', 'location']
+    n_pairs = scaled_count(10, scale)
+    seeds = []
+    for _ in range(n_pairs):
+        start = rng.randrange(upper // 2)
+        seeds.extend([start, rng.randint(1, upper // (4*n_pairs))])
+    blocks = [f"seeds: {' '.join(str(s) for s in seeds)}"]
+
+    for source, dest in zip(names, names[1:]):
+        # Cut [0, upper) into segments and send them to a shuffled layout of the
+        # same segments, so the map is 1:1 like the real thing.
+        n_ranges = scaled_count(rng.randint(25, 45), scale)
+        cuts = sorted(rng.sample(range(1, upper), k=n_ranges - 1))
+        bounds = [0, *cuts, upper]
+        segments = list(zip(bounds, bounds[1:]))
+        order = list(range(len(segments)))
+        rng.shuffle(order)
+        dest_start = 0
+        lines = []
+        for idx in order:
+            src_start, src_end = segments[idx]
+            lines.append(f"{dest_start} {src_start} {src_end - src_start}")
+            dest_start += src_end - src_start
+        rng.shuffle(lines)
+        blocks.append(f"{source}-to-{dest} map:\n" + '\n'.join(lines))
+    return '\n\n'.join(blocks) + '\n'
+
+
+@generator(6)
+def day6(scale: float, rng: random.Random) -> str:
+    """
+    Part 2 concatenates the columns and counts through the race, so scale the
+    first race up rather than adding races.
+
+    Records sit below the best possible distance, and the later races get
+    records with twice as many digits as their times so the concatenated race
+    can be won too.
+
+    """
+    times = [round(rng.randint(40, 60) * scale)]
+    distances = [math.floor(times[0]**2 / 4 * rng.uniform(0.5, 0.9))]
+    while len(times) < 4:
+        time_ = rng.randint(64, 99)
+        best = time_**2 // 4
+        times.append(time_)
+        distances.append(rng.randint(1000, min(best - 1, 9999)))
+    width = max(len(str(x)) for x in times + distances) + 1
+    return (
+        'Time:    ' + ''.join(f"{t:>{width}}" for t in times) + '\n'
+        + 'Distance:' + ''.join(f"{d:>{width}}" for d in distances) + '\n'
+    )
+
+
+@generator(7)
+def day7(scale: float, rng: random.Random) -> str:
+    cards = 'AKQJT98765432'
+    lines = [
+        f"{''.join(rng.choices(cards, k=5))} {rng.randint(1, 1000)}"
+        for _ in range(scaled_count(1000, scale))
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+@generator(8)
+def day8(scale: float, rng: random.Random) -> str:
+    """
+    Ghosts walk independent cycles and land on a Z at the end of each lap.
+
+    Every node in lap position k goes to one of the two nodes in position k+1
+    (L and R pick different ones), so the lap length doesn't depend on the
+    directions, which is the property the LCM trick relies on.
+
+    """
+    n_ghosts = 6
+    directions = ''.join(rng.choices('LR', k=scaled_count(280, scale)))
+    n_nodes = scaled_count(750, scale)
+    lap = max(3, n_nodes // (2*n_ghosts))
+    # Distinct primes (ish) keep the LCM from being trivial.
+    laps = []
+    candidate = lap
+    while len(laps) < n_ghosts:
+        if all(candidate % p for p in range(2, int(candidate**0.5) + 1)):
+            laps.append(candidate)
+        candidate += 1
+
+    alphabet = string.ascii_uppercase + string.digits
+    middle_alphabet = ''.join(c for c in alphabet if c not in 'AZ')
+    n_middle = sum(2*(lap - 1) for lap in laps)
+    prefixes = unique_names(rng, n_ghosts, alphabet, length=2, exclude=('AA', 'ZZ'))
+    middles = iter(unique_names(rng, n_middle, alphabet, length=2))
+    mapping = dict()
+    for ghost, lap in enumerate(laps):
+        prefix = 'AA' if ghost == 0 else prefixes[ghost]
+        end = 'ZZZ' if ghost == 0 else f"{prefix}Z"
+        start = f"{prefix}A"
+        positions = [
+            [next(middles) + rng.choice(middle_alphabet) for _ in range(2)]
+            for _ in range(lap - 1)
+        ]
+        positions.append([end, end])
+        mapping[start] = positions[0].copy()
+        mapping[end] = positions[0].copy()
+        for here, there in zip(positions, positions[1:]):
+            for node in here:
+                if node in mapping:
+                    continue
+                pair = there.copy()
+                rng.shuffle(pair)
+                mapping[node] = pair
+    nodes = list(mapping.items())
+    rng.shuffle(nodes)
+    lines = [f"{node} = ({left}, {right})" for node, (left, right) in nodes]
+    return directions + '\n\n' + '\n'.join(lines) + '\n'
+
+
+@generator(9)
+def day9(scale: float, rng: random.Random) -> str:
+    lines = []
+    for _ in range(scaled_count(200, scale)):
+        coefficients = [rng.randint(-9, 9) for _ in range(rng.randint(1, 7))]
+        values = [
+            sum(c * x**power for power, c in enumerate(coefficients))
+            for x in range(21)
+        ]
+        lines.append(' '.join(str(v) for v in values))
+    return '\n'.join(lines) + '\n'
+
+
+@generator(10)
+def day10(scale: float, rng: random.Random) -> str:
+    side = scaled_side(140, scale)
+    # +2 for a margin so the loop never touches the edge.
+    # Thick enough that the loop has tiles inside it.
+    quarter = max(1, (side - 2) // 4)
+    loop = tree_outline(rng, quarter, quarter, thickness=2)
+    width = 4*quarter + 2
+    grid = [[rng.choice('|-LJ7F..') for _ in range(width)] for _ in range(width)]
+    pipes = {
+        frozenset('ns'): '|', frozenset('ew'): '-', frozenset('ne'): 'L',
+        frozenset('nw'): 'J', frozenset('sw'): '7', frozenset('es'): 'F',
+    }
+
+    def heading(a: tuple[int], b: tuple[int]) -> str:
+        dx, dy = b[0] - a[0], b[1] - a[1]
+        return {(0, -1): 'n', (1, 0): 'e', (0, 1): 's', (-1, 0): 'w'}[(dx, dy)]
+
+    for idx, here in enumerate(loop):
+        before = loop[idx - 1]
+        after = loop[(idx + 1) % len(loop)]
+        ends = heading(here, before) + heading(here, after)
+        grid[here[1]+1][here[0]+1] = pipes[frozenset(ends)]
+
+    start = rng.choice(loop)
+    sx, sy = start[0] + 1, start[1] + 1
+    grid[sy][sx] = 'S'
+    # Junk next to S could look like a third connection.
+    loop_cells = {(x+1, y+1) for x, y in loop}
+    for dx, dy in STEPS:
+        if (sx+dx, sy+dy) not in loop_cells:
+            grid[sy+dy][sx+dx] = '.'
+    return '\n'.join(''.join(row) for row in grid) + '\n'
+
+
+@generator(11)
+def day11(scale: float, rng: random.Random) -> str:
+    side = scaled_side(140, scale)
+    empty_rows = set(rng.sample(range(side), k=max(1, side // 20)))
+    empty_cols = set(rng.sample(range(side), k=max(1, side // 20)))
+    rows = []
+    for y in range(side):
+        rows.append(''.join(
+            '#' if y not in empty_rows and x not in empty_cols and rng.random() < 0.023
+            else '.'
+            for x in range(side)
+        ))
+    return '\n'.join(rows) + '\n'
+
+
+@generator(12)
+def day12(scale: float, rng: random.Random) -> str:
+    # Lay out a real row of springs first so every record has an arrangement,
+    # then forget some of them.
+    lines = []
+    for _ in range(scaled_count(1000, scale)):
+        groups = []
+        cells = ['.'] * rng.randint(0, 2)
+        while len(groups) < 6:
+            group = rng.randint(1, 5)
+            gap = rng.randint(1, 3)
+            if groups and len(cells) + gap + group > 20:
+                break
+            if groups:
+                cells.extend(['.'] * gap)
+            cells.extend(['#'] * group)
+            groups.append(group)
+        cells.extend(['.'] * rng.randint(0, max(0, 20 - len(cells))))
+        springs = ''.join(c if rng.random() > 0.45 else '?' for c in cells)
+        lines.append(f"{springs} {','.join(str(g) for g in groups)}")
+    return '\n'.join(lines) + '\n'
+
+
+def _mirror_mismatches(rows: list[str]) -> dict[int, int]:
+    """Return {line: cells that don't mirror} for each line between rows."""
+    mismatches = dict()
+    for line in range(1, len(rows)):
+        pairs = zip(reversed(rows[:line]), rows[line:])
+        mismatches[line] = sum(
+            a != b for top, bottom in pairs for a, b in zip(top, bottom)
+        )
+    return mismatches
+
+
+@generator(13)
+def day13(scale: float, rng: random.Random) -> str:
+    """
+    Each pattern has one clean vertical mirror and one smudged horizontal one.
+
+    The pattern is mirrored both ways, then a cell outside of the vertical
+    mirror's reach is flipped so only the horizontal mirror is smudged.
+    Patterns with any other (near) mirrors get thrown back.
+
+    """
+    patterns = []
+    while len(patterns) < scaled_count(100, scale):
+        width = rng.randint(7, 17)
+        height = rng.randint(5, 17)
+        col_line = rng.randint(1, (width - 1) // 2)
+        row_line = rng.randint(1, height // 2)
+        grid = [[rng.choice('.#') for _ in range(width)] for _ in range(height)]
+        for y in range(height):
+            for x in range(col_line, 2*col_line):
+                grid[y][x] = grid[y][2*col_line - 1 - x]
+        for y in range(row_line, 2*row_line):
+            grid[y] = grid[2*row_line - 1 - y].copy()
+        # Smudge a mirrored row, right of the vertical mirror's reach.
+        y = rng.randrange(2*row_line)
+        x = rng.randrange(2*col_line, width)
+        grid[y][x] = '#' if grid[y][x] == '.' else '.'
+
+        rows = [''.join(row) for row in grid]
+        cols = [''.join(col) for col in zip(*rows)]
+        by_row = _mirror_mismatches(rows)
+        by_col = _mirror_mismatches(cols)
+        clean = [('c', k) for k, v in by_col.items() if v == 0]
+        clean += [('r', k) for k, v in by_row.items() if v == 0]
+        smudged = [('c', k) for k, v in by_col.items() if v == 1]
+        smudged += [('r', k) for k, v in by_row.items() if v == 1]
+        if clean == [('c', col_line)] and smudged == [('r', row_line)]:
+            patterns.append('\n'.join(rows))
+    return '\n\n'.join(patterns) + '\n'
+
+
+@generator(14)
+def day14(scale: float, rng: random.Random) -> str:
+    side = scaled_side(100, scale)
+    rows = [
+        ''.join(rng.choices('.#O', weights=(75, 10, 15), k=side))
+        for _ in range(side)
+    ]
+    return '\n'.join(rows) + '\n'
+
+
+@generator(15)
+def day15(scale: float, rng: random.Random) -> str:
+    n_steps = scaled_count(4000, scale)
+    labels = unique_names(rng, max(10, n_steps // 8), length=rng.randint(2, 6))
+    steps = []
+    for _ in range(n_steps):
+        label = rng.choice(labels)
+        if rng.random() < 0.6:
+            steps.append(f"{label}={rng.randint(1, 9)}")
+        else:
+            steps.append(f"{label}-")
+    return ','.join(steps) + '\n'
+
+
+@generator(16)
+def day16(scale: float, rng: random.Random) -> str:
+    side = scaled_side(110, scale)
+    rows = [
+        ''.join(rng.choices('.\\/|-', weights=(90, 2.5, 2.5, 2.5, 2.5), k=side))
+        for _ in range(side)
+    ]
+    return '\n'.join(rows) + '\n'
+
+
+@generator(17)
+def day17(scale: float, rng: random.Random) -> str:
+    side = scaled_side(141, scale)
+    rows = [''.join(rng.choices('123456789', k=side)) for _ in range(side)]
+    return '\n'.join(rows) + '\n'
+
+
+def _stretch(values: set[int], rng: random.Random, low: int, high: int) -> dict:
+    """Map sorted values onto new sorted values with random gaps."""
+    mapping = dict()
+    position = 0
+    for value in sorted(values):
+        mapping[value] = position
+        position += rng.randint(low, high)
+    return mapping
+
+
+@generator(18)
+def day18(scale: float, rng: random.Random) -> str:
+    """
+    Both dig plans trace the same simple loop, stretched differently.
+
+    Stretching x and y monotonically keeps the loop from crossing itself, so
+    part 1's plan and part 2's (hidden in the colors) are both valid and have
+    the same number of steps.
+
+    """
+    # A real plan has ~700 steps; each step of the outline compressed to runs
+    # is worth about 2 cells of tree.
+    a = max(2, round(math.sqrt(350 * scale / 4)))
+    loop = tree_outline(rng, a, a)
+    corners = [
+        here for idx, here in enumerate(loop)
+        if loop[idx - 1][0] != loop[(idx + 1) % len(loop)][0]
+        and loop[idx - 1][1] != loop[(idx + 1) % len(loop)][1]
+    ]
+    xs = {x for x, _ in corners}
+    ys = {y for _, y in corners}
+    small_x, small_y = _stretch(xs, rng, 1, 10), _stretch(ys, rng, 1, 10)
+    big_x, big_y = _stretch(xs, rng, 1, 0xFFFFF), _stretch(ys, rng, 1, 0xFFFFF)
+
+    lines = []
+    codes = {'R': 0, 'D': 1, 'L': 2, 'U': 3}
+    for here, there in zip(corners, corners[1:] + corners[:1]):
+        if here[0] == there[0]:
+            direction = 'D' if there[1] > here[1] else 'U'
+            n = abs(small_y[there[1]] - small_y[here[1]])
+            color = abs(big_y[there[1]] - big_y[here[1]])
+        else:
+            direction = 'R' if there[0] > here[0] else 'L'
+            n = abs(small_x[there[0]] - small_x[here[0]])
+            color = abs(big_x[there[0]] - big_x[here[0]])
+        lines.append(f"{direction} {n} (#{color:05x}{codes[direction]})")
+    return '\n'.join(lines) + '\n'
+
+
+@generator(19)
+def day19(scale: float, rng: random.Random) -> str:
+    n_workflows = scaled_count(550, scale)
+    names = unique_names(rng, n_workflows - 1, exclude=('in',))
+    names.insert(0, 'in')
+    # Each workflow only sends parts to later workflows, so nothing loops.
+    unclaimed = list(range(1, n_workflows))
+    targets = {idx: [] for idx in range(n_workflows)}
+    for idx in range(n_workflows):
+        n_steps = rng.randint(2, 4)
+        while len(targets[idx]) < n_steps:
+            if unclaimed and unclaimed[0] > idx:
+                targets[idx].append(names[unclaimed.pop(0)])
+            else:
+                targets[idx].append(rng.choice('AR'))
+        rng.shuffle(targets[idx])
+
+    lines = []
+    for idx, name in enumerate(names):
+        steps = []
+        for goto in targets[idx][:-1]:
+            attr = rng.choice('xmas')
+            comparator = rng.choice('<>')
+            steps.append(f"{attr}{comparator}{rng.randint(2, 3999)}:{goto}")
+        steps.append(targets[idx][-1])
+        lines.append(f"{name}{{{','.join(steps)}}}")
+    rng.shuffle(lines)
+
+    parts = [
+        "{" + ','.join(f"{attr}={rng.randint(1, 4000)}" for attr in 'xmas') + "}"
+        for _ in range(scaled_count(200, scale))
+    ]
+    return '\n'.join(lines) + '\n\n' + '\n'.join(parts) + '\n'
+
+
+@generator(21)
+def day21(scale: float, rng: random.Random) -> str:
+    # Odd, with S dead center and clear lanes through it, like the real thing.
+    side = scaled_side(131, scale) | 1
+    middle = side // 2
+    grid = [
+        ['#' if rng.random() < 0.15 else '.' for _ in range(side)]
+        for _ in range(side)
+    ]
+    for idx in range(side):
+        grid[middle][idx] = grid[idx][middle] = '.'
+        grid[0][idx] = grid[side-1][idx] = grid[idx][0] = grid[idx][side-1] = '.'
+    grid[middle][middle] = 'S'
+    return '\n'.join(''.join(row) for row in grid) + '\n'
+
+
+@generator(22)
+def day22(scale: float, rng: random.Random) -> str:
+    n_bricks = scaled_count(1200, scale)
+    occupied = set()
+    lines = []
+    z = 1
+    while len(lines) < n_bricks:
+        axis = rng.choice('xyzc')
+        length = 1 if axis == 'c' else rng.randint(2, 5)
+        x, y = rng.randrange(10), rng.randrange(10)
+        start = (x, y, z)
+        end = list(start)
+        if axis != 'c':
+            end['xyz'.index(axis)] += length - 1
+        if end[0] > 9 or end[1] > 9:
+            continue
+        cubes = {
+            (cx, cy, cz)
+            for cx in range(start[0], end[0] + 1)
+            for cy in range(start[1], end[1] + 1)
+            for cz in range(start[2], end[2] + 1)
+        }
+        if cubes & occupied:
+            z += 1
+            continue
+        occupied |= cubes
+        lines.append(f"{x},{y},{z}~{end[0]},{end[1]},{end[2]}")
+        # Leave gaps so they have somewhere to fall.
+        z += rng.randint(0, 2)
+    rng.shuffle(lines)
+    return '\n'.join(lines) + '\n'
+
+
+def _meander(
+    rng: random.Random,
+    start: int,
+    stop: int,
+    center: int,
+    amplitude: int,
+) -> list[tuple[int]]:
+    """
+    Return (along, across) cells wandering from start to stop.
+
+    Runs across the corridor are two cells apart so the path never touches
+    itself.
+
+    """
+    cells = []
+    along = start
+    across = center
+    while along < stop:
+        if stop - along > 3:
+            target = rng.randint(center - amplitude, center + amplitude)
+        else:
+            target = center
+        step = 1 if target > across else -1
+        while across != target:
+            cells.append((along, across))
+            across += step
+        cells.append((along, across))
+        cells.append((along + 1, across))
+        along += 2
+    if along == stop:
+        cells.append((along, across))
+    while across != center:
+        across += 1 if center > across else -1
+        cells.append((stop, across))
+    return cells
+
+
+@generator(23)
+def day23(scale: float, rng: random.Random) -> str:
+    """
+    A lattice of junctions joined by winding corridors that only slope right
+    and down, like the real map.
+
+    Straight stubs next to each junction keep corridors two cells apart, so no
+    shortcuts appear between them.
+
+    """
+    k = max(2, round(6 * math.sqrt(scale)))
+    spacing = 24
+    amplitude = 5
+    stub = amplitude + 2
+    margin = stub + 2
+    coords = [margin + spacing*i for i in range(k)]
+    side = coords[-1] + margin + 1
+    side |= 1
+    grid = [['#']*side for _ in range(side)]
+
+    def dig(x: int, y: int, char: str = '.') -> None:
+        grid[y][x] = char
+
+    for j, y in enumerate(coords):
+        for i, x in enumerate(coords):
+            dig(x, y)
+            if i + 1 < k:
+                # Right: stub, meander, stub.
+                x_next = coords[i+1]
+                for sx in range(x, x + stub):
+                    dig(sx, y)
+                for sx, sy in _meander(rng, x + stub, x_next - stub, y, amplitude):
+                    dig(sx, sy)
+                for sx in range(x_next - stub, x_next):
+                    dig(sx, y)
+                dig(x + 1, y, '>')
+                dig(x_next - 1, y, '>')
+            if j + 1 < k:
+                y_next = coords[j+1]
+                for sy in range(y, y + stub):
+                    dig(x, sy)
+                for sy, sx in _meander(rng, y + stub, y_next - stub, x, amplitude):
+                    dig(sx, sy)
+                for sy in range(y_next - stub, y_next):
+                    dig(x, sy)
+                dig(x, y + 1, 'v')
+                dig(x, y_next - 1, 'v')
+
+    # Start at the top left, down then across to the first junction.
+    for sy in range(0, coords[0] + 1):
+        dig(1, sy)
+    for sx in range(1, coords[0]):
+        dig(sx, coords[0])
+    # Finish at the bottom right, across then down from the last junction.
+    for sx in range(coords[-1], side - 1):
+        dig(sx, coords[-1])
+    for sy in range(coords[-1], side):
+        dig(side - 2, sy)
+    return '\n'.join(''.join(row) for row in grid) + '\n'
+
+
+@generator(24)
+def day24(scale: float, rng: random.Random) -> str:
+    """Hailstones that all get hit by one rock thrown from (px, py, pz)."""
+    rock = [rng.randint(150_000_000_000_000, 350_000_000_000_000) for _ in range(3)]
+    rock_v = [rng.randint(-250, 250) for _ in range(3)]
+    n_stones = scaled_count(300, scale)
+    times = rng.sample(range(100_000_000_000, 1_000_000_000_000), k=n_stones)
+    lines = []
+    for t in times:
+        v = [rng.randint(-300, 300) for _ in range(3)]
+        p = [rock[i] + rock_v[i]*t - v[i]*t for i in range(3)]
+        lines.append(f"{p[0]}, {p[1]}, {p[2]} @ {v[0]}, {v[1]}, {v[2]}")
+    return '\n'.join(lines) + '\n'
+
+
+@generator(25)
+def day25(scale: float, rng: random.Random) -> str:
+    """Two well-connected halves joined by exactly three wires."""
+    n_nodes = scaled_count(1500, scale)
+    names = unique_names(rng, n_nodes)
+    halves = [names[:n_nodes // 2], names[n_nodes // 2:]]
+    edges = set()
+    for half in halves:
+        # A ring keeps each half connected, random chords keep it from being
+        # cut by three wires.
+        for a, b in zip(half, half[1:] + half[:1]):
+            edges.add(tuple(sorted((a, b))))
+        for a in half:
+            for b in rng.sample(half, k=min(3, len(half))):
+                if a != b:
+                    edges.add(tuple(sorted((a, b))))
+    for a, b in zip(rng.sample(halves[0], k=3), rng.sample(halves[1], k=3)):
+        edges.add(tuple(sorted((a, b))))
+
+    wires = dict()
+    for a, b in edges:
+        if rng.random() < 0.5:
+            a, b = b, a
+        wires.setdefault(a, []).append(b)
+    return '\n'.join(f"{a}: {' '.join(bs)}" for a, bs in wires.items()) + '\n'
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Write a synthetic input to stdout.")
+    parser.add_argument('day', type=int, choices=sorted(GENERATORS))
+    parser.add_argument('-s', '--scale', type=float, default=1)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+    sys.stdout.write(generate(args.day, args.scale, args.seed))
+
+
+if __name__ == "__main__":
+    main()
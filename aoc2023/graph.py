@@ -0,0 +1,431 @@
+"""
+A compact directed graph with integer nodes, and the searches the days share.
+
+Nodes are 0..n_nodes-1. Edges are kept in compressed sparse row (CSR) form:
+three flat arrays instead of a dict of sets or an object per node. Node u's
+edges are `targets[offsets[u]:offsets[u + 1]]`, weighing the same slice of
+`weights`:
+
+    graph = Graph.from_edges(3, [(0, 1, 5), (1, 2, 1)], undirected=True)
+    for v, w in graph.edges(1):
+        ...
+
+Nodes that start life as something else (names, grid cells) get ids from a
+NodeIds, which hands out the next id the first time it sees a label:
+
+    ids = NodeIds()
+    edges = [(ids[a], ids[b], 1) for a, b in pairs]
+    graph = Graph.from_edges(len(ids), edges)
+    name = ids.labels[node]
+
+The searches:
+
+    bfs(graph, source)                          hops to every node.
+    dijkstra(graph, sources, targets, h)        least cost to a target (A* if h).
+    dag_longest_path(graph, source, target)     longest path, if it's a DAG.
+    longest_simple_path(graph, source, target)  longest path, brute force.
+    min_cut(graph, source, sink)                the cheapest edges to cut.
+
+The long ones (dijkstra, longest_simple_path) check the deadline as they go and
+return a Partial once it passes (see aoc2023.deadline). longest_simple_path
+also saves its progress when checkpointing (see aoc2023.checkpoint).
+
+"""
+
+import heapq
+from array import array
+from collections import deque
+from typing import Hashable, Iterable, Iterator, Optional, Sequence, Union
+
+from aoc2023 import checkpoint, deadline, metrics
+
+INFINITY = float('inf')
+# Array typecode for node ids, edge indices and weights.
+INT = 'q'
+# What longest_simple_path saves its progress as (see aoc2023.checkpoint).
+LONGEST_PATH = 'graph.longest_simple_path'
+
+
+class NodeIds(dict):
+    """{label: id}, numbering labels 0, 1, 2, ... as they're first looked up."""
+
+    def __init__(self, labels: Iterable[Hashable] = ()) -> None:
+        super().__init__()
+        self.labels = []
+        for label in labels:
+            self[label]
+
+    def __missing__(self, label: Hashable) -> int:
+        id_ = self[label] = len(self.labels)
+        self.labels.append(label)
+        return id_
+
+
+class Graph:
+    """Weighted directed graph in CSR arrays."""
+
+    __slots__ = ('offsets', 'targets', 'weights')
+
+    def __init__(self, offsets: array, targets: array, weights: array) -> None:
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+
+    @classmethod
+    def from_edges(
+        cls,
+        n_nodes: int,
+        edges: Iterable[tuple[int, int, int]],
+        undirected: bool = False,
+    ) -> "Graph":
+        """
+        Build a graph from (source, target, weight) triples.
+
+        Each node's edges keep the order they were given in. If undirected,
+        every edge also goes the other way.
+
+        """
+        sources = array(INT)
+        targets = array(INT)
+        weights = array(INT)
+        in_order = True
+        for u, v, w in edges:
+            if sources and u < sources[-1]:
+                in_order = False
+            sources.append(u)
+            targets.append(v)
+            weights.append(w)
+        if undirected:
+            sources, targets = sources + targets, targets + sources
+            weights = weights + weights
+            in_order = False
+
+        # Counting sort by source: count, then turn counts into offsets.
+        offsets = array(INT, bytes(8 * (n_nodes + 1)))
+        for u in sources:
+            offsets[u + 1] += 1
+        for u in range(n_nodes):
+            offsets[u + 1] += offsets[u]
+        if in_order:
+            # Already grouped by source, so there's nothing to move.
+            return cls(offsets, targets, weights)
+        next_slot = offsets[:-1]
+        sorted_targets = array(INT, bytes(8 * len(targets)))
+        sorted_weights = array(INT, bytes(8 * len(targets)))
+        for u, v, w in zip(sources, targets, weights):
+            e = next_slot[u]
+            sorted_targets[e] = v
+            sorted_weights[e] = w
+            next_slot[u] = e + 1
+        return cls(offsets, sorted_targets, sorted_weights)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.targets)
+
+    def __repr__(self) -> str:
+        return f"Graph({self.n_nodes} nodes, {self.n_edges} edges)"
+
+    def degree(self, u: int) -> int:
+        return self.offsets[u + 1] - self.offsets[u]
+
+    def neighbors(self, u: int) -> array:
+        return self.targets[self.offsets[u]:self.offsets[u + 1]]
+
+    def edges(self, u: int) -> Iterator[tuple[int, int]]:
+        """Yield (target, weight) for each of u's edges."""
+        start, stop = self.offsets[u], self.offsets[u + 1]
+        return zip(self.targets[start:stop], self.weights[start:stop])
+
+
+def bfs(graph: Graph, source: int) -> list[int]:
+    """Return the number of edges from source to each node (-1 if unreachable)."""
+    offsets, targets = graph.offsets, graph.targets
+    hops = [-1] * graph.n_nodes
+    hops[source] = 0
+    queue = deque([source])
+    while queue:
+        u = queue.popleft()
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            if hops[v] == -1:
+                hops[v] = hops[u] + 1
+                queue.append(v)
+    return hops
+
+
+def dijkstra(
+    graph: Graph,
+    sources: Iterable[int],
+    targets: Iterable[int],
+    heuristic: Optional[Sequence[int]] = None,
+) -> Union[int, float, deadline.Partial]:
+    """
+    Return the least cost of getting from any source to any target.
+
+    Weights mustn't be negative. With a heuristic (a lower bound on the cost
+    from each node to the nearest target, which never drops by more than an
+    edge's weight along that edge) this is A*. INFINITY if no target can be
+    reached.
+
+    If a deadline passes first, return a Partial whose progress holds a lower
+    bound on the answer.
+
+    """
+    offsets, edge_targets, weights = graph.offsets, graph.targets, graph.weights
+    is_target = bytearray(graph.n_nodes)
+    for t in targets:
+        is_target[t] = 1
+    h = heuristic or [0] * graph.n_nodes
+
+    cost = [INFINITY] * graph.n_nodes
+    is_done = bytearray(graph.n_nodes)
+    # Nodes go on the heap once they have a cost, and may go on again with a
+    # lower one. Stale entries are skipped when popped rather than removed.
+    queue = []
+    for s in sources:
+        cost[s] = 0
+        queue.append((h[s], s))
+    heapq.heapify(queue)
+
+    n_visited = 0
+    while queue:
+        estimate, u = heapq.heappop(queue)
+        if is_done[u]:
+            continue
+        is_done[u] = 1
+
+        n_visited += 1
+        if metrics.ON:
+            metrics.count('graph.dijkstra.popped')
+            metrics.high_water('graph.dijkstra.queue', len(queue))
+        if (
+            deadline.ACTIVE
+            and n_visited % deadline.CHECK_EVERY == 0
+            and deadline.expired()
+        ):
+            # Nothing is popped out of order, so the target is at least this far.
+            return deadline.Partial(
+                None, {'nodes_visited': n_visited, 'lower_bound': estimate}
+            )
+
+        if is_target[u]:
+            return cost[u]
+        cost_u = cost[u]
+        for e in range(offsets[u], offsets[u + 1]):
+            v = edge_targets[e]
+            new_cost = cost_u + weights[e]
+            if new_cost < cost[v]:
+                cost[v] = new_cost
+                heapq.heappush(queue, (new_cost + h[v], v))
+    return INFINITY
+
+
+def topological_order(graph: Graph, source: int) -> list[int]:
+    """
+    Return the nodes reachable from source, each after everything leading to it.
+
+    Raises ValueError if they include a cycle.
+
+    """
+    offsets, targets = graph.offsets, graph.targets
+    reachable = bfs(graph, source)
+    n_in = [0] * graph.n_nodes
+    for u, hops in enumerate(reachable):
+        if hops >= 0:
+            for e in range(offsets[u], offsets[u + 1]):
+                n_in[targets[e]] += 1
+
+    if n_in[source]:
+        raise ValueError("The graph has a cycle through the source.")
+    # Kahn's algorithm.
+    order = [source]
+    for u in order:
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            n_in[v] -= 1
+            if n_in[v] == 0:
+                order.append(v)
+    if len(order) != sum(hops >= 0 for hops in reachable):
+        raise ValueError("The graph has a cycle.")
+    return order
+
+
+def dag_longest_path(graph: Graph, source: int, target: int) -> Optional[int]:
+    """
+    Return the heaviest path's weight from source to target (None if there's none).
+
+    Linear time, but only for acyclic graphs: raises ValueError if there's a
+    cycle within reach of source.
+
+    """
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    longest = [None] * graph.n_nodes
+    longest[source] = 0
+    for u in topological_order(graph, source):
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            length = longest[u] + weights[e]
+            if longest[v] is None or length > longest[v]:
+                longest[v] = length
+    return longest[target]
+
+
+def longest_simple_path(
+    graph: Graph,
+    source: int,
+    target: int,
+) -> Union[int, deadline.Partial]:
+    """
+    Return the heaviest path's weight from source to target, visiting no node twice.
+
+    This is NP-hard, so it's a depth-first search over every simple path, with
+    the nodes on the current path as the bits of an int. Only use it on small
+    graphs (e.g. a maze boiled down to its junctions). 0 if there's no path.
+
+    If a deadline passes first, return a Partial with the best path so far.
+    While checkpointing, the stack is saved as it goes and resumed from.
+
+    """
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    # If only one node leads to the target, a path reaching that node has to go
+    # straight to the target: going anywhere else would cut it off.
+    into_target = {
+        u
+        for u in range(graph.n_nodes)
+        for e in range(offsets[u], offsets[u + 1])
+        if targets[e] == target
+    }
+    last_step = dict()
+    if len(into_target) == 1:
+        u, = into_target
+        last_step[u] = max(
+            weights[e]
+            for e in range(offsets[u], offsets[u + 1])
+            if targets[e] == target
+        )
+
+    # This is the hot loop, and it's happier with tuples than array lookups.
+    steps = [
+        tuple(
+            (targets[e], weights[e], 1 << targets[e])
+            for e in range(offsets[u], offsets[u + 1])
+        )
+        for u in range(graph.n_nodes)
+    ]
+    # (node, length so far, nodes on the path so far as bits).
+    stack = [(source, 0, 1 << source)]
+    best = 0
+    n_steps = 0
+    checkpointing = checkpoint.ACTIVE
+    if checkpointing:
+        key = checkpoint.key(offsets, targets, weights, source, target)
+        stack, best, n_steps = checkpoint.load(LONGEST_PATH, key) or (stack, best, 0)
+    # Other threads can switch either flag on mid-search, but not this context's
+    # own deadline or checkpoint, so look once.
+    watching = deadline.ACTIVE or checkpointing
+    while stack:
+        u, length, on_path = stack.pop()
+        if u == target:
+            best = max(best, length)
+            continue
+        if u in last_step:
+            best = max(best, length + last_step[u])
+            continue
+        n_stacked = len(stack)
+        for v, weight, bit in steps[u]:
+            if not on_path & bit:
+                stack.append((v, length + weight, on_path | bit))
+
+        n_steps += 1
+        if metrics.ON:
+            metrics.count('graph.longest_simple_path.pushes', len(stack) - n_stacked)
+            metrics.high_water('graph.longest_simple_path.stack', len(stack))
+        if watching and n_steps % deadline.CHECK_EVERY == 0:
+            out_of_time = deadline.ACTIVE and deadline.expired()
+            if checkpointing and (out_of_time or checkpoint.due()):
+                checkpoint.save(LONGEST_PATH, key, (stack, best, n_steps))
+            if out_of_time:
+                # Every path found so far is a real one, so best is a lower bound.
+                return deadline.Partial(best, {'steps': n_steps, 'queued': len(stack)})
+    if checkpointing:
+        checkpoint.done(LONGEST_PATH)
+    return best
+
+
+def _reverse_edges(graph: Graph) -> array:
+    """Return, for each edge u -> v, the index of an edge v -> u."""
+    offsets, targets = graph.offsets, graph.targets
+    unpaired = dict()
+    reverse = array(INT, bytes(8 * graph.n_edges))
+    for u in range(graph.n_nodes):
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            partners = unpaired.get((v, u))
+            if partners:
+                f = partners.pop()
+                reverse[e], reverse[f] = f, e
+            else:
+                unpaired.setdefault((u, v), []).append(e)
+    if any(unpaired.values()):
+        raise ValueError("min_cut needs every edge both ways (undirected=True).")
+    return reverse
+
+
+def min_cut(
+    graph: Graph,
+    source: int,
+    sink: int,
+    limit: Optional[int] = None,
+) -> tuple[int, Optional[list[int]]]:
+    """
+    Return the least total weight of edges separating source from sink, and
+    the nodes left on source's side.
+
+    The graph is taken as undirected, with weights as capacities, so every edge
+    has to be there both ways. This is Edmonds-Karp max flow: one BFS per
+    augmenting path, which is quick when the cut is small. Given a limit, stop
+    as soon as the cut is known to be bigger, returning (flow so far, None).
+
+    """
+    offsets, targets = graph.offsets, graph.targets
+    reverse = _reverse_edges(graph)
+    residual = array(INT, graph.weights)
+    flow = 0
+    while True:
+        # Find the shortest path with room left on every edge.
+        via = [-1] * graph.n_nodes
+        via[source] = -2
+        queue = deque([source])
+        while queue and via[sink] == -1:
+            u = queue.popleft()
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                if via[v] == -1 and residual[e] > 0:
+                    via[v] = e
+                    queue.append(v)
+
+        if via[sink] == -1:
+            # No room left: whatever the BFS reached is source's side.
+            return flow, [u for u, e in enumerate(via) if e != -1]
+
+        # Push as much as the tightest edge allows along the path.
+        path = []
+        v = sink
+        while v != source:
+            e = via[v]
+            path.append(e)
+            v = targets[reverse[e]]
+        pushed = min(residual[e] for e in path)
+        for e in path:
+            residual[e] -= pushed
+            residual[reverse[e]] += pushed
+        flow += pushed
+        if metrics.ON:
+            metrics.count('graph.min_cut.augmenting_paths')
+        if limit is not None and flow > limit:
+            return flow, None
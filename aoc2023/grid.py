@@ -0,0 +1,233 @@
+"""
+A compact 2-D grid of single-byte cells, shared by the grid days.
+
+The puzzle text is kept as-is in one bytearray, newlines and all, so a cell is
+just `cells[y*stride + x]` with `stride = width + 1`. The newline at the end of
+each row doubles as a sentinel: stepping east off a row, or west off the next
+one, lands on a newline, so most bounds checks are a single comparison.
+
+    grid = Grid.from_text(data)
+    i = grid.index(x, y)
+    for j in grid.neighbors(i):
+        if grid.cells[j] == ROCK:
+            ...
+
+Cells are ints (bytes), so compare against ord('#') or b'#'[0], not '#'.
+Row and column views are memoryviews into the same buffer, so they're free to
+take but see any changes to the grid.
+
+`Grid.from_file` maps the input file straight into memory instead of reading
+and decoding it, so `cells` is then an mmap rather than a bytearray. The two
+index, slice, find and regex-search the same, but not iterate (iterate the grid
+instead); stick to those and the methods here and a day works on either. Days
+that can take a Grid instead of text define `load = Grid.from_file`, which the
+runner uses to read their input.
+
+"""
+
+import mmap
+import os
+from typing import Iterator, Optional, Union
+
+NEWLINE = ord('\n')
+
+
+class Grid:
+    """Rectangular grid of bytes, indexed flat."""
+
+    __slots__ = ('cells', 'width', 'height', 'stride', 'offsets')
+
+    def __init__(
+        self,
+        cells: Union[bytearray, mmap.mmap],
+        width: int,
+        height: int,
+    ) -> None:
+        self.cells = cells
+        self.width = width
+        self.height = height
+        self.stride = width + 1
+        if len(cells) != self.stride * height:
+            raise ValueError(
+                f"{len(cells)} bytes doesn't make {height} rows of {width}."
+            )
+        # North, east, south, west: clockwise with y increasing down the page.
+        self.offsets = (-self.stride, 1, self.stride, -1)
+
+    @classmethod
+    def from_text(cls, data: str) -> "Grid":
+        """Build a grid from puzzle text, one row per line."""
+        cells = bytearray(data.strip('\n'), 'ascii')
+        cells.append(NEWLINE)
+        width = cells.index(NEWLINE)
+        return cls(cells, width, len(cells) // (width + 1))
+
+    @classmethod
+    def from_file(cls, path: Union[str, os.PathLike]) -> "Grid":
+        """
+        Map a puzzle input file into a grid, without reading or decoding it.
+
+        Pages are only read as they're touched. The mapping is copy-on-write:
+        writing to the grid never writes to the file. A file that doesn't end
+        in exactly one newline is read and fixed up instead.
+
+        """
+        with open(path, 'rb') as f:
+            cells = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        if cells[-1] != NEWLINE or (len(cells) > 1 and cells[-2] == NEWLINE):
+            cells = bytearray(cells).strip(b'\n')
+            cells.append(NEWLINE)
+        width = cells.find(b'\n')
+        return cls(cells, width, len(cells) // (width + 1))
+
+    @classmethod
+    def filled(cls, width: int, height: int, fill: bytes = b'.') -> "Grid":
+        """Build a grid with every cell set to fill."""
+        return cls(bytearray((fill*width + b'\n') * height), width, height)
+
+    def copy(self) -> "Grid":
+        return Grid(bytearray(self.cells), self.width, self.height)
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def __iter__(self) -> Iterator[int]:
+        """Yield every cell, newlines included, as ints."""
+        # Iterating an mmap directly gives 1-byte bytes, not ints.
+        return iter(memoryview(self.cells))
+
+    def __str__(self) -> str:
+        return bytes(self.cells).decode('ascii')
+
+    def __repr__(self) -> str:
+        return f"Grid({self.width}x{self.height})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Grid):
+            return NotImplemented
+        return (
+            self.width == other.width
+            and memoryview(self.cells) == memoryview(other.cells)
+        )
+
+    def __getitem__(self, xy: tuple[int]) -> int:
+        x, y = xy
+        return self.cells[y*self.stride + x]
+
+    def __setitem__(self, xy: tuple[int], value: int) -> None:
+        x, y = xy
+        self.cells[y*self.stride + x] = value
+
+    # Indexing.
+    def index(self, x: int, y: int) -> int:
+        """Return the flat index of (x, y)."""
+        return y*self.stride + x
+
+    def xy(self, i: int) -> tuple[int]:
+        """Return (x, y) for a flat index."""
+        y, x = divmod(i, self.stride)
+        return x, y
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def contains(self, i: int) -> bool:
+        """Return True if a flat index is a cell (not off the edge or a newline)."""
+        return 0 <= i < len(self.cells) and self.cells[i] != NEWLINE
+
+    def wrap(self, x: int, y: int) -> int:
+        """Return the flat index of (x, y) on an infinitely tiled grid."""
+        return (y % self.height)*self.stride + x % self.width
+
+    def neighbors(self, i: int) -> Iterator[int]:
+        """Yield the flat indices of the (up to 4) cells next to i."""
+        cells = self.cells
+        size = len(cells)
+        for offset in self.offsets:
+            j = i + offset
+            if 0 <= j < size and cells[j] != NEWLINE:
+                yield j
+
+    # Searching.
+    def find(self, value: bytes, start: int = 0) -> int:
+        """Return the flat index of the first value at or after start, or -1."""
+        return self.cells.find(value, start)
+
+    def find_unexpected(self, allowed: bytes) -> int:
+        """Return the flat index of the first cell not in allowed, or -1."""
+        cells = self.cells
+        for y in range(self.height):
+            start = y*self.stride
+            row = cells[start:start + self.width]
+            unexpected = row.translate(None, allowed)
+            if unexpected:
+                return start + row.index(unexpected[0])
+        return -1
+
+    def find_all(self, value: bytes) -> list[int]:
+        """Return the flat indices of every cell holding value."""
+        found = []
+        cells = self.cells
+        i = cells.find(value)
+        while i != -1:
+            found.append(i)
+            i = cells.find(value, i + 1)
+        return found
+
+    # Views.
+    def row(self, y: int) -> memoryview:
+        start = y*self.stride
+        return memoryview(self.cells)[start:start + self.width]
+
+    def col(self, x: int) -> memoryview:
+        return memoryview(self.cells)[x::self.stride]
+
+    def rows(self) -> Iterator[memoryview]:
+        for y in range(self.height):
+            yield self.row(y)
+
+    def cols(self) -> Iterator[memoryview]:
+        for x in range(self.width):
+            yield self.col(x)
+
+    def row_indices(self, y: int) -> range:
+        """Flat indices along a row, west to east."""
+        start = y*self.stride
+        return range(start, start + self.width)
+
+    def col_indices(self, x: int) -> range:
+        """Flat indices down a column, north to south."""
+        return range(x, x + self.height*self.stride, self.stride)
+
+    def to_numpy(self, copy: bool = False) -> "numpy.ndarray":  # noqa: F821
+        """
+        Return a (height, width) uint8 array of the cells.
+
+        Shares memory with the grid unless copy is True. numpy is only needed
+        if this gets called.
+
+        """
+        import numpy as np
+
+        array = np.frombuffer(self.cells, dtype=np.uint8)
+        array = array.reshape(self.height, self.stride)[:, :self.width]
+        return array.copy() if copy else array
+
+    def count(self, value: bytes, y: Optional[int] = None) -> int:
+        """Count cells holding value, in one row or everywhere."""
+        if y is None:
+            if isinstance(self.cells, bytearray):
+                return self.cells.count(value)
+            return sum(self.count(value, y) for y in range(self.height))
+        start = y*self.stride
+        if isinstance(self.cells, bytearray):
+            return self.cells.count(value, start, start + self.width)
+        # mmaps can't count, but their slices (bytes) can.
+        return self.cells[start:start + self.width].count(value)
+
+
+def as_grid(data: Union[str, Grid]) -> Grid:
+    """Return data as a grid: parsed if it's text, as it is if it's already one."""
+    if isinstance(data, Grid):
+        return data
+    return Grid.from_text(data)
@@ -0,0 +1,310 @@
+"""
+Keep a history of benchmark runs and catch regressions against it.
+
+    python -m aoc2023.history record 17 23 --label main   # Measure, append.
+    python -m aoc2023.history list                        # What's recorded.
+    python -m aoc2023.history compare 17 23 --baseline main
+
+`record` times each (day, part) several times on a synthetic input (each run in
+its own process, as in aoc2023.bench), measures its peak memory and work
+counters once, and appends the lot to bench_history.jsonl as one JSON line,
+with the machine and git revision it ran on.
+
+`compare` takes a fresh set of measurements and holds them up against a run
+from the history (the latest one by default, or the latest with a given label).
+For time it reports the ratio of medians, new/old, with a bootstrap confidence
+interval. A part is flagged if the ratio is past the threshold *and* the whole
+interval is above 1, so noise alone doesn't trip it. Peak memory is nearly
+deterministic, so it's just flagged past its threshold. Exits 1 if anything is
+flagged.
+
+Comparing runs from different machines works, but means very little.
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+from aoc2023.bench import BUDGET, measure
+from aoc2023.generators import DEFAULT_SEED, GENERATORS, generate
+from aoc2023.runner import PARTS
+
+HISTORY_FILE = Path('bench_history.jsonl')
+REPEAT = 5
+# Fractional slowdown (or growth) that counts as a regression.
+TIME_THRESHOLD = 0.10
+MEMORY_THRESHOLD = 0.10
+CONFIDENCE = 0.95
+N_BOOTSTRAP = 2000
+
+
+def machine_info() -> dict:
+    """Describe where the measurements were taken."""
+    try:
+        revision = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, cwd=Path(__file__).parent, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        'hostname': platform.node(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'git_revision': revision,
+    }
+
+
+def measure_part(
+    day: int,
+    part: int,
+    scale: float = 1,
+    repeat: int = REPEAT,
+    seed: int = DEFAULT_SEED,
+    budget: float = BUDGET,
+) -> dict:
+    """Time a part repeat times and measure its peak memory and work once."""
+    data = generate(day, scale, seed)
+    record = {
+        'day': day,
+        'part': part,
+        'scale': scale,
+        'seed': seed,
+        'times': [],
+        'peak_bytes': None,
+        'metrics': None,
+        'error': None,
+    }
+    try:
+        for _ in range(repeat):
+            seconds, _, _, _ = measure(day, part, data, budget=budget)
+            record['times'].append(seconds)
+        _, record['peak_bytes'], _, record['metrics'] = measure(
+            day, part, data, memory=True, budget=budget,
+        )
+    except Exception as e:
+        record['error'] = repr(e)
+    return record
+
+
+def take_run(
+    days: list[int],
+    parts: tuple[int] = PARTS,
+    label: Optional[str] = None,
+    **kwargs,
+) -> dict:
+    """Measure every (day, part). Keyword arguments go to measure_part."""
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'label': label,
+        'machine': machine_info(),
+        'results': [
+            measure_part(day, part, **kwargs) for day in days for part in parts
+        ],
+    }
+
+
+def append_run(run: dict, path: Path = HISTORY_FILE) -> None:
+    with open(path, 'a') as f:
+        f.write(json.dumps(run) + '\n')
+
+
+def load_history(path: Path = HISTORY_FILE) -> list[dict]:
+    """Return every recorded run, oldest first."""
+    if not path.exists():
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_run(history: list[dict], label: Optional[str] = None) -> dict:
+    """Return the latest run, or the latest with the given label."""
+    for run in reversed(history):
+        if label is None or run['label'] == label:
+            return run
+    which = f"labelled {label!r}" if label else "at all"
+    raise LookupError(f"No run {which} in the history.")
+
+
+def bootstrap_ratio(
+    old: list[float],
+    new: list[float],
+    confidence: float = CONFIDENCE,
+    n_resamples: int = N_BOOTSTRAP,
+    seed: int = 0,
+) -> tuple[float, float, float]:
+    """
+    Return median(new)/median(old) and a bootstrap confidence interval on it.
+
+    Each resample draws both sets of times with replacement; the interval is
+    the central `confidence` of the resampled ratios.
+
+    """
+    rng = random.Random(seed)
+    ratio = statistics.median(new) / statistics.median(old)
+    ratios = sorted(
+        statistics.median(rng.choices(new, k=len(new)))
+        / statistics.median(rng.choices(old, k=len(old)))
+        for _ in range(n_resamples)
+    )
+    tail = (1 - confidence) / 2
+    low = ratios[int(tail * (n_resamples - 1))]
+    high = ratios[int((1 - tail) * (n_resamples - 1))]
+    return ratio, low, high
+
+
+def compare_runs(
+    baseline: dict,
+    current: dict,
+    time_threshold: float = TIME_THRESHOLD,
+    memory_threshold: float = MEMORY_THRESHOLD,
+) -> list[dict]:
+    """Compare every (day, part) the two runs share. Return a row per part."""
+    old_results = {(r['day'], r['part']): r for r in baseline['results']}
+    rows = []
+    for new in current['results']:
+        old = old_results.get((new['day'], new['part']))
+        if old is None:
+            continue
+        row = {'day': new['day'], 'part': new['part'], 'flags': []}
+        rows.append(row)
+        if old['error'] or new['error']:
+            row['error'] = new['error'] or f"Baseline: {old['error']}"
+            continue
+        if old['scale'] != new['scale'] or old['seed'] != new['seed']:
+            row['error'] = "Measured on different inputs."
+            continue
+
+        ratio, low, high = bootstrap_ratio(old['times'], new['times'])
+        row.update(
+            old_s=statistics.median(old['times']),
+            new_s=statistics.median(new['times']),
+            ratio=ratio, low=low, high=high,
+        )
+        if ratio > 1 + time_threshold and low > 1:
+            row['flags'].append('time')
+        if old['peak_bytes'] and new['peak_bytes']:
+            row['memory_ratio'] = new['peak_bytes'] / old['peak_bytes']
+            if row['memory_ratio'] > 1 + memory_threshold:
+                row['flags'].append('memory')
+    return rows
+
+
+def format_comparison(rows: list[dict]) -> str:
+    lines = [
+        f"{'day':>3} {'part':>4} {'old (s)':>10} {'new (s)':>10} "
+        f"{'new/old':>8} {'95% CI':>15} {'mem':>7}  flags"
+    ]
+    for row in rows:
+        prefix = f"{row['day']:>3} {row['part']:>4}"
+        if 'error' in row:
+            lines.append(f"{prefix} {row['error']}")
+            continue
+        interval = f"[{row['low']:.2f}, {row['high']:.2f}]"
+        memory = f"{row['memory_ratio']:>6.2f}x" if 'memory_ratio' in row else ''
+        lines.append(
+            f"{prefix} {row['old_s']:>10.4f} {row['new_s']:>10.4f} "
+            f"{row['ratio']:>7.2f}x {interval:>15} {memory:>7}  "
+            f"{' '.join(f'REGRESSED({flag})' for flag in row['flags'])}"
+        )
+    return '\n'.join(lines)
+
+
+def format_history(history: list[dict]) -> str:
+    lines = []
+    for run in history:
+        parts = ' '.join(f"{r['day']}.{r['part']}" for r in run['results'])
+        lines.append(
+            f"{run['timestamp']}  {run['label'] or '-':<12} "
+            f"{run['machine']['git_revision'] or '-':<9} "
+            f"{run['machine']['hostname']:<16} {parts}"
+        )
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--history', type=Path, default=HISTORY_FILE,
+        help=f"History file. Defaults to {HISTORY_FILE}.",
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help="Show the recorded runs.")
+    for name, help_ in (
+        ('record', "Measure and append a run to the history."),
+        ('compare', "Measure and compare against a recorded run."),
+    ):
+        command = commands.add_parser(name, help=help_)
+        command.add_argument(
+            'days', nargs='*', type=int,
+            help="Days to measure. Defaults to every day with a generator.",
+        )
+        command.add_argument(
+            '-p', '--part', dest='parts', type=int, choices=PARTS,
+            action='append',
+        )
+        command.add_argument('-s', '--scale', type=float, default=1)
+        command.add_argument(
+            '-r', '--repeat', type=int, default=REPEAT,
+            help=f"Timed runs per part. Defaults to {REPEAT}.",
+        )
+        command.add_argument('-b', '--budget', type=float, default=BUDGET)
+        command.add_argument('--label', help="Name for this run.")
+    compare = commands.choices['compare']
+    compare.add_argument(
+        '--baseline', metavar='LABEL',
+        help="Compare against the latest run with this label. Defaults to the "
+        "latest run.",
+    )
+    compare.add_argument('--time-threshold', type=float, default=TIME_THRESHOLD)
+    compare.add_argument(
+        '--memory-threshold', type=float, default=MEMORY_THRESHOLD,
+    )
+    compare.add_argument(
+        '--record', action='store_true',
+        help="Append the new measurements to the history too.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        print(format_history(load_history(args.history)))
+        return 0
+
+    if args.command == 'compare':
+        try:
+            baseline = find_run(load_history(args.history), args.baseline)
+        except LookupError as e:
+            raise SystemExit(str(e))
+    parts = tuple(sorted(set(args.parts))) if args.parts else PARTS
+    run = take_run(
+        args.days or sorted(GENERATORS), parts, args.label,
+        scale=args.scale, repeat=args.repeat, budget=args.budget,
+    )
+
+    if args.command == 'record' or args.record:
+        append_run(run, args.history)
+    if args.command == 'record':
+        print(f"Recorded {len(run['results'])} parts to {args.history}.")
+        return 0
+
+    rows = compare_runs(
+        baseline, run, args.time_threshold, args.memory_threshold,
+    )
+    print(f"Baseline: {baseline['timestamp']} ({baseline['label'] or 'unlabelled'})")
+    print(format_comparison(rows))
+    return 1 if any(row['flags'] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
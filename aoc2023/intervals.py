@@ -0,0 +1,220 @@
+"""
+Sets of integer ranges, and boxes made of them, for the range-splitting days.
+
+Everything is half-open, like range(): (10, 20) holds 10 up to 19.
+
+    seeds = IntervalSet([(79, 93), (55, 68)])
+    inside = seeds.clip(60, 80)     # IntervalSet([(60, 68), (79, 80)])
+    rest = seeds - inside
+    seeds.min(), seeds.size         # 55, 27
+
+An IntervalSet keeps its ranges sorted and merged in one flat list of bounds,
+[start, stop, start, stop, ...], strictly increasing. Whether a number is in the
+set is whether an odd number of bounds are <= it, so looking up a number,
+clipping to a range, and splitting at a point are each a bisect (plus copying
+out whatever they return). Combining two sets is one merge of their bounds.
+
+A Box is a (start, stop) range per dimension, for carving up a space of
+several values at once, e.g. day 19's part ratings.
+
+"""
+
+from bisect import bisect_left, bisect_right
+from math import prod
+from typing import Callable, Iterable, Iterator, Optional
+
+
+class IntervalSet:
+    """Integers as sorted, merged, half-open ranges."""
+
+    __slots__ = ('bounds',)
+
+    def __init__(self, ranges: Iterable[tuple[int, int]] = ()) -> None:
+        # Sort, then merge anything overlapping or touching.
+        bounds = []
+        for start, stop in sorted(ranges):
+            if start >= stop:
+                continue
+            if bounds and start <= bounds[-1]:
+                bounds[-1] = max(bounds[-1], stop)
+            else:
+                bounds += (start, stop)
+        self.bounds = bounds
+
+    @classmethod
+    def _from_bounds(cls, bounds: list[int]) -> "IntervalSet":
+        """Wrap bounds that are already sorted and merged."""
+        interval_set = cls.__new__(cls)
+        interval_set.bounds = bounds
+        return interval_set
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        """Yield (start, stop) for each range, in order."""
+        return zip(self.bounds[::2], self.bounds[1::2])
+
+    def __len__(self) -> int:
+        """The number of ranges (not numbers; see size)."""
+        return len(self.bounds) // 2
+
+    def __bool__(self) -> bool:
+        return bool(self.bounds)
+
+    def __contains__(self, x: int) -> bool:
+        return bisect_right(self.bounds, x) % 2 == 1
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        return self.bounds == other.bounds
+
+    def __repr__(self) -> str:
+        return f"IntervalSet({list(self)})"
+
+    @property
+    def size(self) -> int:
+        """How many numbers are in the set."""
+        bounds = self.bounds
+        return sum(bounds[1::2]) - sum(bounds[::2])
+
+    def min(self) -> int:
+        if not self.bounds:
+            raise ValueError("An empty set has no minimum.")
+        return self.bounds[0]
+
+    def max(self) -> int:
+        if not self.bounds:
+            raise ValueError("An empty set has no maximum.")
+        return self.bounds[-1] - 1
+
+    def clip(self, start: int, stop: int) -> "IntervalSet":
+        """Return the part of the set within [start, stop)."""
+        if start >= stop:
+            return IntervalSet()
+        bounds = self.bounds
+        i = bisect_right(bounds, start)
+        j = bisect_left(bounds, stop)
+        # An odd index means that end lands inside a range, which gets cut.
+        clipped = bounds[i:j]
+        if i % 2:
+            clipped.insert(0, start)
+        if j % 2:
+            clipped.append(stop)
+        return IntervalSet._from_bounds(clipped)
+
+    def split(self, at: int) -> tuple["IntervalSet", "IntervalSet"]:
+        """Return the parts of the set below at, and at or above it."""
+        bounds = self.bounds
+        i = bisect_right(bounds, at)
+        if i % 2 and bounds[i - 1] < at:
+            # at cuts a range in two.
+            below, above = bounds[:i] + [at], [at] + bounds[i:]
+        else:
+            i -= i % 2
+            below, above = bounds[:i], bounds[i:]
+        return IntervalSet._from_bounds(below), IntervalSet._from_bounds(above)
+
+    def shift(self, offset: int) -> "IntervalSet":
+        """Return the set with offset added to every number."""
+        return IntervalSet._from_bounds([bound + offset for bound in self.bounds])
+
+    def __or__(self, other: "IntervalSet") -> "IntervalSet":
+        return self._combine(other, lambda in_a, in_b: in_a or in_b)
+
+    def __and__(self, other: "IntervalSet") -> "IntervalSet":
+        return self._combine(other, lambda in_a, in_b: in_a and in_b)
+
+    def __sub__(self, other: "IntervalSet") -> "IntervalSet":
+        return self._combine(other, lambda in_a, in_b: in_a and not in_b)
+
+    def _combine(
+        self,
+        other: "IntervalSet",
+        keep: Callable[[bool, bool], bool],
+    ) -> "IntervalSet":
+        """
+        Sweep both sets' bounds in order, keeping numbers where keep(in self,
+        in other) is true.
+
+        """
+        a, b = self.bounds, other.bounds
+        n_a, n_b = len(a), len(b)
+        i = j = 0
+        in_a = in_b = inside = False
+        bounds = []
+        while i < n_a or j < n_b:
+            if j == n_b or (i < n_a and a[i] <= b[j]):
+                x = a[i]
+            else:
+                x = b[j]
+            # Every bound toggles whether we're in that set.
+            if i < n_a and a[i] == x:
+                in_a = not in_a
+                i += 1
+            if j < n_b and b[j] == x:
+                in_b = not in_b
+                j += 1
+            if keep(in_a, in_b) != inside:
+                inside = not inside
+                bounds.append(x)
+        return IntervalSet._from_bounds(bounds)
+
+
+class Box(tuple):
+    """An axis-aligned box: a half-open (start, stop) range per dimension."""
+
+    __slots__ = ()
+
+    def __new__(cls, ranges: Iterable[tuple[int, int]]) -> "Box":
+        return super().__new__(cls, (tuple(range_) for range_ in ranges))
+
+    def __repr__(self) -> str:
+        return f"Box({list(self)})"
+
+    @property
+    def volume(self) -> int:
+        """How many points the box holds."""
+        return prod(max(0, stop - start) for start, stop in self)
+
+    def is_empty(self) -> bool:
+        return any(stop <= start for start, stop in self)
+
+    def with_range(self, dim: int, start: int, stop: int) -> "Box":
+        """Return the box with one dimension's range replaced."""
+        ranges = list(self)
+        ranges[dim] = (start, stop)
+        return Box(ranges)
+
+    def split(self, dim: int, at: int) -> tuple[Optional["Box"], Optional["Box"]]:
+        """
+        Cut the box across one dimension, returning the parts below at, and at
+        or above it. A part that would be empty is None.
+
+        """
+        start, stop = self[dim]
+        if at <= start:
+            return None, self
+        if at >= stop:
+            return self, None
+        return self.with_range(dim, start, at), self.with_range(dim, at, stop)
+
+    def intersect(self, other: "Box") -> Optional["Box"]:
+        """Return the box both boxes cover, or None if they don't overlap."""
+        box = Box(
+            (max(start, other_start), min(stop, other_stop))
+            for (start, stop), (other_start, other_stop) in zip(self, other)
+        )
+        return None if box.is_empty() else box
+
+    def subtract(self, other: "Box") -> list["Box"]:
+        """Return disjoint boxes covering the part of this one outside other."""
+        if self.intersect(other) is None:
+            return [self]
+        # Peel off a slab below and above other in each dimension in turn;
+        # what's left at the end is the overlap.
+        pieces = []
+        rest = self
+        for dim, (other_start, other_stop) in enumerate(other):
+            below, rest = rest.split(dim, other_start)
+            rest, above = rest.split(dim, other_stop)
+            pieces.extend(piece for piece in (below, above) if piece is not None)
+        return pieces
@@ -0,0 +1,216 @@
+"""
+Bounded memoization for the solvers' repeated sub-problems, with hit rates.
+
+    from aoc2023.memo import memoize
+
+    @memoize(max_entries=4096)
+    def next_point(history: tuple[int]) -> int:
+        ...
+
+    @memoize(max_entries=256, policy='lfu', key=lambda grid: bytes(grid.cells))
+    def settle(grid: Grid) -> bytes:
+        ...
+
+Like functools.lru_cache, but:
+
+- The cache always has a bound, and the policy for what goes past it is
+  pluggable: 'lru' (least recently used, the default), 'lfu' (least frequently
+  used, oldest first among ties), or any class with the same methods as those
+  (it only tracks keys; the memo holds the values).
+- key, if given, is called with the function's arguments and returns the cache
+  key instead. That's for arguments that aren't hashable (a list, a grid), or
+  that should share an entry whenever they're equal in the way that matters.
+- Every memoized function counts its hits, misses and evictions. stats() has
+  them all by name, and while metrics are being collected they're counted
+  there too (as memo.<name>.hits and so on), so the runner's --metrics shows
+  them for each part.
+
+Results are shared between callers, as parses are: don't mutate what comes
+back. A memo is safe to call from several threads, though two threads missing
+on the same key at once will both compute it.
+
+"""
+
+import functools
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Hashable, Optional, Union
+
+from aoc2023 import metrics
+
+# Returned by a policy's get() for a miss, since None is a perfectly good result.
+MISS = object()
+
+MAX_ENTRIES = 1024
+
+_memos: dict[str, "Memo"] = dict()
+
+
+class LRU:
+    """Keys by recency of use. evict() picks the least recently used."""
+
+    def __init__(self) -> None:
+        order: OrderedDict[Hashable, None] = OrderedDict()
+        self._order = order
+        # used() and added() happen on every call, so they're the OrderedDict's
+        # own (C) methods rather than Python ones wrapping them.
+        self.used = order.move_to_end
+        self.added = order.setdefault
+
+    def evict(self) -> Hashable:
+        return self._order.popitem(last=False)[0]
+
+    def clear(self) -> None:
+        self._order.clear()
+
+
+class LFU:
+    """
+    Keys by how often they've been used. evict() picks the least used, the
+    oldest of those if there's a tie.
+
+    """
+
+    def __init__(self) -> None:
+        self._uses: dict[Hashable, int] = dict()
+        # uses: keys with that many, oldest first
+        self._by_uses: defaultdict[int, OrderedDict] = defaultdict(OrderedDict)
+        self._min_uses = 0
+
+    def used(self, key: Hashable) -> None:
+        uses = self._uses[key]
+        keys = self._by_uses[uses]
+        del keys[key]
+        if not keys:
+            del self._by_uses[uses]
+            if self._min_uses == uses:
+                self._min_uses += 1
+        self._uses[key] = uses + 1
+        self._by_uses[uses + 1][key] = None
+
+    def added(self, key: Hashable) -> None:
+        self._uses[key] = 1
+        self._by_uses[1][key] = None
+        self._min_uses = 1
+
+    def evict(self) -> Hashable:
+        keys = self._by_uses[self._min_uses]
+        key, _ = keys.popitem(last=False)
+        if not keys:
+            del self._by_uses[self._min_uses]
+        del self._uses[key]
+        return key
+
+    def clear(self) -> None:
+        self._uses.clear()
+        self._by_uses.clear()
+        self._min_uses = 0
+
+
+POLICIES = {'lru': LRU, 'lfu': LFU}
+
+
+class Memo:
+    """A memoized function: call it like the function."""
+
+    def __init__(
+        self,
+        fn: Callable,
+        max_entries: int = MAX_ENTRIES,
+        policy: Union[str, Callable[[], Any]] = 'lru',
+        key: Optional[Callable[..., Hashable]] = None,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("A memo needs room for at least one entry.")
+        functools.update_wrapper(self, fn)
+        self.fn = fn
+        self.name = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+        self.max_entries = max_entries
+        self.key = key
+        self.policy = POLICIES[policy]() if isinstance(policy, str) else policy()
+        self._values: dict[Hashable, Any] = dict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+        # Metric names, made once rather than on every call.
+        self._hit, self._miss, self._eviction = (
+            f'memo.{self.name}.{what}' for what in ('hits', 'misses', 'evictions')
+        )
+
+    def __repr__(self) -> str:
+        return f"<memoized {self.name}: {self.stats()}>"
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        if self.key is not None:
+            key = self.key(*args, **kwargs)
+        else:
+            key = (args, tuple(kwargs.items())) if kwargs else args
+
+        with self._lock:
+            value = self._values.get(key, MISS)
+            if value is not MISS:
+                self.policy.used(key)
+                self.hits += 1
+        if value is not MISS:
+            if metrics.ON:
+                metrics.count(self._hit)
+            return value
+
+        value = self.fn(*args, **kwargs)
+
+        with self._lock:
+            self.misses += 1
+            evicted = key not in self._values and len(self._values) >= self.max_entries
+            if evicted:
+                del self._values[self.policy.evict()]
+                self.evictions += 1
+            if key not in self._values:
+                self.policy.added(key)
+            self._values[key] = value
+        if metrics.ON:
+            metrics.count(self._miss)
+            if evicted:
+                metrics.count(self._eviction)
+        return value
+
+    def stats(self) -> dict[str, Union[int, float, None]]:
+        """Return the counts so far, and the hit rate (None before any calls)."""
+        n_calls = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._values),
+            'hit_rate': self.hits / n_calls if n_calls else None,
+        }
+
+    def clear(self) -> None:
+        """Drop every entry (but keep counting)."""
+        with self._lock:
+            self._values.clear()
+            self.policy.clear()
+
+
+def memoize(
+    max_entries: int = MAX_ENTRIES,
+    policy: Union[str, Callable[[], Any]] = 'lru',
+    key: Optional[Callable[..., Hashable]] = None,
+) -> Callable[[Callable], Memo]:
+    """Decorator: memoize a function, keeping at most max_entries results."""
+
+    def decorator(fn: Callable) -> Memo:
+        memo = Memo(fn, max_entries, policy, key)
+        _memos[memo.name] = memo
+        return memo
+
+    return decorator
+
+
+def stats() -> dict[str, dict]:
+    """Return every memoized function's stats, by name."""
+    return {name: memo.stats() for name, memo in sorted(_memos.items())}
+
+
+def clear() -> None:
+    """Drop every memoized result."""
+    for memo in _memos.values():
+        memo.clear()
@@ -0,0 +1,98 @@
+"""
+Work counters from the solvers, for relating input size, work done and runtime.
+
+Solvers count the work they do (nodes popped, beam steps, bricks knocked over)
+and note high-water marks (the biggest a queue got), guarded like trace
+messages so they cost next to nothing when nobody's collecting:
+
+    from aoc2023 import metrics
+
+    if metrics.ON:
+        metrics.count('graph.dijkstra.popped')
+        metrics.high_water('graph.dijkstra.queue', len(queue))
+
+Whoever runs the solver collects them:
+
+    with metrics.collecting() as work:
+        answer = day17.part1(data)
+    work.as_dict()      # {'graph.dijkstra.popped': 8412, ...}
+
+The runner's --metrics flag and the benchmark harness do this for each part.
+
+Unlike trace's counters these belong to whoever's collecting, not the process:
+the current Metrics lives in a context variable, so parts solved at the same
+time on different threads each get their own counts.
+
+"""
+
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Union
+
+Number = Union[int, float]
+
+# Flag read at the call sites: True while anything, anywhere, is collecting.
+ON = False
+
+_current: ContextVar[Optional["Metrics"]] = ContextVar('metrics', default=None)
+_n_collecting = 0
+_lock = threading.Lock()
+
+
+class Metrics:
+    """Counters and high-water marks from one run of a solver."""
+
+    def __init__(self) -> None:
+        self.counters: Counter = Counter()
+        self.gauges: dict[str, Number] = dict()
+
+    def __repr__(self) -> str:
+        return f"Metrics({self.as_dict()})"
+
+    def count(self, name: str, n: Number = 1) -> None:
+        self.counters[name] += n
+
+    def high_water(self, name: str, value: Number) -> None:
+        if name not in self.gauges or value > self.gauges[name]:
+            self.gauges[name] = value
+
+    def as_dict(self) -> dict[str, Number]:
+        """Every counter and gauge by name, sorted. High-water marks end in _max."""
+        values = dict(self.counters)
+        values.update((f'{name}_max', value) for name, value in self.gauges.items())
+        return dict(sorted(values.items()))
+
+
+def count(name: str, n: Number = 1) -> None:
+    """Add to a named counter. Callers check `metrics.ON` first."""
+    current = _current.get()
+    if current is not None:
+        current.count(name, n)
+
+
+def high_water(name: str, value: Number) -> None:
+    """Raise a named high-water mark to value. Callers check `metrics.ON` first."""
+    current = _current.get()
+    if current is not None:
+        current.high_water(name, value)
+
+
+@contextmanager
+def collecting() -> Iterator[Metrics]:
+    """Collect the solvers' metrics for the duration, into a fresh Metrics."""
+    global ON, _n_collecting
+
+    metrics = Metrics()
+    token = _current.set(metrics)
+    with _lock:
+        _n_collecting += 1
+        ON = True
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+        with _lock:
+            _n_collecting -= 1
+            ON = _n_collecting > 0
@@ -0,0 +1,131 @@
+"""
+Pull every integer out of a puzzle input in one go, for the number-heavy days.
+
+    ints("Time:      7  15   30")           # array('q', [7, 15, 30])
+    int_rows("1,0,1~1,2,1\n0,0,2~2,0,2\n", width=6)
+                                            # [(1, 0, 1, 1, 2, 1), (0, 0, 2, 2, 0, 2)]
+    int_rows("0 3 6 9\n1 3 6 10 15\n")     # [(0, 3, 6, 9), (1, 3, 6, 10, 15)]
+
+Anything that isn't a digit, or a minus sign in front of one, separates numbers,
+so labels and punctuation ("Card 12:", "seed-to-soil map:", " @ ", "~") drop out
+without the day splitting on them first. The text is cleaned with one
+bytes.translate and then converted all at once.
+
+Converting is the expensive bit. A big input goes through numpy, which does it
+in C; a small one through int(), as numpy takes longer to import than a real
+puzzle input takes to parse. NUMPY_MIN_SIZE is where one turns into the other,
+and numpy is only imported once an input is that big.
+
+int_rows gives one tuple per line that has numbers on it, and copes with
+numbers of any size. Pass width when every
+line should have the same count: it's checked, and it saves working out where
+each line ends.
+
+"""
+
+import re
+from array import array
+from typing import Optional
+
+# Characters of input from which numpy is worth importing.
+NUMPY_MIN_SIZE = 1 << 16
+
+# Digits, minus signs and newlines stay; everything else becomes a space.
+_KEEP = b'0123456789-\n'
+_TABLE = bytes(c if c in _KEEP else ord(' ') for c in range(256))
+# A minus that isn't a sign: not in front of a digit, or straight after one.
+_NOT_A_SIGN = re.compile(rb'-(?:(?!\d)|(?<=\d-))')
+_NEWLINE = ord('\n')
+
+# numpy saturates anything beyond 64 bits instead of complaining.
+_INT64_LIMITS = (-(1 << 63), (1 << 63) - 1)
+
+
+def _clean(text: str) -> bytes:
+    """Return the text as bytes of only numbers, spaces and newlines."""
+    cleaned = text.encode().translate(_TABLE)
+    if b'-' in cleaned:
+        cleaned = _NOT_A_SIGN.sub(b' ', cleaned)
+    return cleaned
+
+
+def _use_numpy(text: str) -> bool:
+    return len(text) >= NUMPY_MIN_SIZE
+
+
+def _to_numpy(cleaned: bytes) -> Optional["numpy.ndarray"]:  # noqa: F821
+    """Return every number as an int64 array, or None if any don't fit."""
+    import numpy as np
+
+    values = np.fromstring(cleaned, dtype=np.int64, sep=' ')
+    if values.size and (values.min() in _INT64_LIMITS or values.max() in _INT64_LIMITS):
+        return None
+    return values
+
+
+def ints(text: str) -> array:
+    """
+    Return every integer in the text, in order. Raise OverflowError if any
+    don't fit in 64 bits.
+
+    """
+    cleaned = _clean(text)
+    if _use_numpy(text):
+        values = _to_numpy(cleaned)
+        if values is not None:
+            out = array('q')
+            out.frombytes(values.tobytes())
+            return out
+    return array('q', map(int, cleaned.split()))
+
+
+def int_rows(text: str, width: Optional[int] = None) -> list[tuple[int]]:
+    """
+    Return the integers on each line of the text that has any, a tuple a line.
+
+    With width, raise ValueError unless every such line has exactly that many.
+
+    """
+    cleaned = _clean(text)
+    if _use_numpy(text):
+        values = _to_numpy(cleaned)
+        if values is not None:
+            return _numpy_rows(cleaned, values, width)
+
+    rows = [
+        tuple(map(int, numbers))
+        for numbers in map(bytes.split, cleaned.split(b'\n'))
+        if numbers
+    ]
+    if width is not None and any(len(row) != width for row in rows):
+        raise ValueError(f"Expected {width} numbers on every line.")
+    return rows
+
+
+def _numpy_rows(
+    cleaned: bytes,
+    values: "numpy.ndarray",  # noqa: F821
+    width: Optional[int],
+) -> list[tuple[int]]:
+    import numpy as np
+
+    # A number starts wherever a digit or sign follows a space or newline. How
+    # many start before each newline gives how many each line has.
+    chars = np.frombuffer(cleaned, dtype=np.uint8)
+    in_number = chars > ord(' ')
+    starts = in_number.copy()
+    starts[1:] &= ~in_number[:-1]
+    before_newline = np.searchsorted(
+        np.flatnonzero(starts), np.flatnonzero(chars == _NEWLINE),
+    )
+    counts = np.diff(before_newline, prepend=0, append=values.size)
+    counts = counts[counts > 0]
+
+    if width is not None and (counts != width).any():
+        raise ValueError(f"Expected {width} numbers on every line.")
+    if counts.size and (counts == counts[0]).all():
+        return list(map(tuple, values.reshape(-1, counts[0]).tolist()))
+    return [
+        tuple(row.tolist())
+        for row in np.split(values, np.cumsum(counts)[:-1])
+    ]
@@ -0,0 +1,67 @@
+"""
+In-process cache of parsed puzzle inputs.
+
+Each day's `parse` is wrapped with `cached_parse`, so `part1`, `part2` and
+`solve` can all call it and only the first call pays for parsing. Entries are
+keyed by the parse function and a hash of the input, so a different input (or a
+different day) never sees someone else's parse. Inputs are usually text; a Grid
+(see aoc2023.grid) is hashed by its cells.
+
+Parsed objects are shared between callers: solvers must copy anything they want
+to mutate.
+
+"""
+
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+# Parsed inputs are small next to the solvers' working state, but there's no
+# reason to hang on to more than a few days' worth.
+MAX_ENTRIES = 32
+
+_cache: OrderedDict[tuple, Any] = OrderedDict()
+_lock = threading.Lock()
+
+
+def input_hash(data: Any) -> str:
+    """Return a digest identifying an input."""
+    buffer = data.encode() if isinstance(data, str) else data.cells
+    return hashlib.blake2b(buffer, digest_size=16).hexdigest()
+
+
+def cached_parse(fn: Callable[[str], Any]) -> Callable[[str], Any]:
+    """Cache fn(data), least recently used entries falling out first."""
+
+    @functools.wraps(fn)
+    def wrapper(data: Any) -> Any:
+        key = (fn.__module__, fn.__qualname__, input_hash(data))
+        with _lock:
+            if key in _cache:
+                _cache.move_to_end(key)
+                return _cache[key]
+
+        parsed = fn(data)
+
+        with _lock:
+            _cache[key] = parsed
+            while len(_cache) > MAX_ENTRIES:
+                _cache.popitem(last=False)
+        return parsed
+
+    # Handy for timing the parse itself.
+    wrapper.uncached = fn
+    return wrapper
+
+
+def size() -> int:
+    """Return how many parsed inputs are cached."""
+    return len(_cache)
+
+
+def clear() -> None:
+    """Drop every cached parse."""
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,206 @@
+"""
+Profile any part of any day: where the time goes, and where the memory goes.
+
+    python -m aoc2023.profiling 17 -p 2             # Day 17 part 2, real input.
+    python -m aoc2023.profiling 23 -i tests/inputs/d23 -o profiles/
+    python -m aoc2023.profiling 7 -s 10 --label before   # Synthetic, 10x.
+
+Each part is run three times, once per tool, since each one skews the others:
+
+    day17-part2.pstats      cProfile stats, for pstats/snakeviz.
+    day17-part2.memory.txt  tracemalloc's peak and top allocation sites.
+    day17-part2.collapsed   Sampled stacks, one `a;b;c count` per line, ready
+                            for flamegraph.pl or speedscope.
+
+A --label goes on the end of each name (day17-part2-before.pstats) so runs can
+be kept side by side. Parts are called as `partN(data)` with nothing changed
+in the day modules. The parse cache is cleared before each run, so parsing is
+included.
+
+"""
+
+import argparse
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Callable, Optional
+
+from aoc2023 import parse_cache
+from aoc2023.runner import PARTS, load_day
+
+# Seconds between stack samples.
+INTERVAL = 0.001
+TOP = 20
+
+
+def run_label(day: int, part: int, label: Optional[str] = None) -> str:
+    name = f'day{day}-part{part}'
+    return f'{name}-{label}' if label else name
+
+
+def profile_cpu(fn: Callable, data: str) -> pstats.Stats:
+    """Run fn(data) under cProfile."""
+    parse_cache.clear()
+    profiler = cProfile.Profile()
+    profiler.runcall(fn, data)
+    return pstats.Stats(profiler)
+
+
+def profile_memory(fn: Callable, data: str, top: int = TOP) -> str:
+    """Run fn(data) under tracemalloc. Return a report of the peak and top sites."""
+    parse_cache.clear()
+    tracemalloc.start()
+    try:
+        fn(data)
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ])
+    lines = [f"Peak traced memory: {peak / 1e6:.2f} MB", '']
+    lines.append(f"Top {top} allocation sites still alive at the end:")
+    for stat in snapshot.statistics('lineno')[:top]:
+        lines.append(f"  {stat}")
+    return '\n'.join(lines)
+
+
+def _collapse(frame: Optional[FrameType], root: CodeType) -> Optional[str]:
+    """
+    Return a frame's stack as 'file:func;file:func', outermost first, starting
+    from the call into root. Return None if root isn't on the stack.
+
+    """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+        if code is root:
+            return ';'.join(reversed(names))
+        frame = frame.f_back
+    return None
+
+
+def sample_stacks(fn: Callable, data: str, interval: float = INTERVAL) -> Counter:
+    """
+    Run fn(data), sampling the calling thread's stack every interval seconds.
+
+    Return {collapsed stack: samples}. The sampler is a thread, so samples only
+    land when the solver gives up the GIL (every few ms by default, which is
+    plenty for anything worth profiling).
+
+    """
+    parse_cache.clear()
+    target = threading.get_ident()
+    root = fn.__code__
+    stacks = Counter()
+    done = threading.Event()
+
+    def sample() -> None:
+        while not done.wait(interval):
+            stack = _collapse(sys._current_frames().get(target), root)
+            if stack is not None:
+                stacks[stack] += 1
+
+    old_interval = sys.getswitchinterval()
+    sys.setswitchinterval(interval)
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        fn(data)
+    finally:
+        done.set()
+        sampler.join()
+        sys.setswitchinterval(old_interval)
+    return stacks
+
+
+def profile_part(
+    day: int,
+    part: int,
+    data: str,
+    out_dir: Path,
+    label: Optional[str] = None,
+    top: int = TOP,
+) -> dict[str, Path]:
+    """Profile one part with every tool, writing a file for each. Return the paths."""
+    fn = getattr(load_day(day), f'part{part}')
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = run_label(day, part, label)
+    paths = {
+        'pstats': Path(out_dir, f'{stem}.pstats'),
+        'memory': Path(out_dir, f'{stem}.memory.txt'),
+        'collapsed': Path(out_dir, f'{stem}.collapsed'),
+    }
+
+    profile_cpu(fn, data).dump_stats(paths['pstats'])
+    paths['memory'].write_text(profile_memory(fn, data, top) + '\n')
+    stacks = sample_stacks(fn, data)
+    paths['collapsed'].write_text(
+        ''.join(f"{stack} {n}\n" for stack, n in stacks.most_common())
+    )
+    return paths
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('day', type=int)
+    parser.add_argument(
+        '-p', '--part', dest='parts', type=int, choices=PARTS, action='append',
+        help="Part to profile. Can be given twice. Defaults to both.",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        '-i', '--input', type=Path,
+        help="Input file to use instead of the day's INPUT_FILE.",
+    )
+    source.add_argument(
+        '-s', '--scale', type=float,
+        help="Profile a synthetic input this many times the real size.",
+    )
+    parser.add_argument(
+        '-o', '--out-dir', type=Path, default=Path('profiles'),
+        help="Where to write the reports. Defaults to ./profiles.",
+    )
+    parser.add_argument('--label', help="Suffix for the report names.")
+    parser.add_argument(
+        '--top', type=int, default=TOP,
+        help=f"Rows in each summary. Defaults to {TOP}.",
+    )
+    args = parser.parse_args(argv)
+    parts = tuple(sorted(set(args.parts))) if args.parts else PARTS
+
+    if args.scale is not None:
+        from aoc2023.generators import generate
+
+        data = generate(args.day, args.scale)
+    else:
+        with open(args.input or load_day(args.day).INPUT_FILE) as f:
+            data = f.read()
+
+    for part in parts:
+        start = time.perf_counter()
+        paths = profile_part(args.day, part, data, args.out_dir, args.label, args.top)
+        print(f"== {run_label(args.day, part, args.label)} "
+              f"({time.perf_counter() - start:.2f}s to profile)")
+        summary = io.StringIO()
+        pstats.Stats(str(paths['pstats']), stream=summary).sort_stats(
+            'cumulative'
+        ).print_stats(args.top)
+        print(summary.getvalue().strip())
+        print(paths['memory'].read_text().splitlines()[0])
+        for path in paths.values():
+            print(f"wrote {path}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+On-disk cache of answers, so rerunning an unchanged day on an unchanged input
+is instant.
+
+    python -m aoc2023 --cache          # Use (and fill) the cache.
+    python -m aoc2023.resultcache      # What's in it.
+    python -m aoc2023.resultcache --clear
+
+An answer is keyed by (day, part, code hash, input hash). The code hash covers
+the day module's source and the source of every aoc2023 module it pulls things
+from (the grid, the parse cache, ...), and what those pull from in turn, so
+editing any of them quietly invalidates that day's answers: the old keys are
+never looked up again and age out of the cache.
+
+Everything lives in one SQLite file, ~/.cache/aoc2023/results.sqlite by
+default (or $AOC_CACHE_DIR/results.sqlite). It holds at most MAX_ENTRIES
+answers; the least recently used are evicted first.
+
+"""
+
+import argparse
+import hashlib
+import importlib
+import inspect
+import os
+import pickle
+import sqlite3
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Optional
+
+from aoc2023.parse_cache import input_hash
+
+MAX_ENTRIES = 10000
+
+# Returned by get() for a miss, since None is a perfectly good answer.
+MISS = object()
+
+_code_hashes: dict[str, str] = dict()
+
+
+def default_path() -> Path:
+    cache_dir = os.environ.get('AOC_CACHE_DIR')
+    if cache_dir is None:
+        base = os.environ.get('XDG_CACHE_HOME', Path(Path.home(), '.cache'))
+        cache_dir = Path(base, 'aoc2023')
+    return Path(cache_dir, 'results.sqlite')
+
+
+def _local_dependencies(module: ModuleType) -> set[str]:
+    """
+    Return the names of aoc2023 modules a module uses, directly or through
+    the others, itself included.
+
+    """
+    package = module.__name__.split('.')[0]
+    names = set()
+    to_visit = [module.__name__]
+    while to_visit:
+        name = to_visit.pop()
+        if name in names:
+            continue
+        names.add(name)
+        if name == package:
+            # Its attributes are whichever modules happen to be imported by now.
+            continue
+        for value in vars(importlib.import_module(name)).values():
+            if isinstance(value, ModuleType):
+                used = value.__name__
+            else:
+                used = getattr(value, '__module__', None)
+            if isinstance(used, str) and used.split('.')[0] == package:
+                to_visit.append(used)
+    return names
+
+
+def code_hash(module: ModuleType) -> str:
+    """Return a digest of a day module's source and its aoc2023 dependencies."""
+    if module.__name__ not in _code_hashes:
+        digest = hashlib.blake2b(digest_size=16)
+        for name in sorted(_local_dependencies(module)):
+            source_file = inspect.getsourcefile(importlib.import_module(name))
+            digest.update(name.encode())
+            digest.update(Path(source_file).read_bytes())
+        _code_hashes[module.__name__] = digest.hexdigest()
+    return _code_hashes[module.__name__]
+
+
+class ResultCache:
+    """Answers on disk, least recently used evicted past max_entries."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_entries: int = MAX_ENTRIES,
+    ) -> None:
+        self.path = Path(path) if path is not None else default_path()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " day INTEGER, part INTEGER,"
+                " answer BLOB, last_used REAL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS by_last_used ON results (last_used)"
+            )
+
+    @staticmethod
+    def key(module: ModuleType, part: int, data: str) -> str:
+        return f"{module.__name__}:{part}:{code_hash(module)}:{input_hash(data)}"
+
+    def get(self, module: ModuleType, part: int, data: str) -> Any:
+        """Return the cached answer, or MISS."""
+        key = self.key(module, part, data)
+        row = self._db.execute(
+            "SELECT answer FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return MISS
+        self.hits += 1
+        with self._db:
+            self._db.execute(
+                "UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+        return pickle.loads(row[0])
+
+    def put(self, module: ModuleType, part: int, data: str, answer: Any) -> None:
+        key = self.key(module, part, data)
+        day = int(module.__name__.rsplit('day', 1)[-1])
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (key, day, part, pickle.dumps(answer), time.time()),
+            )
+            self._db.execute(
+                "DELETE FROM results WHERE key IN ("
+                " SELECT key FROM results ORDER BY last_used DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._db:
+            self._db.execute("DELETE FROM results")
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Inspect the on-disk answer cache.")
+    parser.add_argument('--clear', action='store_true', help="Empty the cache.")
+    args = parser.parse_args(argv)
+
+    with ResultCache() as cache:
+        if args.clear:
+            cache.clear()
+        rows = cache._db.execute(
+            "SELECT day, part, COUNT(*) FROM results GROUP BY day, part"
+        ).fetchall()
+        print(f"{cache.path}: {len(cache)} answers")
+        for day, part, n in rows:
+            print(f"{day:>3} {part:>4} {n:>6}")
+
+
+if __name__ == "__main__":
+    main()
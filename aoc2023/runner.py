@@ -0,0 +1,390 @@
+"""
+Run any combination of days/parts and report how long each one took.
+
+    python -m aoc2023                 # Every day, both parts.
+    python -m aoc2023 17 23 -p 2      # Just part 2 of days 17 and 23.
+    python -m aoc2023 5 -i my_input   # Someone else's input.
+    python -m aoc2023 --json out.json # Also dump the timings as JSON.
+    python -m aoc2023 10 -vv          # With the solvers' debug chatter.
+    python -m aoc2023 --cache         # Reuse answers from unchanged runs.
+    python -m aoc2023 2 -i big --stream  # Read the input a line at a time.
+    python -m aoc2023 23 --timeout 10    # Best so far after 10s.
+    python -m aoc2023 23 --checkpoint d23.ckpt  # Resumable if killed.
+    python -m aoc2023 17 --metrics       # How much work each part did.
+    python -m aoc2023 24 --engine reference  # The readable version.
+
+Each day is split into a 'parse' stage (reading the input and, if the day has
+one, running its `parse` function) and one stage per part. Wall and CPU time are
+recorded for every stage so it's obvious where the time is going. With --cache,
+answers come from (and go to) the on-disk cache in aoc2023.resultcache, and a
+day whose parts are all cached skips parsing altogether. With --stream, the
+line-based days (see aoc2023.streaming) read the file as they go, so there's no
+parse stage.
+
+--timeout gives each day a deadline (see aoc2023.deadline). The long searches
+check it and report a partial result when it passes; the rest just finish.
+--checkpoint has the longest loops save their progress to a file as they go
+(see aoc2023.checkpoint), and pick up from it when run again.
+--metrics collects each part's work counters (see aoc2023.metrics), which are
+listed after the timings and included in the JSON.
+
+Where a day has faster engines than its own part1/part2, the one that suits the
+input is picked (see aoc2023.engines) and named next to the answer. --engine
+forces one by name.
+
+"""
+
+import argparse
+import importlib
+import json
+import re
+import sys
+import time
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Optional
+
+from aoc2023 import checkpoint, deadline, engines, metrics, trace
+
+HERE = Path(__file__).parent
+DAY_MODULE = re.compile(r'day(\d+)$')
+PARTS = (1, 2)
+
+
+@dataclass
+class StageResult:
+    """Timing (and answer, for parts) of one stage of one day."""
+
+    day: int
+    stage: str
+    wall_s: float
+    cpu_s: float
+    answer: Any = None
+    error: Optional[str] = None
+    cached: bool = False
+    # Work counters, for parts run with metrics collected.
+    metrics: Optional[dict] = None
+    # Which of the part's engines ran, if it has more than one.
+    engine: Optional[str] = None
+
+
+def discover_days() -> dict[int, str]:
+    """Return {day number: module name} for every dayN module in the package."""
+    days = dict()
+    for path in HERE.glob('day*.py'):
+        match = DAY_MODULE.match(path.stem)
+        if match:
+            days[int(match.group(1))] = f'aoc2023.{path.stem}'
+    return dict(sorted(days.items()))
+
+
+def load_day(day: int) -> ModuleType:
+    """Import the module for a day."""
+    try:
+        return importlib.import_module(discover_days()[day])
+    except KeyError:
+        raise ValueError(f"There's no module for day {day}.") from None
+
+
+def timed(fn: Callable, *args, **kwargs) -> tuple[Any, float, float]:
+    """Return fn's result, wall time, and CPU time (seconds)."""
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    result = fn(*args, **kwargs)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    return result, wall, cpu
+
+
+def run_part(
+    day: int,
+    part: int,
+    fn: Callable,
+    data: Any,
+    collect_metrics: bool = False,
+) -> StageResult:
+    """Time one part, collecting its work counters if asked."""
+    collector = metrics.collecting() if collect_metrics else nullcontext()
+    try:
+        with collector as work:
+            answer, wall, cpu = timed(fn, data)
+    except Exception as e:
+        return StageResult(day, f'part{part}', 0.0, 0.0, error=repr(e))
+    return StageResult(
+        day, f'part{part}', wall, cpu, answer,
+        metrics=work.as_dict() if collect_metrics else None,
+    )
+
+
+def read_input(
+    module: ModuleType,
+    input_file: Optional[Path] = None,
+    parse: bool = True,
+) -> Any:
+    """Read the day's input, run its parse stage (if any), and return the data."""
+    if input_file is None:
+        input_file = module.INPUT_FILE
+    # Days can say how their input should be loaded (the grid days map it);
+    # otherwise it's read as text.
+    load = getattr(module, 'load', None)
+    if load is not None:
+        data = load(input_file)
+    else:
+        with open(input_file) as f:
+            data = f.read()
+    if parse:
+        parse_input(module, data)
+    return data
+
+
+def parse_input(module: ModuleType, data: Any) -> None:
+    """Run the day's parser, if it has one."""
+    # Warm up the day's parser so parsing shows up in the parse stage rather
+    # than being lumped in with whichever part runs first.
+    parse = getattr(module, 'parse', None)
+    if parse is not None:
+        parse(data)
+
+
+def run_day(
+    day: int,
+    parts: tuple[int] = PARTS,
+    input_file: Optional[Path] = None,
+    cache: Optional["ResultCache"] = None,  # noqa: F821
+    timeout: Optional[float] = None,
+    collect_metrics: bool = False,
+    engine: Optional[str] = None,
+) -> list[StageResult]:
+    """Run the requested parts of a day, timing each stage."""
+    with deadline.within(timeout):
+        return _run_day(day, parts, input_file, cache, collect_metrics, engine)
+
+
+def _run_day(
+    day: int,
+    parts: tuple[int],
+    input_file: Optional[Path],
+    cache: Optional["ResultCache"],  # noqa: F821
+    collect_metrics: bool,
+    engine: Optional[str] = None,
+) -> list[StageResult]:
+    module = load_day(day)
+    try:
+        data, wall, cpu = timed(read_input, module, input_file, parse=cache is None)
+    except OSError as e:
+        return [StageResult(day, 'parse', 0.0, 0.0, error=str(e))]
+
+    cached = dict()
+    if cache is not None:
+        from aoc2023.resultcache import MISS
+
+        for part in parts:
+            answer = cache.get(module, part, data)
+            if answer is not MISS:
+                cached[part] = answer
+        if len(cached) < len(parts):
+            _, parse_wall, parse_cpu = timed(parse_input, module, data)
+            wall += parse_wall
+            cpu += parse_cpu
+    results = [StageResult(day, 'parse', wall, cpu)]
+
+    for part in parts:
+        if part in cached:
+            results.append(
+                StageResult(day, f'part{part}', 0.0, 0.0, cached[part], cached=True)
+            )
+            continue
+        try:
+            chosen = engines.choose(day, part, data, engine)
+        except ValueError as e:
+            results.append(StageResult(day, f'part{part}', 0.0, 0.0, error=str(e)))
+            continue
+        result = run_part(day, part, chosen.fn, data, collect_metrics)
+        if len(engines.engines_for(day, part)) > 1:
+            result.engine = chosen.name
+        results.append(result)
+        if (
+            cache is not None
+            and result.error is None
+            and not isinstance(result.answer, deadline.Partial)
+        ):
+            cache.put(module, part, data, result.answer)
+    return results
+
+
+def stream_day(
+    day: int,
+    parts: tuple[int] = PARTS,
+    input_file: Optional[Path] = None,
+    timeout: Optional[float] = None,
+    collect_metrics: bool = False,
+) -> list[StageResult]:
+    """Run the requested parts of a line-based day, each on its own open file."""
+    from aoc2023.streaming import STREAMING_DAYS
+
+    if day not in STREAMING_DAYS:
+        raise ValueError(f"Day {day} can't stream its input.")
+    module = load_day(day)
+    if input_file is None:
+        input_file = module.INPUT_FILE
+
+    results = []
+    for part in parts:
+        fn = getattr(module, f'part{part}')
+        try:
+            with open(input_file) as f, deadline.within(timeout):
+                results.append(run_part(day, part, fn, f, collect_metrics))
+        except OSError as e:
+            results.append(StageResult(day, f'part{part}', 0.0, 0.0, error=repr(e)))
+    return results
+
+
+def format_results(results: list[StageResult]) -> str:
+    """Format results as a table."""
+    lines = [f"{'day':>3}  {'stage':<6} {'wall (s)':>10} {'cpu (s)':>10}  answer"]
+    for result in results:
+        if result.error:
+            outcome = f"ERROR: {result.error}"
+        elif result.answer is None:
+            outcome = ''
+        else:
+            outcome = str(result.answer)
+        if result.cached:
+            outcome += ' (cached)'
+        if result.engine is not None:
+            outcome += f' [{result.engine}]'
+        lines.append(
+            f"{result.day:>3}  {result.stage:<6} "
+            f"{result.wall_s:>10.4f} {result.cpu_s:>10.4f}  {outcome}"
+        )
+    total_wall = sum(result.wall_s for result in results)
+    total_cpu = sum(result.cpu_s for result in results)
+    lines.append(f"{'':>3}  {'total':<6} {total_wall:>10.4f} {total_cpu:>10.4f}")
+    return '\n'.join(lines)
+
+
+def format_metrics(results: list[StageResult]) -> str:
+    """Format each part's work counters, one per line."""
+    lines = []
+    for result in results:
+        for name, value in (result.metrics or {}).items():
+            lines.append(f"{result.day:>3}  {result.stage:<6} {name:<40} {value:>12}")
+    return '\n'.join(lines)
+
+
+def results_to_json(results: list[StageResult]) -> str:
+    """Dump results to a JSON string. Answers that JSON can't handle are repr'd."""
+    return json.dumps([asdict(result) for result in results], indent=2, default=repr)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m aoc2023',
+        description="Run and time Advent of Code 2023 solutions.",
+    )
+    parser.add_argument(
+        'days', nargs='*', type=int,
+        help="Days to run. Defaults to every day with a module.",
+    )
+    parser.add_argument(
+        '-p', '--part', dest='parts', type=int, choices=PARTS, action='append',
+        help="Part to run. Can be given twice. Defaults to both.",
+    )
+    parser.add_argument(
+        '-i', '--input', type=Path,
+        help="Input file to use instead of the day's INPUT_FILE. One day only.",
+    )
+    parser.add_argument(
+        '--json', metavar='PATH',
+        help="Also write the results as JSON to PATH ('-' for stdout).",
+    )
+    parser.add_argument(
+        '-v', '--verbose', action='count', default=0,
+        help="Trace the solvers to stderr: -v for info, -vv for debug.",
+    )
+    parser.add_argument(
+        '--cache', action='store_true',
+        help="Reuse answers cached on disk by earlier runs of unchanged code.",
+    )
+    parser.add_argument(
+        '--stream', action='store_true',
+        help="Feed line-based days their input a line at a time, from the file.",
+    )
+    parser.add_argument(
+        '-t', '--timeout', type=float, metavar='SECONDS',
+        help="Per-day deadline. Long searches stop and report their best so far.",
+    )
+    parser.add_argument(
+        '--checkpoint', metavar='PATH',
+        help="Have long loops save progress to PATH, and resume from what's there.",
+    )
+    parser.add_argument(
+        '--metrics', action='store_true',
+        help="Collect and list how much work (nodes popped, etc.) each part did.",
+    )
+    parser.add_argument(
+        '--engine', metavar='NAME',
+        help="Run this engine (e.g. 'reference') rather than the one that suits.",
+    )
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    days = args.days or list(discover_days())
+    if args.input and len(days) != 1:
+        raise SystemExit("--input only makes sense for a single day.")
+    parts = tuple(sorted(set(args.parts))) if args.parts else PARTS
+    if args.stream and args.cache:
+        raise SystemExit("--stream and --cache don't mix.")
+    if args.stream and args.engine not in (None, engines.REFERENCE):
+        raise SystemExit(f"Only the {engines.REFERENCE} engines take a stream.")
+    if args.stream and not args.days:
+        from aoc2023.streaming import STREAMING_DAYS
+
+        days = list(STREAMING_DAYS)
+    if args.verbose:
+        trace.set_level(min(args.verbose, trace.DEBUG))
+
+    cache = None
+    if args.cache:
+        from aoc2023.resultcache import ResultCache
+
+        cache = ResultCache()
+
+    results = []
+    try:
+        with checkpoint.to(args.checkpoint):
+            for day in days:
+                if args.stream:
+                    results.extend(stream_day(
+                        day, parts, args.input, args.timeout, args.metrics,
+                    ))
+                else:
+                    results.extend(run_day(
+                        day, parts, args.input, cache, args.timeout, args.metrics,
+                        args.engine,
+                    ))
+    finally:
+        if cache is not None:
+            cache.close()
+
+    print(format_results(results))
+    if any(result.metrics for result in results):
+        print()
+        print(format_metrics(results))
+    if trace.counters:
+        print()
+        for name, value in sorted(trace.counters.items()):
+            print(f"{name:<30} {value:>12}")
+    if args.json == '-':
+        print(results_to_json(results))
+    elif args.json:
+        Path(args.json).write_text(results_to_json(results))
+    return 1 if any(result.error for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
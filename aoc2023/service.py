@@ -0,0 +1,329 @@
+"""
+Serve the solvers over HTTP on localhost.
+
+    python -m aoc2023.service                   # http://127.0.0.1:8023
+    python -m aoc2023.service -j 4 --queue 16   # Four workers, 16 waiting.
+
+    curl -d '{"day": 9, "part": 1, "input": "0 3 6 9 12 15\\n"}' \\
+        http://127.0.0.1:8023/solve
+    curl http://127.0.0.1:8023/stats
+
+POST /solve takes a JSON object with the day, the part and the input text
+(and optionally a timeout in seconds, which becomes the part's deadline, see
+aoc2023.deadline, and an engine to force, see aoc2023.engines). It answers with
+the answer, the engine that found it and how long it took.
+GET /stats reports request counts and p50/p95/p99 latencies, overall and per
+(day, part). GET /health says whether the pool is up.
+
+Solving happens in a process pool that is started, and has every day module
+imported (z3, scipy and all), before the first request is accepted. Admission
+is bounded: one request per worker runs while up to `--queue` more wait; past
+that a request is turned away at once with a 503 rather than piling up.
+
+Nothing here talks to anything but the client; it's stdlib asyncio and a
+deliberately small HTTP/1.1 handler, not a web framework.
+
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional
+
+from aoc2023 import deadline, engines
+from aoc2023.batch import warm_up
+from aoc2023.runner import PARTS, discover_days, timed
+
+HOST = '127.0.0.1'
+PORT = 8023
+# Requests waiting for a worker, on top of the ones being solved.
+QUEUE = 32
+# Biggest request body accepted, in bytes.
+MAX_BODY = 64 * 1024 * 1024
+# Latencies kept per (day, part) for the percentiles.
+WINDOW = 10000
+PERCENTILES = (50, 95, 99)
+
+REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def solve_in_worker(
+    day: int,
+    part: int,
+    data: str,
+    timeout: Optional[float] = None,
+    engine: Optional[str] = None,
+) -> tuple[Any, float, str]:
+    """Worker process: return (answer, seconds, engine) for one part."""
+    chosen = engines.choose(day, part, data, engine)
+    with deadline.within(timeout):
+        answer, wall, _ = timed(chosen.fn, data)
+    return answer, wall, chosen.name
+
+
+def percentile(ordered: list[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+class LatencyStats:
+    """Request latencies over a sliding window."""
+
+    def __init__(self, window: int = WINDOW) -> None:
+        self.latencies = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+
+    def record(self, seconds: float, ok: bool = True) -> None:
+        self.latencies.append(seconds)
+        self.count += 1
+        self.errors += not ok
+
+    def summary(self) -> dict:
+        ordered = sorted(self.latencies)
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            **{f'p{p}_s': percentile(ordered, p) for p in PERCENTILES},
+        }
+
+
+class SolveService:
+    """The pool, the admission count, and the stats."""
+
+    def __init__(self, workers: Optional[int] = None, queue: int = QUEUE) -> None:
+        self.workers = workers or os.cpu_count()
+        self.capacity = self.workers + queue
+        self.days = tuple(discover_days())
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.in_flight = 0
+        self.rejected = 0
+        self.started = time.time()
+        self.overall = LatencyStats()
+        self.by_part: dict[tuple[int, int], LatencyStats] = dict()
+
+    async def start(self) -> None:
+        """Start the pool and wait until every worker has done its imports."""
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=warm_up, initargs=(self.days,),
+        )
+        loop = asyncio.get_running_loop()
+        # Workers start as work arrives, so hand each one something to do.
+        await asyncio.gather(*(
+            loop.run_in_executor(self.pool, os.getpid) for _ in range(self.workers)
+        ))
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def solve(self, request: dict) -> dict:
+        try:
+            day = int(request['day'])
+            part = int(request['part'])
+            data = request['input']
+            timeout = request.get('timeout')
+            engine = request.get('engine')
+        except (KeyError, TypeError, ValueError):
+            raise HTTPError(400, "Expected day, part and input.") from None
+        if engine is not None and not isinstance(engine, str):
+            raise HTTPError(400, "The engine should be a name.")
+        if timeout is not None and (
+            isinstance(timeout, bool) or not isinstance(timeout, (int, float))
+        ):
+            raise HTTPError(400, "The timeout should be a number of seconds.")
+        if day not in self.days or part not in PARTS:
+            raise HTTPError(404, f"There's no day {day} part {part}.")
+        if not isinstance(data, str):
+            raise HTTPError(400, "The input should be a string.")
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise HTTPError(503, "Too busy. Try again shortly.")
+
+        self.in_flight += 1
+        start = time.perf_counter()
+        ok = False
+        try:
+            loop = asyncio.get_running_loop()
+            answer, solve_s, engine = await loop.run_in_executor(
+                self.pool, solve_in_worker, day, part, data, timeout, engine,
+            )
+            ok = True
+        except engines.UnknownEngine as e:
+            raise HTTPError(400, str(e)) from None
+        except Exception as e:
+            raise HTTPError(500, repr(e)) from None
+        finally:
+            self.in_flight -= 1
+            latency = time.perf_counter() - start
+            self.overall.record(latency, ok)
+            self.by_part.setdefault((day, part), LatencyStats()).record(latency, ok)
+
+        response = {
+            'day': day,
+            'part': part,
+            'answer': answer,
+            'engine': engine,
+            'solve_s': solve_s,
+            'latency_s': latency,
+        }
+        if isinstance(answer, deadline.Partial):
+            response.update(answer=answer.best, partial=answer.progress)
+        return response
+
+    def stats(self) -> dict:
+        return {
+            'uptime_s': time.time() - self.started,
+            'workers': self.workers,
+            'capacity': self.capacity,
+            'in_flight': self.in_flight,
+            'rejected': self.rejected,
+            'overall': self.overall.summary(),
+            'by_part': {
+                f'{day}.{part}': stats.summary()
+                for (day, part), stats in sorted(self.by_part.items())
+            },
+        }
+
+    async def route(self, method: str, path: str, body: bytes) -> tuple[int, dict]:
+        if path == '/solve':
+            if method != 'POST':
+                raise HTTPError(405, "POST a JSON request to /solve.")
+            try:
+                request = json.loads(body)
+            except ValueError:
+                raise HTTPError(400, "The body isn't JSON.") from None
+            if not isinstance(request, dict):
+                raise HTTPError(400, "Expected a JSON object.")
+            return 200, await self.solve(request)
+        if method != 'GET':
+            raise HTTPError(405, f"GET {path}.")
+        if path == '/stats':
+            return 200, self.stats()
+        if path == '/health':
+            return 200, {'ok': self.pool is not None}
+        raise HTTPError(404, f"Nothing at {path}.")
+
+    async def handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        """Serve one connection, for as many requests as the client keeps it for."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                status, payload, keep_alive = await self._respond(request_line, reader)
+                body = json.dumps(payload, default=repr).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                    "\r\n".encode() + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(
+        self,
+        request_line: bytes,
+        reader: asyncio.StreamReader,
+    ) -> tuple[int, dict, bool]:
+        """Read the rest of one request and work out (status, payload, keep-alive)."""
+        try:
+            method, target, version = request_line.decode('latin-1').split()
+        except ValueError:
+            return 400, {'error': "Malformed request line."}, False
+
+        headers = dict()
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        keep_alive = (
+            version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        )
+
+        length = int(headers.get('content-length', 0) or 0)
+        if length > MAX_BODY:
+            return 413, {'error': f"Bodies are limited to {MAX_BODY} bytes."}, False
+        body = await reader.readexactly(length) if length else b''
+
+        try:
+            status, payload = await self.route(method, target.split('?')[0], body)
+        except HTTPError as e:
+            status, payload = e.status, {'error': str(e)}
+        return status, payload, keep_alive
+
+
+async def serve(
+    host: str = HOST,
+    port: int = PORT,
+    workers: Optional[int] = None,
+    queue: int = QUEUE,
+) -> None:
+    """Warm the pool, then serve until cancelled."""
+    service = SolveService(workers, queue)
+    await service.start()
+    server = await asyncio.start_server(service.handle, host, port)
+    try:
+        async with server:
+            address = server.sockets[0].getsockname()
+            print(f"Serving on http://{address[0]}:{address[1]}", flush=True)
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('-p', '--port', type=int, default=PORT)
+    parser.add_argument(
+        '-j', '--workers', type=int,
+        help="Worker processes. Defaults to one per CPU.",
+    )
+    parser.add_argument(
+        '-q', '--queue', type=int, default=QUEUE,
+        help=f"Requests allowed to wait for a worker. Defaults to {QUEUE}.",
+    )
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.queue))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Feed line-based days their input a record at a time.
+
+The line-based days take their input as a str, as always, or as anything that
+yields lines: an open file, sys.stdin, a generator. Given a str they use their
+cached `parse` as before. Given anything else, they parse and consume one
+record at a time, so a multi-gigabyte file never has to be in memory at once
+(and never gets a second copy from splitlines()).
+
+    with open('huge_input') as f:
+        day2.part1(f)
+
+The str path is unchanged because most runs want the parse cached for the
+other part. A stream can only be read once, so each part needs its own.
+
+"""
+
+from typing import Any, Callable, Iterable, Iterator, Optional, Union
+
+# The days whose parts take a stream.
+STREAMING_DAYS = (1, 2, 4, 7, 9, 12, 15, 18, 24)
+
+# Characters read at a time when splitting a stream on something other than
+# newlines.
+CHUNK_SIZE = 1 << 16
+
+Input = Union[str, Iterable[str]]
+
+
+def lines(data: Input) -> Iterator[str]:
+    """Yield each line of the input, without its line ending."""
+    if isinstance(data, str):
+        yield from data.splitlines()
+        return
+    for line in data:
+        yield line.rstrip('\r\n')
+
+
+def records(
+    data: Input,
+    parse: Callable[[str], Iterable[Any]],
+    parse_record: Optional[Callable[[str], Any]] = None,
+) -> Iterable[Any]:
+    """
+    Return the input's parsed records.
+
+    A str goes through the day's (cached) parse. Anything else is parsed
+    lazily, a line at a time, with parse_record (if the records aren't just
+    the lines themselves).
+
+    """
+    if isinstance(data, str):
+        return parse(data)
+    if parse_record is None:
+        return lines(data)
+    return map(parse_record, lines(data))
+
+
+def fields(data: Input, sep: str = ',') -> Iterator[str]:
+    """
+    Yield the sep-separated fields of the input, stripped of whitespace.
+
+    For inputs that are one enormous line. A stream with a read() method is
+    read CHUNK_SIZE characters at a time; any other iterable's strings are
+    treated as consecutive chunks.
+
+    """
+    if isinstance(data, str):
+        chunks = (data,)
+    elif hasattr(data, 'read'):
+        chunks = iter(lambda: data.read(CHUNK_SIZE), '')
+    else:
+        chunks = data
+
+    partial = ''
+    for chunk in chunks:
+        pieces = (partial + chunk).split(sep)
+        # The last piece may continue into the next chunk.
+        partial = pieces.pop()
+        for piece in pieces:
+            piece = piece.strip()
+            if piece:
+                yield piece
+    partial = partial.strip()
+    if partial:
+        yield partial
@@ -0,0 +1,93 @@
+"""
+Diagnostics for the solvers that cost (next to) nothing when switched off.
+
+Solvers guard every message with one of the level flags, so when tracing is off
+the message is never even formatted:
+
+    from aoc2023 import trace
+
+    if trace.DEBUG_ON:
+        trace.emit(f"Evaluating {node}")
+    if trace.ON:
+        trace.count('day17.nodes')
+
+Levels are cumulative: INFO is the odd summary line per part, DEBUG is per
+iteration chatter. Counters are collected at any level above OFF. Pick a level
+with `set_level`, the runner's -v flag, or the AOC_TRACE environment variable
+(e.g. AOC_TRACE=debug).
+
+"""
+
+import contextlib
+import os
+import sys
+from collections import Counter
+from typing import Iterator, Optional, TextIO, Union
+
+OFF = 0
+INFO = 1
+DEBUG = 2
+LEVELS = {'off': OFF, 'info': INFO, 'debug': DEBUG}
+
+# Flags read at the call sites. Only ever set through set_level.
+ON = False
+INFO_ON = False
+DEBUG_ON = False
+
+level = OFF
+counters: Counter = Counter()
+# None means whatever sys.stderr is at the time, which plays nicely with
+# pytest's capturing.
+stream: Optional[TextIO] = None
+
+
+def set_level(new_level: Union[int, str], to: Optional[TextIO] = None) -> None:
+    """Set the trace level (a number or name), and optionally where it goes."""
+    global level, ON, INFO_ON, DEBUG_ON, stream
+    if isinstance(new_level, str) and new_level.isdigit():
+        new_level = int(new_level)
+    elif isinstance(new_level, str):
+        try:
+            new_level = LEVELS[new_level.lower()]
+        except KeyError:
+            raise ValueError(f"Unknown trace level {new_level!r}.") from None
+    level = new_level
+    ON = level > OFF
+    INFO_ON = level >= INFO
+    DEBUG_ON = level >= DEBUG
+    if to is not None:
+        stream = to
+
+
+def emit(message: str) -> None:
+    """Write a message. Callers check the level first."""
+    print(message, file=stream or sys.stderr)
+
+
+def count(name: str, n: int = 1) -> None:
+    """Add to a named counter. Callers check `trace.ON` first."""
+    counters[name] += n
+
+
+def reset() -> None:
+    """Zero every counter."""
+    counters.clear()
+
+
+@contextlib.contextmanager
+def tracing(
+    new_level: Union[int, str] = DEBUG,
+    to: Optional[TextIO] = None,
+) -> Iterator[Counter]:
+    """Trace at a level for the duration, yielding the counters."""
+    global stream
+    old_level, old_stream = level, stream
+    set_level(new_level, to)
+    try:
+        yield counters
+    finally:
+        set_level(old_level)
+        stream = old_stream
+
+
+set_level(os.environ.get('AOC_TRACE', OFF))
@@ -1,8 +1,9 @@
 """Run each day against its test input."""
 
+from functools import partial
 from pathlib import Path
 
-from pytest import mark
+from pytest import mark, raises
 import aoc2023
 
 
@@ -13,63 +14,713 @@ HERE = Path(__file__).parent
     argnames=['file', 'fn', 'expected'],
     argvalues=[
         # Put the most recent at the top to help speed things up.
-        # ('d24', aoc2023.day24.part2, 47),
+        ('d24', aoc2023.day24.part2, 47),
         # ('d24', aoc2023.day24.part1, 2),
         ('d23', aoc2023.day23.part2, 154),
         ('d23', aoc2023.day23.part1, 94),
-        # ('d22', aoc2023.day22.part2, 7),
-        # ('d22', aoc2023.day22.part1, 5),
+        ('d22', aoc2023.day22.part2, 7),
+        ('d22', aoc2023.day22.part1, 5),
         # ('d21', aoc2023.day21.part2, 16733044),
         # ('d21', aoc2023.day21.part2, 167004),
         # ('d21', aoc2023.day21.part2, 1594),
-        # ('d21', aoc2023.day21.part1, 16),
-        # ('d19', aoc2023.day19.part2, 167409079868000),
-        # ('d19', aoc2023.day19.part1, 19114),
-        # ('d18', aoc2023.day18.part2, 952408144115),
-        # ('d18', aoc2023.day18.part1, 62),
-        # ('d17', aoc2023.day17.part2, 94),
-        # ('d17', aoc2023.day17.part1, 102),
-        # ('d16', aoc2023.day16.part2, 51),
-        # ('d16', aoc2023.day16.part1, 46),
-        # ('d15_2', aoc2023.day15.part2, 145),
-        # ('d15_2', aoc2023.day15.part1, 1320),
-        # ('d15_1', aoc2023.day15.part1, 52),
+        ('d21', partial(aoc2023.day21.part1, n_steps=6), 16),
+        ('d19', aoc2023.day19.part2, 167409079868000),
+        ('d19', aoc2023.day19.part1, 19114),
+        ('d18', aoc2023.day18.part2, 952408144115),
+        ('d18', aoc2023.day18.part1, 62),
+        ('d17', aoc2023.day17.part2, 94),
+        ('d17', aoc2023.day17.part1, 102),
+        ('d16', aoc2023.day16.part2, 51),
+        ('d16', aoc2023.day16.part1, 46),
+        ('d15_2', aoc2023.day15.part2, 145),
+        ('d15_2', aoc2023.day15.part1, 1320),
+        ('d15_1', aoc2023.day15.part1, 52),
         # ('d14', aoc2023.day14.part2, 64),
-        # ('d14', aoc2023.day14.part1, 136),
-        # ('d13', aoc2023.day13.part2, 400),
-        # ('d13', aoc2023.day13.part1, 405),
-        # ('d12', aoc2023.day12.part2, 525152),
-        # ('d12', aoc2023.day12.part1, 21),
+        ('d14', aoc2023.day14.part1, 136),
+        ('d13', aoc2023.day13.part2, 400),
+        ('d13', aoc2023.day13.part1, 405),
+        ('d12', aoc2023.day12.part2, 525152),
+        ('d12', aoc2023.day12.part1, 21),
         # ('d11', aoc2023.day11.part2, 8410),
         # ('d11', aoc2023.day11.part2, 1030),
-        # ('d11', aoc2023.day11.part1, 374),
-        # ('d10_5', aoc2023.day10.part2, 10),
-        # ('d10_4', aoc2023.day10.part2, 8),
-        # ('d10_3', aoc2023.day10.part2, 4),
-        # ('d10_2', aoc2023.day10.part1, 8),
-        # ('d10_1', aoc2023.day10.part1, 4),
-        # ('d9', aoc2023.day9.part2, 2),
-        # ('d9', aoc2023.day9.part1, 114),
-        # ('d8_3', aoc2023.day8.part2, 6),
-        # ('d8_2', aoc2023.day8.part1, 6),
-        # ('d8_1', aoc2023.day8.part1, 2),
-        # ('d7', aoc2023.day7.part2, 5905),
-        # ('d7', aoc2023.day7.part1, 6440),
-        # ('d6', aoc2023.day6.part2, 71503),
-        # ('d6', aoc2023.day6.part1, 288),
-        # ('d5', aoc2023.day5.part2, 46),
-        # ('d5', aoc2023.day5.part1, 35),
-        # ('d4p2', aoc2023.day4.part2, 30),
-        # ('d4p1', aoc2023.day4.part1, 13),
-        # ('d3p2', aoc2023.day3.part2, 467835),
-        # ('d3p1', aoc2023.day3.part1, 4361),
-        # ('d2p2', aoc2023.day2.part2, 2286),
-        # ('d2p1', aoc2023.day2.part1, 8),
-        # ('d1p2', aoc2023.day1.part2, 281+83+79),
-        # ('d1p1', aoc2023.day1.part2, 142),
+        ('d11', aoc2023.day11.part1, 374),
+        ('d10_5', aoc2023.day10.part2, 10),
+        ('d10_4', aoc2023.day10.part2, 8),
+        ('d10_3', aoc2023.day10.part2, 4),
+        ('d10_2', aoc2023.day10.part1, 8),
+        ('d10_1', aoc2023.day10.part1, 4),
+        ('d9', aoc2023.day9.part2, 2),
+        ('d9', aoc2023.day9.part1, 114),
+        ('d8_3', aoc2023.day8.part2, 6),
+        ('d8_2', aoc2023.day8.part1, 6),
+        ('d8_1', aoc2023.day8.part1, 2),
+        ('d7', aoc2023.day7.part2, 5905),
+        ('d7', aoc2023.day7.part1, 6440),
+        ('d6', aoc2023.day6.part2, 71503),
+        ('d6', aoc2023.day6.part1, 288),
+        ('d5', aoc2023.day5.part2, 46),
+        ('d5', aoc2023.day5.part1, 35),
+        ('d4p2', aoc2023.day4.part2, 30),
+        ('d4p1', aoc2023.day4.part1, 13),
+        ('d3p2', aoc2023.day3.part2, 467835),
+        ('d3p1', aoc2023.day3.part1, 4361),
+        ('d2p2', aoc2023.day2.part2, 2286),
+        ('d2p1', aoc2023.day2.part1, 8),
+        ('d1p2', aoc2023.day1.part2, 281+83+79),
+        ('d1p1', aoc2023.day1.part2, 142),
     ]
 )
 def test_part(file: str, fn, expected: int) -> None:
     with open(Path(HERE, 'inputs', file)) as f:
         data = f.read()
     assert fn(data) == expected
+
+
+@mark.parametrize(
+    argnames=['file', 'module', 'expected'],
+    argvalues=[
+        ('d22', aoc2023.day22, (5, 7)),
+        ('d19', aoc2023.day19, (19114, 167409079868000)),
+        ('d17', aoc2023.day17, (102, 94)),
+        ('d13', aoc2023.day13, (405, 400)),
+        ('d12', aoc2023.day12, (21, 525152)),
+        ('d7', aoc2023.day7, (6440, 5905)),
+        ('d5', aoc2023.day5, (35, 46)),
+    ]
+)
+def test_solve(file: str, module, expected: tuple[int]) -> None:
+    with open(Path(HERE, 'inputs', file)) as f:
+        data = f.read()
+    assert module.solve(data) == expected
+    # Parsed state is shared, so solving again must give the same answers.
+    assert module.solve(data) == expected
+
+
+def test_day8_part1_needs_aaa_and_zzz() -> None:
+    data = Path(HERE, 'inputs', 'd8_3').read_text()
+    with raises(ValueError, match='AAA or ZZZ'):
+        aoc2023.day8.part1(data)
+    # Part 1 mustn't have left anything in the parse part 2 shares.
+    assert aoc2023.day8.part2(data) == 6
+
+
+def test_solve_parses_once() -> None:
+    from aoc2023 import parse_cache
+
+    with open(Path(HERE, 'inputs', 'd14')) as f:
+        data = f.read()
+    parse_cache.clear()
+    aoc2023.day14.solve(data)
+    assert len(parse_cache._cache) == 1
+
+
+def test_runner_times_each_stage() -> None:
+    from aoc2023 import runner
+
+    results = runner.run_day(9, input_file=Path(HERE, 'inputs', 'd9'))
+    assert [result.stage for result in results] == ['parse', 'part1', 'part2']
+    assert [result.answer for result in results[1:]] == [114, 2]
+    assert all(result.wall_s >= 0 and result.cpu_s >= 0 for result in results)
+
+
+def test_light_day_import_skips_heavy_deps() -> None:
+    from aoc2023 import bench_import
+
+    result = bench_import.measure_import('aoc2023.day1', repeat=1)
+    assert not result['numpy_loaded']
+
+
+@mark.parametrize('day', [1, 7, 10, 13, 18, 25])
+def test_generated_inputs_solve(day: int) -> None:
+    from aoc2023 import generators
+
+    data = generators.generate(day, scale=0.05)
+    assert data == generators.generate(day, scale=0.05)
+    module = getattr(aoc2023, f'day{day}')
+    module.part1(data)
+    module.part2(data)
+
+
+def test_bench_fits_exponent() -> None:
+    from aoc2023 import bench
+
+    results = bench.bench_part(7, 1, scales=(0.1, 1), memory=False)
+    assert all(result.wall_s for result in results)
+    assert bench.scaling_exponent(results) is not None
+
+
+def test_trace_is_silent_unless_enabled(capsys) -> None:
+    import io
+    from aoc2023 import trace
+
+    with open(Path(HERE, 'inputs', 'd19')) as f:
+        data = f.read()
+    aoc2023.day19.part2(data)
+    assert capsys.readouterr() == ('', '')
+
+    out = io.StringIO()
+    with trace.tracing('debug', out) as counters:
+        trace.reset()
+        aoc2023.day19.part2(data)
+        assert counters['day19.splits'] > 0
+    assert 'Splitting bounds' in out.getvalue()
+    assert not trace.ON
+
+
+def test_grid_views_and_neighbors() -> None:
+    from aoc2023.grid import Grid
+
+    grid = Grid.from_text("ab\ncd\n")
+    assert bytes(grid.row(1)) == b'cd'
+    assert bytes(grid.col(1)) == b'bd'
+    assert grid[1, 0] == ord('b')
+    # Corners only have two neighbors; the newlines fence off the edges.
+    assert sorted(grid.neighbors(grid.index(0, 0))) == [1, grid.index(0, 1)]
+    assert grid.wrap(-1, 2) == grid.index(1, 0)
+
+
+def test_graph_searches() -> None:
+    from aoc2023 import graph
+
+    # Two triangles joined by one edge, 2-5.
+    triangles = graph.Graph.from_edges(
+        6,
+        [(0, 1, 1), (1, 2, 1), (2, 0, 4), (3, 4, 1), (4, 5, 1), (5, 3, 1),
+         (2, 5, 2)],
+        undirected=True,
+    )
+    assert graph.bfs(triangles, 0) == [0, 1, 1, 3, 3, 2]
+    assert graph.dijkstra(triangles, [0], [3]) == 5
+    assert graph.longest_simple_path(triangles, 0, 3) == 8
+    n_cut, side = graph.min_cut(triangles, 0, 4)
+    assert (n_cut, sorted(side)) == (2, [0, 1, 2])
+    assert graph.min_cut(triangles, 0, 1, limit=1)[1] is None
+    with raises(ValueError):
+        graph.dag_longest_path(triangles, 0, 3)
+
+    dag = graph.Graph.from_edges(4, [(0, 1, 1), (0, 2, 5), (1, 3, 1), (2, 3, 1)])
+    assert graph.dag_longest_path(dag, 0, 3) == 6
+
+
+def test_interval_sets_and_boxes() -> None:
+    from aoc2023.intervals import Box, IntervalSet
+
+    # Overlapping and touching ranges merge.
+    ranges = IntervalSet([(20, 30), (0, 10), (30, 35), (5, 8)])
+    assert list(ranges) == [(0, 10), (20, 35)]
+    assert (ranges.size, ranges.min(), ranges.max()) == (25, 0, 34)
+    assert 9 in ranges and 10 not in ranges
+    assert ranges.clip(5, 25) == IntervalSet([(5, 10), (20, 25)])
+    assert ranges.split(10) == (IntervalSet([(0, 10)]), IntervalSet([(20, 35)]))
+    assert ranges - IntervalSet([(5, 22)]) == IntervalSet([(0, 5), (22, 35)])
+    assert ranges & IntervalSet([(5, 22)]) == ranges.clip(5, 22)
+    assert ranges | IntervalSet([(10, 20)]) == IntervalSet([(0, 35)])
+    assert ranges.shift(-10).min() == -10
+
+    box = Box([(0, 10), (0, 10)])
+    assert box.split(0, 4) == (Box([(0, 4), (0, 10)]), Box([(4, 10), (0, 10)]))
+    assert box.split(1, 0) == (None, box)
+    pieces = box.subtract(Box([(2, 4), (3, 5)]))
+    assert sum(piece.volume for piece in pieces) == 96
+    assert not any(a.intersect(b) for a in pieces for b in pieces if a is not b)
+
+
+def test_metrics_belong_to_their_collector() -> None:
+    import threading
+    from aoc2023 import metrics, runner
+
+    with open(Path(HERE, 'inputs', 'd17')) as f:
+        data = f.read()
+    aoc2023.day17.part1(data)
+    assert not metrics.ON
+
+    def in_a_thread() -> None:
+        with metrics.collecting() as work:
+            aoc2023.day22.part2(Path(HERE, 'inputs', 'd22').read_text())
+        seen.update(work.as_dict())
+
+    seen = dict()
+    with metrics.collecting() as work:
+        thread = threading.Thread(target=in_a_thread)
+        thread.start()
+        aoc2023.day17.part1(data)
+        thread.join()
+    assert not metrics.ON
+    assert work.as_dict() == {
+        'graph.dijkstra.popped': 327, 'graph.dijkstra.queue_max': 111,
+    }
+    assert seen == {'day22.removals': 14}
+
+    results = runner.run_day(
+        17, (1,), Path(HERE, 'inputs', 'd17'), collect_metrics=True,
+    )
+    assert results[-1].metrics == work.as_dict()
+
+
+def test_hot_records_are_slotted() -> None:
+    records = [
+        aoc2023.day16.Beam(0, 0, aoc2023.day16.Direction.UP),
+        aoc2023.day18.Digger(),
+        aoc2023.day22.Brick.from_ends(((0, 0, 1), (0, 2, 1))),
+        aoc2023.day24.Hailstone.from_str("19, 13, 30 @ -2, 1, -2"),
+    ]
+    assert not any(hasattr(record, '__dict__') for record in records)
+
+
+def test_batch_streams_every_job(tmp_path) -> None:
+    from aoc2023 import batch
+
+    paths = batch.write_synthetic(7, 3, tmp_path)
+    jobs = batch.jobs_for(7, [tmp_path])
+    assert len(jobs) == 6
+    # An input's parts are never split across chunks.
+    assert all(len(chunk) % 2 == 0 for chunk in batch.chunked(jobs, 3))
+
+    records = list(batch.run_batch(jobs, workers=2, chunksize=2))
+    assert sorted((r['input'], r['part']) for r in records) == sorted(
+        (str(path), part) for path in paths for part in (1, 2)
+    )
+    assert not any(r['error'] for r in records)
+
+
+def test_result_cache_hits_evicts_and_invalidates(tmp_path, monkeypatch) -> None:
+    from aoc2023 import resultcache, runner
+
+    d9 = Path(HERE, 'inputs', 'd9')
+    with resultcache.ResultCache(Path(tmp_path, 'r.sqlite'), max_entries=3) as cache:
+        first = runner.run_day(9, input_file=d9, cache=cache)
+        again = runner.run_day(9, input_file=d9, cache=cache)
+        assert [r.answer for r in first] == [r.answer for r in again]
+        assert all(r.cached for r in again[1:])
+
+        # Editing the day's code changes its hash, so nothing matches.
+        monkeypatch.setitem(resultcache._code_hashes, 'aoc2023.day9', 'edited')
+        assert not any(r.cached for r in runner.run_day(9, input_file=d9, cache=cache))
+        assert len(cache) == 3
+
+    # Day 23 only uses the graph, but the graph's own imports count too.
+    dependencies = resultcache._local_dependencies(aoc2023.day23)
+    assert {'aoc2023.graph', 'aoc2023.checkpoint'} <= dependencies
+
+
+def test_profile_part_writes_every_report(tmp_path) -> None:
+    import pstats
+    from aoc2023 import profiling
+
+    with open(Path(HERE, 'inputs', 'd17')) as f:
+        data = f.read()
+    paths = profiling.profile_part(17, 1, data, tmp_path, label='t')
+    assert paths['pstats'].name == 'day17-part1-t.pstats'
+    assert pstats.Stats(str(paths['pstats'])).total_calls > 0
+    assert paths['memory'].read_text().startswith('Peak traced memory')
+    assert paths['collapsed'].exists()
+
+
+def test_history_flags_only_clear_regressions() -> None:
+    from aoc2023 import history
+
+    def run(times: list[float], peak: int) -> dict:
+        result = {
+            'day': 17, 'part': 1, 'scale': 1, 'seed': 0,
+            'times': times, 'peak_bytes': peak, 'error': None,
+        }
+        return {'results': [result]}
+
+    base = run([1.0, 1.01, 0.99, 1.02, 0.98], 1000)
+    same = run([1.01, 0.99, 1.0, 1.03, 0.97], 1000)
+    slow = run([1.5, 1.52, 1.49, 1.51, 1.48], 2000)
+    assert history.compare_runs(base, same)[0]['flags'] == []
+    assert history.compare_runs(base, slow)[0]['flags'] == ['time', 'memory']
+    ratio, low, high = history.bootstrap_ratio(base['results'][0]['times'], [2.0] * 5)
+    assert low <= ratio <= high
+
+
+@mark.parametrize('file, module', [
+    ('d2p1', aoc2023.day2),
+    ('d4p1', aoc2023.day4),
+    ('d7', aoc2023.day7),
+    ('d9', aoc2023.day9),
+    ('d15_2', aoc2023.day15),
+    ('d18', aoc2023.day18),
+])
+def test_parts_accept_streams(file: str, module) -> None:
+    import io
+
+    with open(Path(HERE, 'inputs', file)) as f:
+        data = f.read()
+    for part in (module.part1, module.part2):
+        assert part(io.StringIO(data)) == part(data)
+        assert part(data.splitlines()) == part(data)
+
+
+def test_fields_spans_chunks(monkeypatch) -> None:
+    import io
+    from aoc2023 import streaming
+
+    monkeypatch.setattr(streaming, 'CHUNK_SIZE', 3)
+    stream = io.StringIO('rn=1,cm-,qp=3\n')
+    assert list(streaming.fields(stream)) == ['rn=1', 'cm-', 'qp=3']
+
+
+def test_grid_from_file_matches_text(tmp_path) -> None:
+    from aoc2023 import parse_cache
+    from aoc2023.grid import Grid
+
+    path = Path(HERE, 'inputs', 'd14')
+    grid = Grid.from_file(path)
+    assert grid == Grid.from_text(path.read_text())
+    assert grid.count(b'O') == path.read_text().count('O')
+    assert grid.find_unexpected(b'.#O') == -1
+    assert aoc2023.day14.part1(grid) == 136
+    # Iterating an mmap gives bytes; iterating the grid always gives ints.
+    assert list(grid)[:2] == list(b'O.')
+    parse_cache.clear()
+    assert aoc2023.day23.part1(Grid.from_file(Path(HERE, 'inputs', 'd23'))) == 94
+
+    # No trailing newline: still a grid, just not a mapped one.
+    untidy = Path(tmp_path, 'untidy')
+    untidy.write_text('ab\ncd')
+    assert str(Grid.from_file(untidy)) == 'ab\ncd\n'
+
+
+def test_deadline_returns_partial_results() -> None:
+    from aoc2023 import deadline, runner
+
+    with open(Path(HERE, 'inputs', 'd14')) as f:
+        data = f.read()
+    with deadline.within(0):
+        partial = aoc2023.day14.part2(data)
+    assert isinstance(partial, deadline.Partial)
+    assert partial.progress == {'cycles': 0, 'of': 500}
+    assert not deadline.ACTIVE
+
+    results = runner.run_day(14, input_file=Path(HERE, 'inputs', 'd14'), timeout=0)
+    assert isinstance(results[-1].answer, deadline.Partial)
+    assert aoc2023.day14.part2(data) == 69
+
+
+def test_service_solves_and_reports_latency() -> None:
+    import asyncio
+    import json
+    from aoc2023 import service
+
+    async def request(port: int, method: str, path: str, body: bytes = b'') -> dict:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(
+            f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode() + body
+        )
+        response = await reader.read()
+        writer.close()
+        status = int(response.split()[1])
+        return status, json.loads(response.split(b'\r\n\r\n', 1)[1])
+
+    async def exercise() -> None:
+        svc = service.SolveService(workers=1, queue=0)
+        await svc.start()
+        server = await asyncio.start_server(svc.handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            with open(Path(HERE, 'inputs', 'd9')) as f:
+                body = json.dumps({'day': 9, 'part': 1, 'input': f.read()})
+            for _ in range(2):
+                status, result = await request(port, 'POST', '/solve', body.encode())
+                assert (status, result['answer']) == (200, 114)
+                assert result['engine'] == 'reference'
+            status, _ = await request(port, 'POST', '/solve', b'{"day": 20}')
+            assert status == 400
+            status, result = await request(
+                port, 'POST', '/solve',
+                json.dumps({**json.loads(body), 'engine': 'bogus'}).encode(),
+            )
+            assert status == 400 and 'bogus' in result['error']
+            for timeout in ("5", True):
+                status, _ = await request(
+                    port, 'POST', '/solve',
+                    json.dumps({**json.loads(body), 'timeout': timeout}).encode(),
+                )
+                assert status == 400
+            status, stats = await request(port, 'GET', '/stats')
+            # The bogus engine is only found out by the worker, so it counts.
+            assert stats['by_part']['9.1']['count'] == 3
+            assert stats['by_part']['9.1']['errors'] == 1
+            assert stats['overall']['p99_s'] is not None
+        finally:
+            server.close()
+            svc.close()
+
+    asyncio.run(exercise())
+
+
+def test_daemon_serves_warm_runs(tmp_path) -> None:
+    import threading
+    from aoc2023 import daemon
+
+    path = tmp_path / 'aoc.sock'
+    server = daemon.make_server(path, days=(9,))
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        message = {'op': 'run', 'days': [9], 'input': str(Path(HERE, 'inputs', 'd9'))}
+        for _ in range(2):
+            results = daemon.request(message, path)['results']
+            assert [r['answer'] for r in results if r['stage'] != 'parse'] == [114, 2]
+        assert daemon.request({'op': 'status'}, path)['parsed_inputs'] >= 1
+        with raises(daemon.DaemonError):
+            daemon.request({'op': 'run', 'days': [20]}, path)
+        daemon.request({'op': 'stop'}, path)
+        thread.join(5)
+        assert not thread.is_alive()
+    finally:
+        server.server_close()
+
+
+def test_numparse_same_either_way(monkeypatch) -> None:
+    from aoc2023 import numparse
+
+    text = "seed-to-soil map:\n50 98 2\n\nCard 3: 41 -48 | 83-86\n1,1,8~1,2,8\n"
+    for min_size in (1 << 60, 0):
+        monkeypatch.setattr(numparse, 'NUMPY_MIN_SIZE', min_size)
+        assert list(numparse.ints(text)) == [
+            50, 98, 2, 3, 41, -48, 83, 86, 1, 1, 8, 1, 2, 8,
+        ]
+        assert numparse.int_rows(text)[:2] == [(50, 98, 2), (3, 41, -48, 83, 86)]
+        assert numparse.int_rows("1 2\n3 4\n", width=2) == [(1, 2), (3, 4)]
+        with raises(ValueError):
+            numparse.int_rows(text, width=3)
+        assert numparse.int_rows(f"{1 << 70} 1\n") == [(1 << 70, 1)]
+
+
+def test_threads_solve_the_same_day_in_isolation(tmp_path) -> None:
+    import sys
+    from aoc2023 import batch
+    from aoc2023.generators import generate
+
+    jobs = []
+    for day in (16, 22, 23, 24):
+        for seed in range(2):
+            path = tmp_path / f'day{day}-{seed}'
+            path.write_text(generate(day, scale=0.05, seed=seed))
+            jobs.extend(batch.jobs_for(day, [path]))
+    expected = {job: batch.run_job(job)['answer'] for job in jobs}
+
+    # Switch threads as often as possible, so the solvers interleave mid-run.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        records = list(
+            batch.run_batch(jobs * 3, workers=8, chunksize=1, threads=True)
+        )
+    finally:
+        sys.setswitchinterval(interval)
+    assert len(records) == 3 * len(jobs)
+    for record in records:
+        assert record['error'] is None
+        job = batch.Job(record['day'], record['part'], record['input'])
+        assert record['answer'] == expected[job]
+
+
+def test_deadlines_belong_to_their_thread() -> None:
+    import threading
+    from aoc2023 import deadline
+
+    data = Path(HERE, 'inputs', 'd14').read_text()
+    inside, finished = threading.Event(), threading.Event()
+    hurried = []
+
+    def in_a_hurry() -> None:
+        with deadline.within(0):
+            hurried.append(aoc2023.day14.part2(data))
+            inside.set()
+            finished.wait(10)
+
+    thread = threading.Thread(target=in_a_hurry)
+    thread.start()
+    try:
+        inside.wait(10)
+        # Another thread's deadline has passed, but not ours.
+        assert deadline.ACTIVE and not deadline.expired()
+        assert aoc2023.day14.part2(data) == 69
+    finally:
+        finished.set()
+        thread.join(10)
+    assert isinstance(hurried[0], deadline.Partial)
+    assert not deadline.ACTIVE
+
+
+def test_checkpoints_belong_to_their_thread(tmp_path, monkeypatch) -> None:
+    import sys
+    import threading
+    from aoc2023 import checkpoint, deadline
+
+    days = [
+        (aoc2023.day14.part2, Path(HERE, 'inputs', 'd14').read_text()),
+        (aoc2023.day23.part2, Path(HERE, 'inputs', 'd23').read_text()),
+    ]
+    expected = [fn(data) for fn, data in days]
+    # Save at every step, so the threads are forever writing their files.
+    monkeypatch.setattr(deadline, 'CHECK_EVERY', 1)
+    answers = dict()
+
+    def solve(n: int) -> None:
+        # Every other thread checkpoints, to a file of its own.
+        path = Path(tmp_path, f'checkpoint{n}') if n % 2 else None
+        with checkpoint.to(path, every=0):
+            answers[n] = [fn(data) for fn, data in days]
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        threads = [threading.Thread(target=solve, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(60)
+    finally:
+        sys.setswitchinterval(interval)
+    assert answers == {n: expected for n in range(4)}
+    # Each finished, so took its own file away, and nobody wrote anywhere else.
+    assert list(tmp_path.iterdir()) == []
+    assert not checkpoint.ACTIVE
+
+
+def test_memo_evicts_by_policy_and_counts() -> None:
+    from aoc2023 import memo, metrics
+
+    calls = []
+
+    def square(x: int) -> int:
+        calls.append(x)
+        return x * x
+
+    lru = memo.Memo(square, max_entries=2)
+    lfu = memo.Memo(square, max_entries=2, policy='lfu')
+    for cached in (lru, lfu):
+        calls.clear()
+        for x in (1, 1, 1, 2, 3, 1):
+            assert cached(x) == x * x
+        # LRU dropped 1 for 3 and had to redo it; LFU dropped 2, used once.
+        assert calls == ([1, 2, 3, 1] if cached is lru else [1, 2, 3])
+
+    by_length = memo.Memo(len, key=lambda items: len(items))
+    with metrics.collecting() as work:
+        assert by_length([1, 2]) == by_length([3, 4]) == 2
+    assert by_length.stats() == {
+        'hits': 1, 'misses': 1, 'evictions': 0, 'size': 1, 'hit_rate': 0.5,
+    }
+    assert work.as_dict() == {
+        'memo.builtins.len.hits': 1, 'memo.builtins.len.misses': 1,
+    }
+
+
+def test_engines_agree_and_choose_by_size(tmp_path) -> None:
+    from aoc2023 import batch, engines, runner
+    from aoc2023.numparse import NUMPY_MIN_SIZE
+
+    for file, day in (('d6', 6), ('d9', 9), ('d24', 24)):
+        data = Path(HERE, 'inputs', file).read_text()
+        for part in runner.PARTS:
+            answers = {
+                name: engine.fn(data)
+                for name, engine in engines.engines_for(day, part).items()
+            }
+            assert len(set(answers.values())) == 1, (day, part, answers)
+
+    # Sums past 64 bits, which numpy would wrap around.
+    huge = ' '.join(str(10**15 * x**3) for x in range(21)) + '\n'
+    assert aoc2023.day9.part1_numpy(huge * 3) == aoc2023.day9.part1(huge * 3)
+
+    small = Path(HERE, 'inputs', 'd9').read_text()
+    big = small * (NUMPY_MIN_SIZE // len(small) + 1)
+    assert engines.choose(9, 1, small).name == engines.REFERENCE
+    assert engines.choose(9, 1, big).name == 'numpy'
+    assert engines.choose(9, 1, big, engines.REFERENCE).name == engines.REFERENCE
+    assert engines.choose(6, 2, small).name == 'quadratic'
+    with raises(ValueError):
+        engines.choose(6, 2, small, 'numpy')
+
+    # Batch chooses the same way.
+    big_file = Path(tmp_path, 'big')
+    big_file.write_text(big)
+    jobs = batch.jobs_for(9, [big_file], parts=(1,))
+    jobs += batch.jobs_for(9, [big_file], parts=(1,), engine=engines.REFERENCE)
+    jobs += batch.jobs_for(9, [Path(HERE, 'inputs', 'd9')], parts=(1,))
+    records = [batch.run_job(job) for job in jobs]
+    assert [r['engine'] for r in records] == ['numpy', 'reference', 'reference']
+    assert records[0]['answer'] == records[1]['answer']
+
+    results = runner.run_day(
+        6, input_file=Path(HERE, 'inputs', 'd6'), engine=engines.REFERENCE,
+    )
+    assert [(r.answer, r.engine) for r in results[1:]] == [
+        (288, engines.REFERENCE), (71503, engines.REFERENCE),
+    ]
+
+
+def test_equivalence_shrinks_disagreements(monkeypatch) -> None:
+    from aoc2023 import engines, equivalence
+
+    assert equivalence.check(9, seed=0) == []
+
+    # Wrong only when one particular history is in there.
+    def broken(data: str) -> int:
+        return aoc2023.day9.part1(data) + ('\n6 -2 ' in '\n' + data)
+
+    monkeypatch.setitem(
+        engines._registry, (9, 1), {'broken': engines.Engine('broken', broken)},
+    )
+    [mismatch] = equivalence.check(9, seed=0, parts=(1,))
+    assert mismatch.data.startswith('6 -2 ') and mismatch.data.count('\n') == 1
+    outcomes = mismatch.outcomes
+    assert outcomes['broken'].answer == outcomes['reference'].answer + 1
+
+    saved = equivalence.reference_answers([9], [0, 1])
+    assert equivalence.check_against(saved, [9], [0, 1]) == []
+    monkeypatch.setattr(aoc2023.day9, 'part2', lambda data: 0)
+    assert [
+        (m.part, m.seed) for m in equivalence.check_against(saved, [9], [0, 1])
+    ] == [(2, 0), (2, 1)]
+
+
+@mark.parametrize(
+    argnames=['file', 'fn', 'work_done'],
+    argvalues=[
+        ('d14', aoc2023.day14.part2, 'day14.spin_cycles'),
+        ('d23', aoc2023.day23.part2, 'graph.longest_simple_path.pushes'),
+    ]
+)
+def test_checkpoint_resumes_after_a_kill(
+    tmp_path, monkeypatch, file: str, fn, work_done: str,
+) -> None:
+    from aoc2023 import checkpoint, deadline, metrics
+
+    class Killed(Exception):
+        pass
+
+    data = Path(HERE, 'inputs', file).read_text()
+    with metrics.collecting() as fresh:
+        expected = fn(data)
+
+    monkeypatch.setattr(deadline, 'CHECK_EVERY', 1)
+    path = Path(tmp_path, 'checkpoint')
+    save = checkpoint.save
+    n_saves = 0
+
+    def save_then_die(*args) -> None:
+        nonlocal n_saves
+        save(*args)
+        n_saves += 1
+        if n_saves == 3:
+            raise Killed
+
+    with monkeypatch.context() as m:
+        m.setattr(checkpoint, 'save', save_then_die)
+        with raises(Killed), checkpoint.to(path, every=0):
+            fn(data)
+    assert path.exists()
+
+    with checkpoint.to(path, every=0), metrics.collecting() as resumed:
+        assert fn(data) == expected
+    assert 0 < resumed.as_dict()[work_done] < fresh.as_dict()[work_done]
+    # Finished, so there's nothing left to resume.
+    assert not path.exists()